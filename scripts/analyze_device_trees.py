@@ -15,19 +15,39 @@ Arguments:
     --format FORMAT   Output format: 'toml' (default) or 'json'
 """
 
-from dataclasses import dataclass, field
+import json
+import mmap
+import os
+import re
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 from lib.analysis_base import AnalysisBase
+from lib.analysis_cache import cache_enabled, save_json, source_cache_key
 from lib.base_script import AnalysisScript
-from lib.devicetree import DeviceTreeParser, HardwareComponent
-from lib.finders import find_files
+from lib.devicetree import (
+    DeviceTreeParser,
+    HardwareComponent,
+    fdt_string,
+    read_fdt_root_properties,
+)
 from lib.firmware import extract_firmware
 from lib.logging import info, section, warn
 
 # Device tree analysis constants
-FDT_MAGIC = "d00dfeed"  # FDT magic number (big-endian)
+DTB_FILENAME = "system.dtb"  # Name binwalk gives extracted FIT images / DTBs
+DTS_MAX_LINES = 200  # Only the head of each DTB is parsed
+# Universal newlines, as text-mode reads translate them to "\n"
+_LINE_END_RE = re.compile(rb"\r\n?|\n")
+
+# Parsed DTB cache (in work_dir), keyed by path and invalidated by mtime/size.
+# Used only when FW_ANALYSIS_CACHE is set, like the other analysis caches, and
+# discarded whenever this script or scripts/lib changes.
+DTB_CACHE_FILE = "dtb_cache.json"
 
 
 @dataclass(frozen=True, slots=True)
@@ -42,7 +62,47 @@ class DeviceTree:
     compatible: str | None = None
     fit_description: str | None = None
     serial_config: str | None = None
-    hardware_components: list[HardwareComponent] = field(default_factory=list)
+    # Hardware components stored column-wise (structure of arrays): entry i of
+    # each tuple describes the same component
+    hw_types: tuple[str, ...] = ()
+    hw_nodes: tuple[str, ...] = ()
+    hw_descriptions: tuple[str, ...] = ()
+
+    @property
+    def hardware_components(self) -> list[HardwareComponent]:
+        """Hardware components as HardwareComponent objects (built on access)."""
+        return [
+            HardwareComponent(type=t, node=n, description=d)
+            for t, n, d in zip(self.hw_types, self.hw_nodes, self.hw_descriptions, strict=True)
+        ]
+
+
+# Output key -> DeviceTree attribute, in output order
+_DEVICE_TREE_ROW_FIELDS = (
+    ("filename", "filename"),
+    ("size", "size"),
+    ("offset", "offset"),
+    ("type", "dtb_type"),
+    ("model", "model"),
+    ("compatible", "compatible"),
+    ("fit_description", "fit_description"),
+    ("serial_config", "serial_config"),
+)
+
+
+def _iter_device_tree_rows(device_trees: list[DeviceTree]) -> Iterator[dict[str, Any]]:
+    """Yield one output row per DeviceTree, omitting unset fields."""
+    for dt in device_trees:
+        row: dict[str, Any] = {}
+        for key, attr in _DEVICE_TREE_ROW_FIELDS:
+            if (value := getattr(dt, attr)) is not None:
+                row[key] = value
+        if dt.hw_types:
+            row["hardware_components"] = [
+                {"type": t, "node": n, "description": d}
+                for t, n, d in zip(dt.hw_types, dt.hw_nodes, dt.hw_descriptions, strict=True)
+            ]
+        yield row
 
 
 @dataclass(slots=True)
@@ -63,56 +123,69 @@ class DeviceTreeAnalysis(AnalysisBase):
     def _convert_complex_field(self, key: str, value: Any) -> tuple[bool, Any]:
         """Convert complex fields to serializable format."""
         if key == "device_trees":
-            return True, [
-                {
-                    k: v
-                    for k, v in {
-                        "filename": dt.filename,
-                        "size": dt.size,
-                        "offset": dt.offset,
-                        "type": dt.dtb_type,
-                        "model": dt.model,
-                        "compatible": dt.compatible,
-                        "fit_description": dt.fit_description,
-                        "serial_config": dt.serial_config,
-                        "hardware_components": [
-                            {
-                                "type": hc.type,
-                                "node": hc.node,
-                                "description": hc.description,
-                            }
-                            for hc in dt.hardware_components
-                        ]
-                        if dt.hardware_components
-                        else None,
-                    }.items()
-                    if v is not None
-                }
-                for dt in value
-            ]
+            return True, list(_iter_device_tree_rows(value))
         return False, None
 
 
+def _walk_dtb_files(directory: str) -> Iterator[Path]:
+    """Yield system.dtb files below directory using os.scandir.
+
+    DirEntry type checks reuse the data returned by the directory read, so
+    only matching files are turned into Path objects.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _walk_dtb_files(entry.path)
+                elif entry.name == DTB_FILENAME and entry.is_file():
+                    yield Path(entry.path)
+    except OSError:
+        return
+
+
 def find_dtb_files(extract_dir: Path) -> list[Path]:
     """Find all device tree blob files in extraction directory."""
     # Look for system.dtb files (these are FIT images or DTBs extracted by binwalk)
-    return find_files(extract_dir, ["system.dtb"], file_type="file")
+    return sorted(_walk_dtb_files(str(extract_dir)))
 
 
-def parse_dts_content(dts_content: str) -> dict[str, str | list[HardwareComponent]]:
+def parse_dts_content(
+    dts_content: str, lines: list[str] | None = None
+) -> dict[str, str | list[HardwareComponent]]:
     """Parse DTS content and extract key information.
 
     Args:
         dts_content: Device tree source content
+        lines: Optional content as a list of lines, if already available
 
     Returns:
         Dictionary with extracted information
     """
     # Use DeviceTreeParser for all extraction
-    parser = DeviceTreeParser(dts_content)
+    parser = DeviceTreeParser(dts_content, lines)
     return parser.parse()
 
 
+def _read_head_lines(data: mmap.mmap, max_lines: int) -> list[str]:
+    """Decode the first max_lines lines of a mapped file.
+
+    Lines end at b"\r\n", b"\r" or b"\n" and get a "\n" terminator, like
+    readlines() in text mode with universal newlines. They are decoded one at
+    a time, so only the head of the file is ever copied and decoded.
+    """
+    lines: list[str] = []
+    start = 0
+    while len(lines) < max_lines and start < len(data):
+        if match := _LINE_END_RE.search(data, start):
+            lines.append(data[start : match.start()].decode("utf-8", "ignore") + "\n")
+            start = match.end()
+        else:
+            lines.append(data[start:].decode("utf-8", "ignore"))
+            break
+    return lines
+
+
 def analyze_dtb_file(dtb_path: Path, extract_dir: Path) -> DeviceTree:
     """Analyze a single DTB file.
 
@@ -128,26 +201,40 @@ def analyze_dtb_file(dtb_path: Path, extract_dir: Path) -> DeviceTree:
 
     # Calculate offset from directory structure
     # binwalk creates directories like "8F1B4" for offset 0x8F1B4
-    rel_path = dtb_path.relative_to(extract_dir)
-    offset_dir = rel_path.parts[0] if rel_path.parts else "unknown"
-
-    # Read content (binwalk may extract as text DTS, not binary DTB)
+    # (plain string slicing; no intermediate relative Path is built)
+    prefix = str(extract_dir) + os.sep
+    path_str = str(dtb_path)
+    if not path_str.startswith(prefix):
+        raise ValueError(f"{dtb_path} is not in {extract_dir}")
+    offset_dir = path_str[len(prefix) :].partition(os.sep)[0] or "unknown"
+
+    # Map the file once: binary DTBs are walked as FDT structures, and only the
+    # head of the file is decoded as DTS text (binwalk may extract text, not DTB)
+    fdt_props: dict[str, bytes] = {}
+    lines: list[str] = []
     try:
-        with dtb_path.open("r", encoding="utf-8", errors="ignore") as f:
-            dts_content = "".join(f.readlines()[:200])  # Read first 200 lines
-    except Exception as e:
+        with (
+            dtb_path.open("rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+        ):
+            fdt_props = read_fdt_root_properties(mm)
+            lines = _read_head_lines(mm, DTS_MAX_LINES)
+    except ValueError:
+        pass  # Empty file: mmap refuses zero-length maps, nothing to parse
+    except OSError as e:
         warn(f"Failed to read {dtb_path}: {e}")
-        dts_content = ""
 
-    # Parse DTS content
-    parsed = parse_dts_content(dts_content)
+    # Parse DTS content (line list is kept for the line-oriented extractors)
+    dts_content = "".join(lines)
+    parsed = parse_dts_content(dts_content, lines)
 
     # Extract and narrow types for DeviceTree constructor
-    model = parsed.get("model")
-    compatible = parsed.get("compatible")
+    model = fdt_string(fdt_props.get("model")) or parsed.get("model")
+    compatible = fdt_string(fdt_props.get("compatible")) or parsed.get("compatible")
     fit_description = parsed.get("fit_description")
     serial_config = parsed.get("serial_config")
     hw_components = parsed.get("hardware_components")
+    components = hw_components if isinstance(hw_components, list) else []
 
     return DeviceTree(
         filename=dtb_path.name,
@@ -158,10 +245,145 @@ def analyze_dtb_file(dtb_path: Path, extract_dir: Path) -> DeviceTree:
         compatible=compatible if isinstance(compatible, str) else None,
         fit_description=fit_description if isinstance(fit_description, str) else None,
         serial_config=serial_config if isinstance(serial_config, str) else None,
-        hardware_components=hw_components if isinstance(hw_components, list) else [],
+        hw_types=tuple(hc.type for hc in components),
+        hw_nodes=tuple(hc.node for hc in components),
+        hw_descriptions=tuple(hc.description for hc in components),
     )
 
 
+def load_dtb_cache(work_dir: Path) -> dict[str, Any]:
+    """Load cached DTB analysis results from the work directory.
+
+    Args:
+        work_dir: Working directory containing the cache file
+
+    Returns:
+        Dictionary mapping DTB path to cache entry (empty if missing, unreadable
+        or written by different parser code)
+    """
+    cache_file = work_dir / DTB_CACHE_FILE
+    try:
+        data = json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(data, dict) or data.get("source") != source_cache_key(Path(__file__)):
+        return {}
+    entries = data.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def save_dtb_cache(work_dir: Path, cache: dict[str, Any]) -> None:
+    """Write DTB analysis results to the work directory cache.
+
+    Args:
+        work_dir: Working directory for the cache file
+        cache: Dictionary mapping DTB path to cache entry
+    """
+    save_json(
+        work_dir / DTB_CACHE_FILE,
+        {"source": source_cache_key(Path(__file__)), "entries": cache},
+    )
+
+
+def _cached_device_tree(entry: Any, stat_key: tuple[int, int] | None) -> DeviceTree | None:
+    """Rebuild a DeviceTree from a cache entry matching the file's mtime and size.
+
+    Args:
+        entry: Cache entry for the file, as loaded from JSON
+        stat_key: (st_mtime_ns, st_size) of the file, or None if it could not be read
+
+    Returns:
+        Cached DeviceTree, or None if the entry is missing, stale or malformed
+    """
+    if stat_key is None or not isinstance(entry, dict):
+        return None
+    if (entry.get("mtime_ns"), entry.get("size")) != stat_key:
+        return None
+    data = entry.get("device_tree")
+    if not isinstance(data, dict):
+        return None
+
+    columns = {
+        column: data.get(column, []) for column in ("hw_types", "hw_nodes", "hw_descriptions")
+    }
+    values = list(columns.values())
+    if not all(isinstance(value, list) and len(value) == len(values[0]) for value in values):
+        return None
+    try:
+        return DeviceTree(**{**data, **{column: tuple(value) for column, value in columns.items()}})
+    except TypeError:
+        return None  # Missing or unknown fields
+
+
+def analyze_dtb_files(
+    dtb_files: list[Path], extract_dir: Path, cache: dict[str, Any] | None = None
+) -> list[DeviceTree]:
+    """Analyze DTB files, in parallel when there is more than one.
+
+    Each DTB is parsed independently, so files are spread across a process
+    pool. Results are returned in the same order as dtb_files.
+
+    Args:
+        dtb_files: Paths to DTB files
+        extract_dir: Base extraction directory (for offset calculation)
+        cache: Optional cache from load_dtb_cache(); files whose mtime and size
+               match an entry are not re-parsed. The cache is rebuilt in place
+               to hold entries for dtb_files only, so files that are gone are
+               dropped from it
+
+    Returns:
+        List of DeviceTree objects, one per input file
+    """
+    results: list[DeviceTree | None] = [None] * len(dtb_files)
+    stats: dict[int, tuple[int, int]] = {}
+    previous = dict(cache) if cache is not None else {}
+    if cache is not None:
+        cache.clear()
+
+    for index, dtb_path in enumerate(dtb_files):
+        if cache is not None:
+            entry = previous.get(str(dtb_path))
+            try:
+                st = dtb_path.stat()
+                stats[index] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                # Treated as a cache miss; the old entry is kept for the next run
+                if entry is not None:
+                    cache[str(dtb_path)] = entry
+            cached = _cached_device_tree(entry, stats.get(index))
+            if cached is not None:
+                results[index] = cached
+                cache[str(dtb_path)] = entry
+                info(f"Cached: {dtb_path.name}")
+                continue
+        info(f"Analyzing: {dtb_path.name}")
+
+    pending = [index for index, result in enumerate(results) if result is None]
+    pending_files = [dtb_files[index] for index in pending]
+
+    # A single file isn't worth the pool start-up cost
+    if len(pending_files) <= 1:
+        parsed = [analyze_dtb_file(dtb_path, extract_dir) for dtb_path in pending_files]
+    else:
+        max_workers = min(len(pending_files), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            analyze = partial(analyze_dtb_file, extract_dir=extract_dir)
+            parsed = list(executor.map(analyze, pending_files))
+
+    for index, device_tree in zip(pending, parsed, strict=True):
+        results[index] = device_tree
+        if cache is not None and index in stats:
+            mtime_ns, size = stats[index]
+            cache[str(dtb_files[index])] = {
+                "mtime_ns": mtime_ns,
+                "size": size,
+                "device_tree": asdict(device_tree),
+            }
+
+    return [device_tree for device_tree in results if device_tree is not None]
+
+
 def analyze_device_trees(firmware_path: str, work_dir: Path) -> DeviceTreeAnalysis:
     """Analyze device trees in firmware and return structured results.
 
@@ -191,11 +413,12 @@ def analyze_device_trees(firmware_path: str, work_dir: Path) -> DeviceTreeAnalys
     analysis.set_count_with_metadata("dtb_count", dtb_files, "binwalk", "find extracted DTB files")
     info(f"Found {analysis.dtb_count} device tree blobs")
 
-    # Analyze each DTB
-    for dtb_path in dtb_files:
-        info(f"Analyzing: {dtb_path.name}")
-        device_tree = analyze_dtb_file(dtb_path, extract_dir)
-        analysis.device_trees.append(device_tree)
+    # Analyze each DTB (with FW_ANALYSIS_CACHE set, unchanged files are served
+    # from the work_dir cache)
+    cache = load_dtb_cache(work_dir) if cache_enabled() else None
+    analysis.device_trees.extend(analyze_dtb_files(dtb_files, extract_dir, cache))
+    if cache is not None:
+        save_dtb_cache(work_dir, cache)
 
     analysis.add_metadata("device_trees", "binwalk", "DTB extraction from firmware partitions")
 
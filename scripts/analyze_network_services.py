@@ -17,37 +17,116 @@ Arguments:
     --format FORMAT   Output format: 'toml' (default) or 'json'
 """
 
+import heapq
+import os
 import re
 import subprocess
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from operator import attrgetter
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
 from lib.analysis_base import AnalysisBase
+from lib.analysis_cache import cached_analysis
 from lib.base_script import AnalysisScript
-from lib.finders import (
-    find_by_names,
-    find_files,
-    get_file_size,
-    get_relative_path,
-)
+from lib.finders import PRUNED_DIR_NAMES, PRUNED_ROOT_DIRS
 from lib.logging import section, warn
 
 # Password hash analysis constants
 MIN_SHADOW_FIELDS = 2  # Minimum fields in /etc/shadow entry
 MIN_HASH_LENGTH = 13  # Minimum length for a valid password hash
 
-
-@dataclass(frozen=True, slots=True)
-class InitScript:
+# Password hash types by crypt(3) prefix
+HASH_TYPES: dict[bytes, str] = {
+    b"$1$": "md5",
+    b"$5$": "sha256",
+    b"$6$": "sha512",
+    b"$y$": "yescrypt",
+}
+
+# Password fields that are not hashes, matched exactly
+SPECIAL_PASSWORD_FIELDS: dict[bytes, str] = {
+    b"": "locked",
+    b"*": "locked",
+    b"!": "locked",
+    b"x": "shadow",
+}
+
+# Descriptions of classified hash types; unknown prefixes are flagged separately
+HASH_TYPE_DESCRIPTIONS = {
+    "locked": "No password / locked",
+    "shadow": "Password in shadow file",
+    "weak": "Weak/short hash (potential issue)",
+    "md5": "MD5 hash (weak)",
+    "sha256": "SHA-256 hash",
+    "sha512": "SHA-512 hash (strong)",
+    "yescrypt": "yescrypt hash (strong)",
+}
+
+# Sensitive file scan: case-insensitive 'password|secret|api.key|token', like grep -i -E
+SENSITIVE_LITERALS = (b"password", b"secret", b"token")
+SENSITIVE_API_KEY_PATTERN = re.compile(rb"api.key")
+MAX_SENSITIVE_FILES = 20
+MAX_SENSITIVE_SCAN_BYTES = 1 << 20  # Only the head of large files is scanned
+# Certificate bundles, message catalogs and archives are not scanned
+SENSITIVE_SKIP_SUFFIXES = (".crt", ".pem", ".mo", ".gz")
+
+# Text sniffing: files whose head holds a NUL, or too many other control bytes, are binary
+TEXT_SNIFF_BYTES = 512
+MAX_CONTROL_BYTE_RATIO = 8  # At most 1 in 8 bytes may be a control byte
+_CONTROL_BYTES = bytes(b for b in range(32) if b not in b"\t\n\v\f\r")
+
+# Maximum number of firewall rule files to report
+MAX_FIREWALL_RULES = 5
+
+# Directories holding systemd unit files, relative to the rootfs
+SYSTEMD_DIRS = ("etc/systemd", "lib/systemd", "usr/lib/systemd")
+
+# Threads used to walk top-level rootfs directories concurrently
+MAX_SCAN_WORKERS = 8
+
+# Service binaries by basename (exact match, falling back to a name* prefix)
+WEB_SERVERS = {
+    "nginx": "Nginx web server",
+    "lighttpd": "Lighttpd web server",
+    "httpd": "HTTP daemon",
+    "apache2": "Apache web server",
+    "uvicorn": "Uvicorn ASGI server",
+    "gunicorn": "Gunicorn WSGI server",
+}
+
+SSH_SERVERS = {
+    "sshd": "OpenSSH server",
+    "dropbear": "Dropbear SSH server",
+}
+
+NETWORK_SERVICES = {
+    "avahi-daemon": "mDNS/Bonjour",
+    "dnsmasq": "DNS/DHCP",
+    "hostapd": "WiFi AP",
+    "wpa_supplicant": "WiFi client",
+    "mosquitto": "MQTT broker",
+    "telnetd": "Telnet (insecure)",
+    "ftpd": "FTP server",
+    "vsftpd": "FTP server",
+    "smbd": "Samba/SMB",
+    "ntpd": "NTP",
+    "chronyd": "NTP",
+    "bluetoothd": "Bluetooth",
+    "janus": "WebRTC gateway",
+}
+
+
+class InitScript(NamedTuple):
     """An init script found in the firmware."""
 
     name: str
     size: int
 
 
-@dataclass(frozen=True, slots=True)
-class ServiceBinary:
+class ServiceBinary(NamedTuple):
     """A network service binary found in the firmware."""
 
     name: str
@@ -55,18 +134,97 @@ class ServiceBinary:
     description: str
 
 
-@dataclass(frozen=True, slots=True)
-class PasswordEntry:
+class PasswordEntry(NamedTuple):
     """A password entry from /etc/shadow or /etc/passwd."""
 
     username: str
     hash_type: str
-    description: str
+    # Set when hash_type is the raw prefix of an unrecognized hash, which may
+    # coincide with a classified type name (e.g. "md5")
+    unknown_prefix: bool = False
+
+    @property
+    def description(self) -> str:
+        """Human-readable description of the hash type, derived on demand."""
+        if self.unknown_prefix:
+            return f"Hash present (type: {self.hash_type})"
+        return HASH_TYPE_DESCRIPTIONS[self.hash_type]
+
+
+def _records_to_dicts(records: list[Any]) -> list[dict[str, Any]]:
+    """Convert a list of NamedTuple records to dictionaries."""
+    return [record._asdict() for record in records]
+
+
+def _password_entries_to_dicts(entries: list[PasswordEntry]) -> list[dict[str, Any]]:
+    """Convert password entries to dictionaries, adding their descriptions."""
+    return [
+        {"username": entry.username, "hash_type": entry.hash_type, "description": entry.description}
+        for entry in entries
+    ]
+
+
+def _record_to_dict(record: Any) -> dict[str, Any] | None:
+    """Convert an optional NamedTuple record to a dictionary."""
+    return record._asdict() if record else None
+
+
+# to_dict() converters for the record-valued analysis fields
+_FIELD_CONVERTERS: dict[str, Callable[[Any], Any]] = {
+    "init_scripts": _records_to_dicts,
+    "web_servers": _records_to_dicts,
+    "web_frameworks": _records_to_dicts,
+    "network_services": _records_to_dicts,
+    "password_entries": _password_entries_to_dicts,
+    "ssh_server": _record_to_dict,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class RootfsIndex:
+    """Rootfs entries collected in a single traversal.
+
+    Both maps are keyed by basename and hold sorted rootfs-relative paths
+    without a leading slash.
+    """
+
+    files: dict[str, list[str]]
+    dirs: dict[str, list[str]]
 
 
 @dataclass(slots=True)
+class DirListings:
+    """Names of the entries in rootfs directories, listed on first use.
+
+    One scandir answers every existence check on the same directory, so
+    the probes for /etc, its files and the systemd directories share a few
+    listings. An entry counts even if it is a symlink whose target lies
+    outside the rootfs. Create one per analysis run, like RootfsIndex, and
+    use it from a single thread: the cache is not locked.
+    """
+
+    rootfs: Path
+    _names: dict[str, frozenset[str]] = field(default_factory=dict)
+
+    def names(self, relpath: str) -> frozenset[str]:
+        """Names of the entries in a rootfs-relative directory, empty if unreadable."""
+        names = self._names.get(relpath)
+        if names is None:
+            try:
+                with os.scandir(self.rootfs / relpath) as entries:
+                    names = frozenset(entry.name for entry in entries)
+            except OSError:
+                names = frozenset()
+            self._names[relpath] = names
+        return names
+
+
+@dataclass(slots=True, eq=False)
 class NetworkServicesAnalysis(AnalysisBase):
-    """Results of network services and attack surface analysis."""
+    """Results of network services and attack surface analysis.
+
+    Analyses are compared by identity; use asdict() for a field comparison.
+    """
 
     firmware_file: str
     firmware_size: int
@@ -111,93 +269,215 @@ class NetworkServicesAnalysis(AnalysisBase):
 
     def _convert_complex_field(self, key: str, value: Any) -> tuple[bool, Any]:
         """Convert complex fields to serializable format."""
-        if key == "init_scripts":
-            return True, [{"name": s.name, "size": s.size} for s in value]
-        if key in ("web_servers", "web_frameworks", "network_services"):
-            return True, [
-                {"name": s.name, "path": s.path, "description": s.description} for s in value
-            ]
-        if key == "ssh_server":
-            if value:
-                return True, {
-                    "name": value.name,
-                    "path": value.path,
-                    "description": value.description,
-                }
-            return True, None
-        if key == "password_entries":
-            return True, [
-                {
-                    "username": p.username,
-                    "hash_type": p.hash_type,
-                    "description": p.description,
-                }
-                for p in value
-            ]
-        return False, None
+        converter = _FIELD_CONVERTERS.get(key)
+        if converter is None:
+            return False, None
+        return True, converter(value)
 
 
 def find_init_scripts(rootfs: Path) -> list[InitScript]:
     """Find init scripts in /etc/init.d."""
     init_d = rootfs / "etc" / "init.d"
-    if not init_d.exists():
+
+    # DirEntry caches file type and stat results from the directory scan
+    try:
+        with os.scandir(init_d) as entries:
+            scripts = [
+                InitScript(name=entry.name, size=entry.stat(follow_symlinks=False).st_size)
+                for entry in entries
+                if entry.is_file(follow_symlinks=False)
+            ]
+    except FileNotFoundError:
+        return []
+    except OSError:
+        warn("Could not read /etc/init.d")
         return []
 
-    # Find all files in init.d
-    found_paths = find_files(init_d, ["*"], file_type="file")
+    scripts.sort(key=attrgetter("name"))
+    return scripts
 
-    # Convert to InitScript objects (already sorted by find_files)
-    return [InitScript(name=path.name, size=get_file_size(path)) for path in found_paths]
 
+def _scan_directory(
+    prefix: str, directory: str, files: dict[str, list[str]], dirs: dict[str, list[str]]
+) -> list[tuple[str, str]]:
+    """Index the entries of one directory.
 
-def find_systemd_services(rootfs: Path) -> list[str]:
-    """Find systemd service files."""
-    # Check for systemd directories
-    systemd_dirs = [rootfs / "etc" / "systemd", rootfs / "lib" / "systemd"]
-    if not any(d.exists() for d in systemd_dirs):
-        return []
+    Symlinks are classified by their target, like ``Path.is_file()``, but
+    symlinked directories are not descended into, like ``Path.rglob()``.
+    Pruned directories (PRUNED_ROOT_DIRS, PRUNED_DIR_NAMES) are indexed but
+    not descended into either, since they never hold service files.
 
-    # Find all .service files
-    found_paths = find_files(rootfs, ["*.service"], file_type="file")
+    Args:
+        prefix: Rootfs-relative path of the directory, with a trailing slash
+        directory: Absolute path of the directory
+        files: Basename to relative paths map to extend with files
+        dirs: Basename to relative paths map to extend with directories
 
-    return [get_relative_path(rootfs, path).lstrip("/") for path in found_paths]
+    Returns:
+        (prefix, directory) pairs for the subdirectories to descend into
+    """
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                relpath = prefix + entry.name
+                if entry.is_dir():
+                    dirs.setdefault(entry.name, []).append(relpath)
+                    if not (
+                        entry.name in PRUNED_DIR_NAMES
+                        or relpath in PRUNED_ROOT_DIRS
+                        or entry.is_symlink()
+                    ):
+                        subdirs.append((relpath + "/", entry.path))
+                elif entry.is_file():
+                    files.setdefault(entry.name, []).append(relpath)
+    except OSError:
+        pass
+    return subdirs
 
 
-def find_web_servers(rootfs: Path) -> list[ServiceBinary]:
-    """Find web server binaries."""
-    server_names = {
-        "nginx": "Nginx web server",
-        "lighttpd": "Lighttpd web server",
-        "httpd": "HTTP daemon",
-        "apache2": "Apache web server",
-        "uvicorn": "Uvicorn ASGI server",
-        "gunicorn": "Gunicorn WSGI server",
-    }
+def _scan_subtree(root: tuple[str, str]) -> RootfsIndex:
+    """Index a whole directory tree given as a (prefix, directory) pair."""
+    files: dict[str, list[str]] = {}
+    dirs: dict[str, list[str]] = {}
+    pending = [root]
+    while pending:
+        pending.extend(_scan_directory(*pending.pop(), files, dirs))
+    return RootfsIndex(files=files, dirs=dirs)
+
+
+def _scan_rootfs(rootfs: Path) -> RootfsIndex:
+    """Walk the rootfs once and index every file and directory by basename.
 
-    found_binaries = find_by_names(rootfs, server_names, file_type="file")
+    Each top-level directory is walked in its own thread; scandir and stat
+    release the GIL, so the threads overlap their filesystem latency.
+
+    Args:
+        rootfs: Path to extracted rootfs
+
+    Returns:
+        RootfsIndex shared by the find_* functions
+    """
+    files: dict[str, list[str]] = {}
+    dirs: dict[str, list[str]] = {}
+    subtrees = _scan_directory("", str(rootfs), files, dirs)
+    if subtrees:
+        max_workers = min(len(subtrees), MAX_SCAN_WORKERS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for partial in executor.map(_scan_subtree, subtrees):
+                for name, paths in partial.files.items():
+                    files.setdefault(name, []).extend(paths)
+                for name, paths in partial.dirs.items():
+                    dirs.setdefault(name, []).extend(paths)
+
+    for paths in (*files.values(), *dirs.values()):
+        paths.sort()
+    return RootfsIndex(files=files, dirs=dirs)
+
+
+def _find_binaries(index: RootfsIndex, names: dict[str, str]) -> list[ServiceBinary]:
+    """Build ServiceBinary records for each name found in the index.
+
+    An exact basename match wins; otherwise the first file whose basename
+    starts with the name is used. All prefix fallbacks are resolved in one
+    pass over the index.
+    """
+    found = {name: index.files[name][0] for name in names if name in index.files}
+    missing = tuple(name for name in names if name not in found)
+    if missing:
+        for basename, paths in index.files.items():
+            if not basename.startswith(missing):
+                continue
+            for name in missing:
+                if basename.startswith(name) and (name not in found or paths[0] < found[name]):
+                    found[name] = paths[0]
 
     return [
-        ServiceBinary(
-            name=name,
-            path=get_relative_path(rootfs, path).lstrip("/"),
-            description=server_names[name],
-        )
-        for name, path in found_binaries.items()
-        if path is not None
+        ServiceBinary(name=name, path=found[name], description=description)
+        for name, description in names.items()
+        if name in found
     ]
 
 
-def find_web_frameworks(rootfs: Path) -> list[ServiceBinary]:
+def _find_suffix(root: Path, suffix: str) -> list[str]:
+    """Recursively list files below root whose name ends with suffix.
+
+    Like ``Path.rglob()``, symlinked directories are not descended into,
+    while symlinks to files count as files.
+    """
+    found = []
+    pending = [str(root)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name.endswith(suffix) and entry.is_file():
+                        found.append(entry.path)
+        except OSError:
+            continue
+    return found
+
+
+def find_systemd_services(rootfs: Path, listings: DirListings | None = None) -> list[str]:
+    """Find systemd service files below the systemd unit directories.
+
+    Unit directories reached through a symlink are scanned only if the
+    symlink resolves inside the rootfs, and only once.
+    """
+    if listings is None:
+        listings = DirListings(rootfs)
+
+    services: list[str] = []
+    real_rootfs = rootfs.resolve()
+    seen: set[Path] = set()
+    # scandir paths all start with "<rootfs>/", so slicing yields the relative path
+    prefix_len = len(str(rootfs)) + 1
+    for systemd_dir in SYSTEMD_DIRS:
+        parent, _, name = systemd_dir.rpartition("/")
+        if name not in listings.names(parent):
+            continue
+        root = rootfs / systemd_dir
+        # lib may be a symlink to usr/lib on merged-/usr systems; an absolute
+        # target would point at the host's filesystem
+        resolved = root.resolve()
+        if resolved in seen or not resolved.is_relative_to(real_rootfs):
+            continue
+        seen.add(resolved)
+        services.extend(path[prefix_len:] for path in _find_suffix(root, ".service"))
+
+    return sorted(services)
+
+
+def find_web_servers(rootfs: Path, index: RootfsIndex | None = None) -> list[ServiceBinary]:
+    """Find web server binaries."""
+    if index is None:
+        index = _scan_rootfs(rootfs)
+
+    return _find_binaries(index, WEB_SERVERS)
+
+
+def find_web_frameworks(rootfs: Path, index: RootfsIndex | None = None) -> list[ServiceBinary]:
     """Find Python web frameworks."""
-    framework_patterns = {
-        "site-packages/aiohttp*": ("aiohttp", "Async HTTP framework"),
-        "site-packages/uvicorn*": ("uvicorn", "ASGI server"),
+    framework_prefixes = {
+        "aiohttp": "Async HTTP framework",
+        "uvicorn": "ASGI server",
+    }
+
+    if index is None:
+        index = _scan_rootfs(rootfs)
+
+    # Equivalent to rglob("site-packages/<name>*") restricted to directories
+    package_dirs = {
+        basename
+        for basename, paths in index.dirs.items()
+        if any(path.split("/")[-2:-1] == ["site-packages"] for path in paths)
     }
 
     frameworks = []
-    for pattern, (name, description) in framework_patterns.items():
-        found = find_files(rootfs, [pattern], file_type="dir", first_match_only=True)
-        if found:
+    for name, description in framework_prefixes.items():
+        if any(package.startswith(name) for package in package_dirs):
             frameworks.append(
                 ServiceBinary(
                     name=name,
@@ -209,172 +489,202 @@ def find_web_frameworks(rootfs: Path) -> list[ServiceBinary]:
     return frameworks
 
 
-def find_ssh_server(rootfs: Path) -> ServiceBinary | None:
-    """Find SSH server (OpenSSH or Dropbear)."""
-    ssh_servers = {
-        "sshd": "OpenSSH server",
-        "dropbear": "Dropbear SSH server",
-    }
+def find_ssh_server(rootfs: Path, index: RootfsIndex | None = None) -> ServiceBinary | None:
+    """Find SSH server (OpenSSH or Dropbear); sshd takes priority."""
+    if index is None:
+        index = _scan_rootfs(rootfs)
 
-    found_servers = find_by_names(rootfs, ssh_servers, file_type="file")
-
-    # Return first found server (sshd takes priority)
-    for name, path in found_servers.items():
-        if path is not None:
-            return ServiceBinary(
-                name=name,
-                path=get_relative_path(rootfs, path).lstrip("/"),
-                description=ssh_servers[name],
-            )
-
-    return None
+    found_servers = _find_binaries(index, SSH_SERVERS)
+    return found_servers[0] if found_servers else None
 
 
-def find_network_services(rootfs: Path) -> list[ServiceBinary]:
+def find_network_services(rootfs: Path, index: RootfsIndex | None = None) -> list[ServiceBinary]:
     """Find other network service binaries."""
-    service_names = {
-        "avahi-daemon": "mDNS/Bonjour",
-        "dnsmasq": "DNS/DHCP",
-        "hostapd": "WiFi AP",
-        "wpa_supplicant": "WiFi client",
-        "mosquitto": "MQTT broker",
-        "telnetd": "Telnet (insecure)",
-        "ftpd": "FTP server",
-        "vsftpd": "FTP server",
-        "smbd": "Samba/SMB",
-        "ntpd": "NTP",
-        "chronyd": "NTP",
-        "bluetoothd": "Bluetooth",
-        "janus": "WebRTC gateway",
-    }
+    if index is None:
+        index = _scan_rootfs(rootfs)
 
-    found_services = find_by_names(rootfs, service_names, file_type="file")
+    return _find_binaries(index, NETWORK_SERVICES)
 
-    return [
-        ServiceBinary(
-            name=name,
-            path=get_relative_path(rootfs, path).lstrip("/"),
-            description=service_names[name],
-        )
-        for name, path in found_services.items()
-        if path is not None
-    ]
 
-
-def _classify_password_hash(password_hash: str) -> tuple[str, str]:
-    """Classify a password hash and return (type, description).
+def _classify_password_hash(password_hash: bytes) -> tuple[str, bool]:
+    """Classify a password hash.
 
     Args:
-        password_hash: The password hash from /etc/shadow
+        password_hash: The raw password hash field from /etc/shadow
 
     Returns:
-        Tuple of (hash_type, description)
+        Tuple of (hash_type, unknown_prefix); hash_type is the raw prefix when
+        unknown_prefix is set. PasswordEntry.description gives the description.
     """
-    if password_hash in ("", "*", "!"):
-        return ("locked", "No password / locked")
-    if password_hash == "x":
-        return ("shadow", "Password in shadow file")
+    special = SPECIAL_PASSWORD_FIELDS.get(password_hash)
+    if special is not None:
+        return special, False
     if len(password_hash) < MIN_HASH_LENGTH:
-        return ("weak", "Weak/short hash (potential issue)")
+        return "weak", False
 
     # Identify hash type by prefix
     prefix = password_hash[:3]
-    hash_types = {
-        "$1$": ("md5", "MD5 hash (weak)"),
-        "$5$": ("sha256", "SHA-256 hash"),
-        "$6$": ("sha512", "SHA-512 hash (strong)"),
-        "$y$": ("yescrypt", "yescrypt hash (strong)"),
-    }
+    known = HASH_TYPES.get(prefix)
+    if known is not None:
+        return known, False
+    return prefix.decode(errors="replace"), True
 
-    return hash_types.get(prefix, (prefix, f"Hash present (type: {prefix})"))
+
+def _looks_textual(head: bytes) -> bool:
+    """Check whether the first bytes of a file look like text.
+
+    Args:
+        head: Up to TEXT_SNIFF_BYTES bytes from the start of the file
+
+    Returns:
+        False if head contains a NUL or too many other control bytes
+    """
+    if b"\0" in head:
+        return False
+    control_count = len(head) - len(head.translate(None, _CONTROL_BYTES))
+    return not head or control_count * MAX_CONTROL_BYTE_RATIO < len(head)
 
 
 def analyze_shadow_file(rootfs: Path) -> list[PasswordEntry]:
     """Analyze /etc/shadow for password hashes."""
     shadow_file = rootfs / "etc" / "shadow"
-    if not shadow_file.exists():
+    try:
+        content = shadow_file.read_bytes()
+    except FileNotFoundError:
+        return []
+    except OSError:
+        warn("Could not read /etc/shadow")
+        return []
+
+    if not _looks_textual(content[:TEXT_SNIFF_BYTES]):
+        warn("/etc/shadow is not a text file, skipping")
         return []
 
     entries = []
-    try:
-        with shadow_file.open() as f:
-            for line in f:
-                parts = line.strip().split(":")
-                if len(parts) < MIN_SHADOW_FIELDS:
-                    continue
+    for line in content.splitlines():
+        # Only the username and hash are needed; leave the aging fields unsplit
+        parts = line.strip().split(b":", MIN_SHADOW_FIELDS)
+        if len(parts) < MIN_SHADOW_FIELDS:
+            continue  # Blank or malformed line
+
+        hash_type, unknown_prefix = _classify_password_hash(parts[1])
+        entries.append(
+            PasswordEntry(
+                username=parts[0].decode(errors="replace"),
+                hash_type=hash_type,
+                unknown_prefix=unknown_prefix,
+            )
+        )
 
-                username = parts[0]
-                password_hash = parts[1]
+    return entries
 
-                # Classify password hash
-                hash_type, description = _classify_password_hash(password_hash)
 
-                entries.append(
-                    PasswordEntry(
-                        username=username,
-                        hash_type=hash_type,
-                        description=description,
-                    )
-                )
-    except (OSError, PermissionError):
-        warn("Could not read /etc/shadow")
+def _contains_sensitive_data(path: Path) -> bool:
+    """Check whether a text file mentions a password, secret, API key or token.
 
-    return entries
+    Lower-casing once and testing the literals with ``in`` is several times
+    faster than a case-insensitive regex; only "api.key" needs the regex.
+    """
+    with path.open("rb") as f:
+        head = f.read(TEXT_SNIFF_BYTES)
+        if not _looks_textual(head):
+            return False
+        data = head + f.read(MAX_SENSITIVE_SCAN_BYTES - len(head))
 
+    data = data.lower()
+    if any(literal in data for literal in SENSITIVE_LITERALS):
+        return True
+    return b"api" in data and SENSITIVE_API_KEY_PATTERN.search(data) is not None
 
-def find_sensitive_files(rootfs: Path) -> list[str]:
-    """Find files that might contain credentials."""
-    etc_dir = rootfs / "etc"
-    if not etc_dir.exists():
-        return []
 
-    sensitive = []
-    try:
-        result = subprocess.run(
-            ["grep", "-r", "-l", "-i", "-E", "password|secret|api.key|token", str(etc_dir)],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        for line in result.stdout.splitlines()[:20]:  # Limit to 20 files
-            try:
-                sensitive.append(str(Path(line).relative_to(rootfs)))
-            except ValueError:
-                continue
-    except (OSError, subprocess.SubprocessError):
-        warn("Could not search for sensitive files")
-
-    return sensitive
+def find_sensitive_files(rootfs: Path, listings: DirListings | None = None) -> list[str]:
+    """Find files that might contain credentials.
 
+    Scans /etc in-process, visiting entries in sorted order. Like grep -r,
+    symlinks below /etc are not followed. Binary files and files named with
+    a SENSITIVE_SKIP_SUFFIXES suffix are skipped.
+    """
+    if listings is None:
+        listings = DirListings(rootfs)
+    if "etc" not in listings.names(""):
+        return []
+    etc_dir = rootfs / "etc"
 
-def find_firewall_rules(rootfs: Path) -> list[str]:
-    """Find firewall rule files."""
-    rules = []
-    try:
-        # Look for iptables rules
-        iptables_rules = find_files(rootfs, ["*.rules"], file_type="file")
-        rules.extend(
-            [
-                get_relative_path(rootfs, rule_file).lstrip("/")
-                for rule_file in iptables_rules
-                if "iptables" in str(rule_file)
-            ]
-        )
+    sensitive: list[str] = []
+    prefix_len = len(str(rootfs)) + 1
+    pending = [str(etc_dir)]
+    while pending and len(sensitive) < MAX_SENSITIVE_FILES:
+        try:
+            with os.scandir(pending.pop()) as it:
+                entries = sorted(it, key=attrgetter("name"))
+        except OSError:
+            warn("Could not search for sensitive files")
+            continue
+
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                if entry.name.endswith(SENSITIVE_SKIP_SUFFIXES):
+                    continue
+                try:
+                    # The DirEntry stat is cached, so empty files are skipped unopened
+                    if entry.stat(follow_symlinks=False).st_size == 0:
+                        continue
+                    matched = _contains_sensitive_data(Path(entry.path))
+                except OSError:
+                    continue
+                if matched:
+                    sensitive.append(entry.path[prefix_len:])
+                    if len(sensitive) >= MAX_SENSITIVE_FILES:
+                        break
+        # Reverse so the stack pops subdirectories in sorted order
+        pending.extend(reversed(subdirs))
 
-        # Look for firewall configs
-        firewall_configs = find_files(rootfs, ["firewall*"], file_type="file")
-        rules.extend(
-            [get_relative_path(rootfs, fw_file).lstrip("/") for fw_file in firewall_configs]
-        )
-    except (OSError, PermissionError):
-        pass
+    return sensitive
 
-    # Remove duplicates and limit to 5 (already sorted by find_files)
-    return list(dict.fromkeys(rules))[:5]
 
+def find_firewall_rules(rootfs: Path, index: RootfsIndex | None = None) -> list[str]:
+    """Find firewall rule files.
 
-def _scan_network_services(analysis: NetworkServicesAnalysis, rootfs: Path) -> None:
+    iptables rule files come first, then firewall configs, each in path
+    order, up to MAX_FIREWALL_RULES unique paths.
+    """
+    if index is None:
+        index = _scan_rootfs(rootfs)
+
+    # Classify both groups in one pass over the index
+    iptables_rules: list[str] = []
+    firewall_configs: list[str] = []
+    for basename, paths in index.files.items():
+        if basename.endswith(".rules"):
+            iptables_rules.extend(path for path in paths if "iptables" in path)
+        if basename.startswith("firewall"):
+            firewall_configs.extend(paths)
+
+    # Only the first few of each group can make the cut, so avoid sorting the rest
+    rules: dict[str, None] = {}
+    for candidates in (iptables_rules, firewall_configs):
+        for path in heapq.nsmallest(MAX_FIREWALL_RULES, candidates):
+            rules.setdefault(path)
+            if len(rules) >= MAX_FIREWALL_RULES:
+                return list(rules)
+    return list(rules)
+
+
+def _scan_network_services(
+    analysis: NetworkServicesAnalysis,
+    rootfs: Path,
+    index: RootfsIndex | None = None,
+    listings: DirListings | None = None,
+) -> None:
     """Scan rootfs for network services and populate analysis fields."""
+    if index is None:
+        index = _scan_rootfs(rootfs)
+    if listings is None:
+        listings = DirListings(rootfs)
+
     analysis.init_scripts = find_init_scripts(rootfs)
     if analysis.init_scripts:
         analysis.add_metadata(
@@ -383,15 +693,15 @@ def _scan_network_services(analysis: NetworkServicesAnalysis, rootfs: Path) -> N
             "find /etc/init.d -maxdepth 1 -type f",
         )
 
-    analysis.systemd_services = find_systemd_services(rootfs)
+    analysis.systemd_services = find_systemd_services(rootfs, listings)
     if analysis.systemd_services:
         analysis.add_metadata(
             "systemd_services",
             "filesystem",
-            "find rootfs -name '*.service' -type f",
+            "find etc/systemd lib/systemd usr/lib/systemd -name '*.service' -xtype f",
         )
 
-    analysis.web_servers = find_web_servers(rootfs)
+    analysis.web_servers = find_web_servers(rootfs, index)
     if analysis.web_servers:
         analysis.add_metadata(
             "web_servers",
@@ -399,7 +709,7 @@ def _scan_network_services(analysis: NetworkServicesAnalysis, rootfs: Path) -> N
             "find rootfs for nginx, lighttpd, httpd, apache2, uvicorn, gunicorn",
         )
 
-    analysis.web_frameworks = find_web_frameworks(rootfs)
+    analysis.web_frameworks = find_web_frameworks(rootfs, index)
     if analysis.web_frameworks:
         analysis.add_metadata(
             "web_frameworks",
@@ -407,7 +717,7 @@ def _scan_network_services(analysis: NetworkServicesAnalysis, rootfs: Path) -> N
             "find rootfs -path '*/site-packages/aiohttp*' or uvicorn*",
         )
 
-    analysis.ssh_server = find_ssh_server(rootfs)
+    analysis.ssh_server = find_ssh_server(rootfs, index)
     if analysis.ssh_server:
         analysis.add_metadata(
             "ssh_server",
@@ -415,7 +725,7 @@ def _scan_network_services(analysis: NetworkServicesAnalysis, rootfs: Path) -> N
             "find rootfs for sshd or dropbear",
         )
 
-    analysis.network_services = find_network_services(rootfs)
+    analysis.network_services = find_network_services(rootfs, index)
     if analysis.network_services:
         analysis.add_metadata(
             "network_services",
@@ -469,6 +779,8 @@ def analyze_firmware(firmware_path: str, rootfs: Path) -> NetworkServicesAnalysi
         NetworkServicesAnalysis object with findings
     """
     firmware = Path(firmware_path)
+    # Directory listings are shared by every existence check in this run
+    listings = DirListings(rootfs)
 
     # Create analysis object
     analysis = NetworkServicesAnalysis(
@@ -481,15 +793,22 @@ def analyze_firmware(firmware_path: str, rootfs: Path) -> NetworkServicesAnalysi
     analysis.add_metadata("firmware_size", "filesystem", "Path(firmware).stat().st_size")
     analysis.add_metadata("rootfs_path", "binwalk", "find squashfs-root in extracted firmware")
 
-    # Scan for network services
-    section("Scanning for network services")
-    _scan_network_services(analysis, rootfs)
+    # The /etc content scan is independent of the rootfs index, so run it in a
+    # worker while the index is walked. The worker gets its own listings, as a
+    # DirListings cache is not safe to fill from two threads.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        sensitive_future = executor.submit(find_sensitive_files, rootfs)
+
+        # Scan for network services
+        section("Scanning for network services")
+        index = _scan_rootfs(rootfs)
+        _scan_network_services(analysis, rootfs, index, listings)
 
     # Security analysis
     section("Security analysis")
 
-    passwd_file = rootfs / "etc" / "passwd"
-    analysis.passwd_file_exists = passwd_file.exists()
+    etc_names = listings.names("etc")
+    analysis.passwd_file_exists = "passwd" in etc_names
     if analysis.passwd_file_exists:
         analysis.add_metadata(
             "passwd_file_exists",
@@ -497,8 +816,7 @@ def analyze_firmware(firmware_path: str, rootfs: Path) -> NetworkServicesAnalysi
             "check if /etc/passwd exists",
         )
 
-    shadow_file = rootfs / "etc" / "shadow"
-    analysis.shadow_file_exists = shadow_file.exists()
+    analysis.shadow_file_exists = "shadow" in etc_names
     if analysis.shadow_file_exists:
         analysis.add_metadata(
             "shadow_file_exists",
@@ -514,7 +832,7 @@ def analyze_firmware(firmware_path: str, rootfs: Path) -> NetworkServicesAnalysi
             )
 
     # Find sensitive files
-    analysis.sensitive_files = find_sensitive_files(rootfs)
+    analysis.sensitive_files = sensitive_future.result()
     if analysis.sensitive_files:
         analysis.add_metadata(
             "sensitive_files",
@@ -525,8 +843,8 @@ def analyze_firmware(firmware_path: str, rootfs: Path) -> NetworkServicesAnalysi
     # Network configuration
     section("Network configuration")
 
-    network_interfaces = rootfs / "etc" / "network" / "interfaces"
-    analysis.network_interfaces_exists = network_interfaces.exists()
+    network_names = listings.names("etc/network") if "network" in etc_names else ()
+    analysis.network_interfaces_exists = "interfaces" in network_names
     if analysis.network_interfaces_exists:
         analysis.add_metadata(
             "network_interfaces_exists",
@@ -535,7 +853,7 @@ def analyze_firmware(firmware_path: str, rootfs: Path) -> NetworkServicesAnalysi
         )
 
     # Find firewall rules
-    analysis.firewall_rules = find_firewall_rules(rootfs)
+    analysis.firewall_rules = find_firewall_rules(rootfs, index)
     if analysis.firewall_rules:
         analysis.add_metadata(
             "firewall_rules",
@@ -561,6 +879,20 @@ def analyze_firmware(firmware_path: str, rootfs: Path) -> NetworkServicesAnalysi
     return analysis
 
 
+def _analysis_from_dict(data: dict[str, Any]) -> NetworkServicesAnalysis:
+    """Rebuild a cached analysis from its asdict() form.
+
+    Record tuples are stored as JSON arrays.
+    """
+    for key in ("web_servers", "web_frameworks", "network_services"):
+        data[key] = [ServiceBinary(*s) for s in data[key]]
+    data["init_scripts"] = [InitScript(*s) for s in data["init_scripts"]]
+    data["password_entries"] = [PasswordEntry(*p) for p in data["password_entries"]]
+    if data["ssh_server"]:
+        data["ssh_server"] = ServiceBinary(*data["ssh_server"])
+    return NetworkServicesAnalysis(**data)
+
+
 # Field order for TOML output
 SIMPLE_FIELDS = [
     "firmware_file",
@@ -602,14 +934,21 @@ class NetworkServicesScript(AnalysisScript):
     def analyze(self, firmware_path: str) -> AnalysisBase:
         """Run network services analysis on firmware.
 
+        With FW_ANALYSIS_CACHE set, an earlier result for the same firmware
+        and analyzer source is reused instead of extracting and scanning.
+
         Args:
             firmware_path: Path to firmware file
 
         Returns:
             NetworkServicesAnalysis results
         """
-        _, rootfs = self.initialize_extraction(firmware_path)
-        return analyze_firmware(firmware_path, rootfs)
+
+        def run() -> NetworkServicesAnalysis:
+            _, rootfs = self.initialize_extraction(firmware_path)
+            return analyze_firmware(firmware_path, rootfs)
+
+        return cached_analysis(self.work_dir, firmware_path, __file__, _analysis_from_dict, run)
 
 
 if __name__ == "__main__":
@@ -16,25 +16,110 @@ Arguments:
     --format FORMAT   Output format: 'toml' (default) or 'json'
 """
 
+import mmap
+import os
+import re
 import subprocess
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass, field
+from fnmatch import translate
+from functools import lru_cache
+from operator import attrgetter
 from pathlib import Path
 from typing import Any
 
 from lib.analysis_base import AnalysisBase
+from lib.analysis_cache import cached_analysis
 from lib.base_script import AnalysisScript
-from lib.finders import (
-    find_and_create,
-    find_files,
-    get_file_size,
-    get_relative_path,
-)
+from lib.finders import PRUNED_DIR_NAMES, PRUNED_ROOT_DIRS
 from lib.logging import section, warn
 
 # Constants
 MAX_INTERESTING_STRINGS = 20  # Maximum number of interesting strings to extract
+MAX_KERNEL_MODULES = 30  # Maximum number of kernel modules to report
+MAX_FIRMWARE_BLOBS = 50  # Maximum number of /lib/firmware blobs to report
+MIN_STRING_LENGTH = 4  # Shortest printable run reported, like strings(1)
+
+# ELF header fields decoded for the file type, as named by file(1)
+ELF_HEADER_SIZE = 18  # e_ident plus e_type
+ELF_CLASSES = {1: "32-bit", 2: "64-bit"}
+ELF_BYTE_ORDERS = {1: "LSB", 2: "MSB"}
+ELF_TYPES = {1: "relocatable", 2: "executable", 3: "shared object", 4: "core file"}
+
+# Characters strings(1) treats as printable: ASCII graphic characters, space and tab
+_PRINTABLE = frozenset([0x09, *range(0x20, 0x7F)])
+
+# Keywords that make a printable string interesting; each is longer than
+# MIN_STRING_LENGTH, so any run containing one is reported by strings(1)
+INTERESTING_KEYWORDS = ("copyright", "version", "rockchip", "license", "build")
+_KEYWORD_PATTERN = re.compile(
+    b"|".join(keyword.encode() for keyword in INTERESTING_KEYWORDS), re.IGNORECASE
+)
+_NON_PRINTABLE = re.compile(rb"[^\t\x20-\x7e]")
+
+
+def _string_pattern(text: str) -> re.Pattern[bytes]:
+    """Compile a case-insensitive search for text as strings(1) would print it.
+
+    Text shorter than MIN_STRING_LENGTH only counts when printable
+    neighbours make up a long enough run, so lookarounds require them.
+
+    Args:
+        text: Printable ASCII text to look for
+
+    Returns:
+        Compiled bytes pattern for searching raw or memory-mapped contents
+    """
+    needle = re.escape(text)
+    missing = MIN_STRING_LENGTH - len(text)
+    if missing <= 0:
+        return re.compile(needle.encode(), re.IGNORECASE)
+    printable = r"[\t\x20-\x7e]"
+    alternatives = (
+        f"(?<={printable}{{{before}}}){needle}(?={printable}{{{missing - before}}})"
+        for before in range(missing + 1)
+    )
+    return re.compile("|".join(alternatives).encode(), re.IGNORECASE)
+
+
+_GPL_PATTERN = _string_pattern("gpl")
+
+
+# Rockchip library categories: analysis field -> (glob patterns, purpose prefix)
+LIBRARY_CATEGORIES: dict[str, tuple[list[str], str]] = {
+    "mpp_libraries": (["librockchip_mpp.so*", "libmpp.so*", "librk_mpi.so*"], "Video codec"),
+    "rga_libraries": (["librga.so*", "librockchip_rga.so*"], "2D graphics"),
+    "isp_libraries": (["librkaiq.so*", "librkisp.so*", "librk_aiq.so*"], "Camera ISP"),
+    "npu_libraries": (["librknn_runtime.so*", "librknnrt.so*"], "AI inference"),
+}
 
+
+# Source metadata (source, method) for the fields every analysis reports
+_FIELD_METADATA: dict[str, tuple[str, str]] = {
+    "firmware_file": ("filesystem", "Path(firmware).name"),
+    "rootfs_path": ("binwalk", "find extracted squashfs-root"),
+    **{
+        field_name: (
+            "filesystem+strings",
+            f"find rootfs -name {' -o -name '.join(repr(p) for p in patterns)}"
+            " && strings <lib> | grep -iE license patterns",
+        )
+        for field_name, (patterns, _) in LIBRARY_CATEGORIES.items()
+    },
+    "all_rockchip_libs": (
+        "filesystem",
+        "find rootfs -name 'librockchip*' -o -name 'librk*' -o -name '*rga*' -o -name '*mpp*'",
+    ),
+    "wifi_bt_blobs": (
+        "filesystem",
+        "find rootfs -name 'bcmdhd*' -o -name 'fw_bcm*' -o -name 'brcmfmac*' -o -name 'rtl*'",
+    ),
+    "firmware_blobs": ("filesystem", "find rootfs/lib/firmware -type f"),
+    "kernel_modules": ("filesystem", "find rootfs -name '*.ko' | strings | grep -i GPL"),
+    "rockchip_count": ("filesystem", "count all_rockchip_libs results"),
+    "firmware_blob_count": ("filesystem", "count firmware_blobs results"),
+    "kernel_module_count": ("filesystem", "count kernel_modules results"),
+}
 # License string patterns used to identify open-source licenses in binaries
 _LICENSE_PATTERNS: list[tuple[str, str]] = [
     ("licensed under the apache", "Apache license header found"),
@@ -47,6 +132,9 @@ _LICENSE_PATTERNS: list[tuple[str, str]] = [
     ("mit license", "MIT license string found"),
     ("mozilla public license", "MPL license string found"),
 ]
+_LICENSE_SEARCHES = [
+    (_string_pattern(pattern), evidence) for pattern, evidence in _LICENSE_PATTERNS
+]
 
 
 @dataclass(frozen=True, slots=True)
@@ -89,6 +177,69 @@ class BinaryAnalysis:
     interesting_strings: list[str] = field(default_factory=list)
 
 
+@dataclass(frozen=True, slots=True)
+class RootfsFile:
+    """A regular file found by walk_rootfs()."""
+
+    path: str  # Path relative to rootfs, with leading slash
+    name: str  # Filename
+    size: int  # Size in bytes
+
+
+# Every regular file in the rootfs, in path order
+RootfsFiles = list[RootfsFile]
+
+
+def _path_order(file: RootfsFile) -> str:
+    """Sort key ordering relative paths component by component, like Path."""
+    return file.path.replace("/", "\0")
+
+
+# Serialized keys of each record type, read in one attrgetter call per record
+_LIBRARY_KEYS = ("name", "path", "size", "purpose", "license", "license_evidence")
+_BLOB_KEYS = ("name", "path", "size")
+_MODULE_KEYS = ("name", "path", "size", "has_gpl")
+_BINARY_ANALYSIS_KEYS = ("library_name", "file_type", "interesting_strings")
+
+_get_library_fields = attrgetter(*_LIBRARY_KEYS)
+_get_blob_fields = attrgetter(*_BLOB_KEYS)
+_get_module_fields = attrgetter(*_MODULE_KEYS)
+_get_binary_analysis_fields = attrgetter(*_BINARY_ANALYSIS_KEYS)
+
+
+def _libraries_to_dicts(libraries: list[LibraryInfo]) -> list[dict[str, Any]]:
+    """Convert library records to dictionaries."""
+    return [dict(zip(_LIBRARY_KEYS, _get_library_fields(lib), strict=True)) for lib in libraries]
+
+
+def _blobs_to_dicts(blobs: list[FirmwareBlob]) -> list[dict[str, Any]]:
+    """Convert firmware blob records to dictionaries."""
+    return [dict(zip(_BLOB_KEYS, _get_blob_fields(blob), strict=True)) for blob in blobs]
+
+
+def _modules_to_dicts(modules: list[KernelModule]) -> list[dict[str, Any]]:
+    """Convert kernel module records to dictionaries."""
+    return [dict(zip(_MODULE_KEYS, _get_module_fields(mod), strict=True)) for mod in modules]
+
+
+def _binary_analysis_to_dict(analysis: BinaryAnalysis) -> dict[str, Any]:
+    """Convert a binary analysis record to a dictionary."""
+    return dict(zip(_BINARY_ANALYSIS_KEYS, _get_binary_analysis_fields(analysis), strict=True))
+
+
+# to_dict() converters for the record-valued analysis fields
+_FIELD_CONVERTERS: dict[str, Callable[[Any], Any]] = {
+    "mpp_libraries": _libraries_to_dicts,
+    "rga_libraries": _libraries_to_dicts,
+    "isp_libraries": _libraries_to_dicts,
+    "npu_libraries": _libraries_to_dicts,
+    "wifi_bt_blobs": _blobs_to_dicts,
+    "firmware_blobs": _blobs_to_dicts,
+    "kernel_modules": _modules_to_dicts,
+    "binary_analysis": _binary_analysis_to_dict,
+}
+
+
 @dataclass(slots=True)
 class ProprietaryBlobsAnalysis(AnalysisBase):
     """Results of proprietary blobs analysis."""
@@ -124,49 +275,20 @@ class ProprietaryBlobsAnalysis(AnalysisBase):
 
     def _convert_complex_field(self, key: str, value: Any) -> tuple[bool, Any]:
         """Convert complex fields to serializable format."""
-        if key in {"mpp_libraries", "rga_libraries", "isp_libraries", "npu_libraries"}:
-            return True, [
-                {
-                    "name": lib.name,
-                    "path": lib.path,
-                    "size": lib.size,
-                    "purpose": lib.purpose,
-                    "license": lib.license,
-                    "license_evidence": lib.license_evidence,
-                }
-                for lib in value
-            ]
-        if key in {"wifi_bt_blobs", "firmware_blobs"}:
-            return True, [
-                {"name": blob.name, "path": blob.path, "size": blob.size} for blob in value
-            ]
-        if key == "kernel_modules":
-            return True, [
-                {
-                    "name": mod.name,
-                    "path": mod.path,
-                    "size": mod.size,
-                    "has_gpl": mod.has_gpl,
-                }
-                for mod in value
-            ]
-        if key == "binary_analysis" and value is not None:
-            return True, {
-                "library_name": value.library_name,
-                "file_type": value.file_type,
-                "interesting_strings": value.interesting_strings,
-            }
-        return False, None
+        converter = _FIELD_CONVERTERS.get(key)
+        if converter is None:
+            return False, None
+        return True, converter(value)
 
 
 def classify_license(lib_file: Path) -> tuple[str, str]:
     """Classify the license of a library by examining its string content.
 
-    Runs ``strings`` on the binary and searches for known license patterns
-    (Apache, GPL, LGPL, BSD, MIT, MPL).  When a match is found the library
-    is labelled ``"open_source"``; when ``strings`` succeeds but nothing
-    matches it is labelled ``"proprietary"``; on error it falls back to
-    ``"unknown"``.
+    Searches a memory map of the binary, like ``strings | grep -i``, for
+    known license patterns (Apache, GPL, LGPL, BSD, MIT, MPL).  When a match
+    is found the library is labelled ``"open_source"``; when the file reads
+    but nothing matches it is labelled ``"proprietary"``; on error it falls
+    back to ``"unknown"``.
 
     Args:
         lib_file: Path to library file on disk
@@ -175,55 +297,143 @@ def classify_license(lib_file: Path) -> tuple[str, str]:
         Tuple of (license_label, evidence_string) where label is one of
         "open_source", "proprietary", or "unknown"
     """
-    if not lib_file.exists():
+    try:
+        with lib_file.open("rb") as f:
+            # Empty files cannot be mapped, and hold no license strings anyway
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # Check for known open-source license patterns
+                    for pattern, evidence_desc in _LICENSE_SEARCHES:
+                        if pattern.search(mm):
+                            return "open_source", evidence_desc
+    except FileNotFoundError:
         return "unknown", "file not found"
+    except OSError as e:
+        warn(f"Failed to classify license for {lib_file.name}: {e}")
+        return "unknown", f"error: {e}"
 
-    try:
-        result = subprocess.run(
-            ["strings", str(lib_file)], capture_output=True, text=True, check=False
-        )
+    # No license strings found - likely proprietary
+    return "proprietary", "no license strings found in binary"
 
-        if result.returncode != 0:
-            return "unknown", "strings command failed"
 
-        output_lower = result.stdout.lower()
+def walk_rootfs(rootfs: Path) -> RootfsFiles:
+    """Collect every regular file in the rootfs, with its size, in one traversal.
 
-        # Check for known open-source license patterns
-        for pattern, evidence_desc in _LICENSE_PATTERNS:
-            if pattern in output_lower:
-                return "open_source", evidence_desc
+    Like ``Path.rglob()``, symlinked directories are not descended into;
+    symlinks to files are listed with the size of their target. Pruned
+    directories (PRUNED_ROOT_DIRS, PRUNED_DIR_NAMES) are skipped before
+    they are scanned. Relative
+    paths are sliced off the scandir paths rather than built per file with
+    ``Path.relative_to()``.
 
-        # No license strings found - likely proprietary
-        return "proprietary", "no license strings found in binary"
+    Args:
+        rootfs: Path to rootfs directory
 
-    except (OSError, subprocess.SubprocessError) as e:
-        warn(f"Failed to classify license for {lib_file.name}: {e}")
-        return "unknown", f"error: {e}"
+    Returns:
+        RootfsFile records sorted by path
+    """
+    root = str(rootfs).rstrip("/")
+    prefix_len = len(root)
+    files: RootfsFiles = []
+    pending = [root or "/"]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            if not (
+                                entry.name in PRUNED_DIR_NAMES
+                                or entry.path[prefix_len + 1 :] in PRUNED_ROOT_DIRS
+                                or entry.is_symlink()
+                            ):
+                                pending.append(entry.path)
+                        elif entry.is_file():
+                            files.append(
+                                RootfsFile(
+                                    path=entry.path[prefix_len:],
+                                    name=entry.name,
+                                    size=entry.stat().st_size,
+                                )
+                            )
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+    files.sort(key=_path_order)
+    return files
+
+
+@lru_cache(maxsize=32)
+def _compile_patterns(patterns: tuple[str, ...]) -> re.Pattern[str]:
+    """Compile glob patterns into one case-sensitive regex matching any of them."""
+    return re.compile("|".join(f"(?:{translate(pattern)})" for pattern in patterns))
+
+
+def _match_files(
+    files: RootfsFiles,
+    patterns: list[str],
+    exclude_patterns: list[str] | None = None,
+    first_match_only: bool = False,
+) -> RootfsFiles:
+    """Select files whose name matches any of the glob patterns.
+
+    Mirrors ``lib.finders.find_files`` on a prebuilt file list, so several
+    finders can share one rootfs traversal. All patterns are tested in one
+    regex match per file.
+
+    Args:
+        files: Output of walk_rootfs()
+        patterns: Glob patterns matched against file names
+        exclude_patterns: Optional glob patterns of file names to skip
+        first_match_only: If True, keep only the first new match per pattern
 
+    Returns:
+        Deduplicated RootfsFile records sorted by path
+    """
+    included = _compile_patterns(tuple(patterns)).match
+    excluded = _compile_patterns(tuple(exclude_patterns)).match if exclude_patterns else None
+    candidates = [
+        file for file in files if included(file.name) and not (excluded and excluded(file.name))
+    ]
+    if not first_match_only:
+        return candidates
+
+    # Only the few candidates need the per-pattern pass
+    found: dict[str, RootfsFile] = {}
+    for pattern in patterns:
+        matches = _compile_patterns((pattern,)).match
+        for file in candidates:
+            if file.path not in found and matches(file.name):
+                found[file.path] = file
+                break
+
+    return sorted(found.values(), key=_path_order)
 
-def _create_library_info(purpose_prefix: str) -> Callable[[Path, Path], "LibraryInfo"]:
-    """Create a LibraryInfo creator function for find_and_create.
+
+def _create_library_info(purpose_prefix: str) -> Callable[[Path, RootfsFile], "LibraryInfo"]:
+    """Create a LibraryInfo creator function for matched library files.
 
     Args:
         purpose_prefix: Prefix for purpose description
 
     Returns:
-        Creator function that takes (rootfs, path) and returns LibraryInfo
+        Creator function that takes (rootfs, file) and returns LibraryInfo
     """
 
-    def creator(rootfs: Path, path: Path) -> LibraryInfo:
-        """Create a LibraryInfo from a found library path."""
-        size = get_file_size(path)
-        rel_path = get_relative_path(rootfs, path)
+    def creator(rootfs: Path, file: RootfsFile) -> LibraryInfo:
+        """Create a LibraryInfo from a found library file."""
+        size = file.size
         # Extract base library name without version
-        base_name = path.name.split(".so")[0] + ".so"
+        base_name = file.name.split(".so")[0] + ".so"
 
         # Classify license from the actual file on disk
-        license_label, license_evidence = classify_license(path)
+        license_label, license_evidence = classify_license(rootfs / file.path[1:])
 
         return LibraryInfo(
             name=base_name,
-            path=rel_path,
+            path=file.path,
             size=size,
             purpose=f"{purpose_prefix} ({size} bytes)",
             license=license_label,
@@ -233,57 +443,62 @@ def _create_library_info(purpose_prefix: str) -> Callable[[Path, Path], "Library
     return creator
 
 
-def find_libraries(rootfs: Path, patterns: list[str], purpose_prefix: str) -> list[LibraryInfo]:
+def find_libraries(
+    rootfs: Path,
+    patterns: list[str],
+    purpose_prefix: str,
+    files: RootfsFiles | None = None,
+) -> list[LibraryInfo]:
     """Find libraries matching patterns in rootfs.
 
     Args:
         rootfs: Path to rootfs directory
         patterns: List of glob patterns to search for
         purpose_prefix: Prefix for purpose description
+        files: Prebuilt walk_rootfs() listing (walks the rootfs if omitted)
 
     Returns:
         List of LibraryInfo objects for found libraries
     """
-    return find_and_create(
-        rootfs,
-        patterns,
-        _create_library_info(purpose_prefix),
-        file_type="file",
-        first_match_only=True,
-    )
+    if files is None:
+        files = walk_rootfs(rootfs)
+
+    create = _create_library_info(purpose_prefix)
+    return [create(rootfs, file) for file in _match_files(files, patterns, first_match_only=True)]
 
 
-def find_all_rockchip_libs(rootfs: Path) -> list[str]:
+def find_all_rockchip_libs(rootfs: Path, files: RootfsFiles | None = None) -> list[str]:
     """Find all Rockchip libraries in rootfs.
 
     Args:
         rootfs: Path to rootfs directory
+        files: Prebuilt walk_rootfs() listing (walks the rootfs if omitted)
 
     Returns:
         List of paths relative to rootfs
     """
+    if files is None:
+        files = walk_rootfs(rootfs)
+
     # Search patterns for Rockchip libraries
     patterns = ["librockchip*", "librk*", "*rga*", "*mpp*"]
 
-    found_paths = find_files(
-        rootfs,
-        patterns,
-        exclude_patterns=["*.pyc"],
-        file_type="file",
-    )
-
-    return [get_relative_path(rootfs, path) for path in found_paths]
+    return [file.path for file in _match_files(files, patterns, exclude_patterns=["*.pyc"])]
 
 
-def find_wifi_bt_blobs(rootfs: Path) -> list[FirmwareBlob]:
+def find_wifi_bt_blobs(rootfs: Path, files: RootfsFiles | None = None) -> list[FirmwareBlob]:
     """Find WiFi/Bluetooth firmware blobs.
 
     Args:
         rootfs: Path to rootfs directory
+        files: Prebuilt walk_rootfs() listing (walks the rootfs if omitted)
 
     Returns:
         List of FirmwareBlob objects
     """
+    if files is None:
+        files = walk_rootfs(rootfs)
+
     # Broadcom/Cypress WiFi patterns
     bcm_patterns = ["bcmdhd*.ko", "fw_bcm*.bin", "nvram*.txt", "brcmfmac*.bin"]
 
@@ -292,54 +507,70 @@ def find_wifi_bt_blobs(rootfs: Path) -> list[FirmwareBlob]:
 
     all_patterns = bcm_patterns + rtl_patterns
 
-    def create_blob(rootfs: Path, path: Path) -> FirmwareBlob:
-        """Create a FirmwareBlob from a found firmware binary path."""
-        return FirmwareBlob(
-            name=path.name,
-            path=get_relative_path(rootfs, path),
-            size=get_file_size(path),
-        )
+    return [
+        FirmwareBlob(name=file.name, path=file.path, size=file.size)
+        for file in _match_files(files, all_patterns, first_match_only=True)
+    ]
 
-    return find_and_create(
-        rootfs,
-        all_patterns,
-        create_blob,
-        file_type="file",
-        first_match_only=True,
-    )
+
+def _iter_files_in_path_order(directory: str) -> Iterator[os.DirEntry[str]]:
+    """Yield the regular files below a directory lazily, in sorted path order.
+
+    Entries are visited depth first with each directory sorted by name,
+    which is the order ``sorted(Path.rglob("*"))`` gives, so callers can
+    stop early. Symlinked directories are not descended into.
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=attrgetter("name"))
+    except OSError:
+        return
+
+    for entry in entries:
+        try:
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    yield from _iter_files_in_path_order(entry.path)
+            elif entry.is_file():
+                yield entry
+        except OSError:
+            continue
 
 
 def find_firmware_blobs(rootfs: Path) -> list[FirmwareBlob]:
     """Find firmware blobs in /lib/firmware.
 
+    The walk stops once MAX_FIRMWARE_BLOBS files have been found.
+
     Args:
         rootfs: Path to rootfs directory
 
     Returns:
-        List of FirmwareBlob objects
+        List of FirmwareBlob objects (limited to MAX_FIRMWARE_BLOBS)
     """
     firmware_dir = rootfs / "lib" / "firmware"
+    prefix_len = len(str(rootfs).rstrip("/"))
 
-    if not firmware_dir.exists():
-        return []
-
-    # Find all files in firmware directory
-    found_paths = find_files(firmware_dir, ["*"], file_type="file")
+    blobs = []
+    for entry in _iter_files_in_path_order(str(firmware_dir)):
+        try:
+            size = entry.stat().st_size
+        except OSError:
+            continue
+        blobs.append(FirmwareBlob(name=entry.name, path=entry.path[prefix_len:], size=size))
+        if len(blobs) >= MAX_FIRMWARE_BLOBS:
+            break
 
-    # Convert to FirmwareBlob objects (limit to first 50)
-    return [
-        FirmwareBlob(
-            name=path.name,
-            path=get_relative_path(rootfs, path),
-            size=get_file_size(path),
-        )
-        for path in found_paths[:50]
-    ]
+    return blobs
 
 
 def has_gpl_string(ko_file: Path) -> bool:
     """Check if kernel module contains GPL string.
 
+    Searches a memory map of the module instead of running ``strings``.
+    Like ``strings | grep -i gpl``, a match only counts inside a run of at
+    least MIN_STRING_LENGTH printable characters.
+
     Args:
         ko_file: Path to .ko kernel module file
 
@@ -347,79 +578,162 @@ def has_gpl_string(ko_file: Path) -> bool:
         True if module contains "GPL" string (case-insensitive)
     """
     try:
-        result = subprocess.run(
-            ["strings", str(ko_file)], capture_output=True, text=True, check=False
-        )
-        return "gpl" in result.stdout.lower()
-    except (OSError, subprocess.SubprocessError) as e:
+        with ko_file.open("rb") as f:
+            # Empty files cannot be mapped, and hold no strings anyway
+            if not os.fstat(f.fileno()).st_size:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _GPL_PATTERN.search(mm) is not None
+    except OSError as e:
         warn(f"Failed to check GPL string in {ko_file.name}: {e}")
         return False
 
 
-def find_kernel_modules(rootfs: Path) -> list[KernelModule]:
+def find_kernel_modules(rootfs: Path, files: RootfsFiles | None = None) -> list[KernelModule]:
     """Find kernel modules (.ko files).
 
+    Only the first MAX_KERNEL_MODULES modules by path are checked for a GPL
+    string, since the rest are not reported.
+
     Args:
         rootfs: Path to rootfs directory
+        files: Prebuilt walk_rootfs() listing (walks the rootfs if omitted)
 
     Returns:
-        List of KernelModule objects (limited to 30)
+        List of KernelModule objects (limited to MAX_KERNEL_MODULES)
     """
+    if files is None:
+        files = walk_rootfs(rootfs)
 
-    def create_module(rootfs: Path, path: Path) -> KernelModule:
-        """Create a KernelModule from a found .ko path."""
-        return KernelModule(
-            name=path.name,
-            path=get_relative_path(rootfs, path),
-            size=get_file_size(path),
-            has_gpl=has_gpl_string(path),
+    return [
+        KernelModule(
+            name=file.name,
+            path=file.path,
+            size=file.size,
+            has_gpl=has_gpl_string(rootfs / file.path[1:]),
         )
+        for file in _match_files(files, ["*.ko"])[:MAX_KERNEL_MODULES]
+    ]
 
-    modules = find_and_create(rootfs, ["*.ko"], create_module, file_type="file")
 
-    # Limit to first 30
-    return modules[:30]
+def _find_interesting_strings(data: bytes | mmap.mmap) -> list[str]:
+    """Extract printable strings that mention an interesting keyword.
 
+    One case-insensitive regex over all keywords scans the raw bytes; only
+    a hit is widened to its enclosing printable run, so the rest of the
+    binary is never split into strings or lower-cased.
 
-def analyze_binary(lib_file: Path) -> BinaryAnalysis | None:
-    """Analyze a binary library file.
+    Args:
+        data: Binary contents to scan
+
+    Returns:
+        Up to MAX_INTERESTING_STRINGS stripped strings, in file order
+    """
+    interesting_strings: list[str] = []
+    pos = 0
+    while len(interesting_strings) < MAX_INTERESTING_STRINGS:
+        hit = _KEYWORD_PATTERN.search(data, pos)
+        if hit is None:
+            break
+
+        start = hit.start()
+        while start > 0 and data[start - 1] in _PRINTABLE:
+            start -= 1
+        run_end = _NON_PRINTABLE.search(data, hit.end())
+        end = run_end.start() if run_end else len(data)
+
+        interesting_strings.append(data[start:end].decode("ascii").strip())
+        # Further keywords in the same run belong to the string just reported
+        pos = end
+    return interesting_strings
+
+
+def _elf_file_type(header: bytes) -> str | None:
+    """Describe an ELF header the way ``file -b`` starts its output.
+
+    ET_DYN is reported as a shared object, which is right for the libraries
+    analyzed here; file(1) would call a position-independent executable a
+    "pie executable" after reading its dynamic section.
 
     Args:
-        lib_file: Path to library file
+        header: First ELF_HEADER_SIZE bytes of a file
 
     Returns:
-        BinaryAnalysis object or None if analysis fails
+        Description such as "ELF 32-bit LSB shared object", or None if the
+        header is not a recognized ELF header
     """
-    if not lib_file.exists():
+    if len(header) < ELF_HEADER_SIZE or not header.startswith(b"\x7fELF"):
+        return None
+    elf_class = ELF_CLASSES.get(header[4])
+    byte_order = ELF_BYTE_ORDERS.get(header[5])
+    if elf_class is None or byte_order is None:
+        return None
+    e_type = int.from_bytes(header[16:18], "little" if byte_order == "LSB" else "big")
+    elf_type = ELF_TYPES.get(e_type)
+    if elf_type is None:
         return None
+    return f"ELF {elf_class} {byte_order} {elf_type}"
+
+
+def _file_type(lib_file: Path) -> str:
+    """Determine a file's type, as the first field of ``file -b`` output.
+
+    Symlinks and ELF headers are decoded in-process; only other files run
+    ``file``.
+
+    Args:
+        lib_file: Path to library file
+
+    Returns:
+        File type description, or "unknown" if it cannot be determined
+    """
+    try:
+        if lib_file.is_symlink():
+            return f"symbolic link to {lib_file.readlink()}"
+        with lib_file.open("rb") as f:
+            elf_type = _elf_file_type(f.read(ELF_HEADER_SIZE))
+        if elf_type is not None:
+            return elf_type
+    except OSError:
+        pass  # Let file report what it can
 
-    # Get file type
     try:
         file_result = subprocess.run(
             ["file", "-b", str(lib_file)], capture_output=True, text=True, check=False
         )
-        file_type = file_result.stdout.strip().split(",")[0] if file_result.stdout else "unknown"
+        return file_result.stdout.strip().split(",")[0] if file_result.stdout else "unknown"
     except (OSError, subprocess.SubprocessError) as e:
         warn(f"Failed to determine file type for {lib_file.name}: {e}")
-        file_type = "unknown"
+        return "unknown"
+
+
+def analyze_binary(lib_file: Path) -> BinaryAnalysis | None:
+    """Analyze a binary library file.
+
+    The file type is decoded from the ELF header where possible; strings
+    are extracted in-process from a memory map of the library rather than
+    by running ``strings``.
+
+    Args:
+        lib_file: Path to library file
+
+    Returns:
+        BinaryAnalysis object or None if analysis fails
+    """
+    if not lib_file.exists():
+        return None
+
+    file_type = _file_type(lib_file)
 
     # Extract interesting strings
-    interesting_strings = []
+    interesting_strings: list[str] = []
     try:
-        strings_result = subprocess.run(
-            ["strings", str(lib_file)], capture_output=True, text=True, check=False
-        )
-
-        if strings_result.returncode == 0:
-            # Filter for interesting strings
-            keywords = ["copyright", "version", "rockchip", "license", "build"]
-            for line in strings_result.stdout.splitlines():
-                line_lower = line.lower()
-                if any(kw in line_lower for kw in keywords):
-                    interesting_strings.append(line.strip())
-                    if len(interesting_strings) >= MAX_INTERESTING_STRINGS:
-                        break
-    except (OSError, subprocess.SubprocessError) as e:
+        with lib_file.open("rb") as f:
+            # Empty files cannot be mapped, and have no strings anyway
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    interesting_strings = _find_interesting_strings(mm)
+    except OSError as e:
         warn(f"Failed to extract strings from {lib_file.name}: {e}")
 
     return BinaryAnalysis(
@@ -445,77 +759,19 @@ def analyze_proprietary_blobs(firmware_path: str, rootfs: Path) -> ProprietaryBl
 
     # Create analysis object
     analysis = ProprietaryBlobsAnalysis(firmware_file=firmware.name, rootfs_path=str(rootfs))
+    analysis.add_metadata_table(_FIELD_METADATA)
 
-    analysis.add_metadata("firmware_file", "filesystem", "Path(firmware).name")
-    analysis.add_metadata("rootfs_path", "binwalk", "find extracted squashfs-root")
-
-    # Find MPP libraries
-    mpp_patterns = ["librockchip_mpp.so*", "libmpp.so*", "librk_mpi.so*"]
-    analysis.mpp_libraries = find_libraries(rootfs, mpp_patterns, "Video codec")
-    analysis.add_metadata(
-        "mpp_libraries",
-        "filesystem+strings",
-        f"find rootfs -name {' -o -name '.join(repr(p) for p in mpp_patterns)}"
-        " && strings <lib> | grep -iE license patterns",
-    )
+    # Walk the rootfs once; the find_* functions below filter this listing
+    files = walk_rootfs(rootfs)
 
-    # Find RGA libraries
-    rga_patterns = ["librga.so*", "librockchip_rga.so*"]
-    analysis.rga_libraries = find_libraries(rootfs, rga_patterns, "2D graphics")
-    analysis.add_metadata(
-        "rga_libraries",
-        "filesystem+strings",
-        f"find rootfs -name {' -o -name '.join(repr(p) for p in rga_patterns)}"
-        " && strings <lib> | grep -iE license patterns",
-    )
-
-    # Find ISP libraries
-    isp_patterns = ["librkaiq.so*", "librkisp.so*", "librk_aiq.so*"]
-    analysis.isp_libraries = find_libraries(rootfs, isp_patterns, "Camera ISP")
-    analysis.add_metadata(
-        "isp_libraries",
-        "filesystem+strings",
-        f"find rootfs -name {' -o -name '.join(repr(p) for p in isp_patterns)}"
-        " && strings <lib> | grep -iE license patterns",
-    )
+    # Find Rockchip libraries by category
+    for field_name, (patterns, purpose) in LIBRARY_CATEGORIES.items():
+        setattr(analysis, field_name, find_libraries(rootfs, patterns, purpose, files))
 
-    # Find NPU libraries
-    npu_patterns = ["librknn_runtime.so*", "librknnrt.so*"]
-    analysis.npu_libraries = find_libraries(rootfs, npu_patterns, "AI inference")
-    analysis.add_metadata(
-        "npu_libraries",
-        "filesystem+strings",
-        f"find rootfs -name {' -o -name '.join(repr(p) for p in npu_patterns)}"
-        " && strings <lib> | grep -iE license patterns",
-    )
-
-    # Find all Rockchip libraries
-    analysis.all_rockchip_libs = find_all_rockchip_libs(rootfs)
-    analysis.add_metadata(
-        "all_rockchip_libs",
-        "filesystem",
-        "find rootfs -name 'librockchip*' -o -name 'librk*' -o -name '*rga*' -o -name '*mpp*'",
-    )
-
-    # Find WiFi/BT blobs
-    analysis.wifi_bt_blobs = find_wifi_bt_blobs(rootfs)
-    analysis.add_metadata(
-        "wifi_bt_blobs",
-        "filesystem",
-        "find rootfs -name 'bcmdhd*' -o -name 'fw_bcm*' -o -name 'brcmfmac*' -o -name 'rtl*'",
-    )
-
-    # Find firmware blobs
+    analysis.all_rockchip_libs = find_all_rockchip_libs(rootfs, files)
+    analysis.wifi_bt_blobs = find_wifi_bt_blobs(rootfs, files)
     analysis.firmware_blobs = find_firmware_blobs(rootfs)
-    analysis.add_metadata("firmware_blobs", "filesystem", "find rootfs/lib/firmware -type f")
-
-    # Find kernel modules
-    analysis.kernel_modules = find_kernel_modules(rootfs)
-    analysis.add_metadata(
-        "kernel_modules",
-        "filesystem",
-        "find rootfs -name '*.ko' | strings | grep -i GPL",
-    )
+    analysis.kernel_modules = find_kernel_modules(rootfs, files)
 
     # Binary analysis of MPP library if found
     if analysis.mpp_libraries:
@@ -536,13 +792,21 @@ def analyze_proprietary_blobs(firmware_path: str, rootfs: Path) -> ProprietaryBl
     analysis.firmware_blob_count = len(analysis.firmware_blobs)
     analysis.kernel_module_count = len(analysis.kernel_modules)
 
-    analysis.add_metadata("rockchip_count", "filesystem", "count all_rockchip_libs results")
-    analysis.add_metadata("firmware_blob_count", "filesystem", "count firmware_blobs results")
-    analysis.add_metadata("kernel_module_count", "filesystem", "count kernel_modules results")
-
     return analysis
 
 
+def _analysis_from_dict(data: dict[str, Any]) -> ProprietaryBlobsAnalysis:
+    """Rebuild a cached analysis from its asdict() form."""
+    for key in LIBRARY_CATEGORIES:
+        data[key] = [LibraryInfo(**lib) for lib in data[key]]
+    for key in ("wifi_bt_blobs", "firmware_blobs"):
+        data[key] = [FirmwareBlob(**blob) for blob in data[key]]
+    data["kernel_modules"] = [KernelModule(**mod) for mod in data["kernel_modules"]]
+    if data["binary_analysis"]:
+        data["binary_analysis"] = BinaryAnalysis(**data["binary_analysis"])
+    return ProprietaryBlobsAnalysis(**data)
+
+
 # Field order for TOML output
 SIMPLE_FIELDS = [
     "firmware_file",
@@ -580,14 +844,21 @@ class ProprietaryBlobsScript(AnalysisScript):
     def analyze(self, firmware_path: str) -> AnalysisBase:
         """Run proprietary blobs analysis on firmware.
 
+        With FW_ANALYSIS_CACHE set, an earlier result for the same firmware
+        and analyzer source is reused instead of extracting and scanning.
+
         Args:
             firmware_path: Path to firmware file
 
         Returns:
             ProprietaryBlobsAnalysis results
         """
-        _, rootfs = self.initialize_extraction(firmware_path)
-        return analyze_proprietary_blobs(firmware_path, rootfs)
+
+        def run() -> ProprietaryBlobsAnalysis:
+            _, rootfs = self.initialize_extraction(firmware_path)
+            return analyze_proprietary_blobs(firmware_path, rootfs)
+
+        return cached_analysis(self.work_dir, firmware_path, __file__, _analysis_from_dict, run)
 
 
 if __name__ == "__main__":
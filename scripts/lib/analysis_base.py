@@ -4,6 +4,7 @@ This module provides a mixin class that adds source metadata tracking
 capabilities to dataclasses.
 """
 
+from collections.abc import Mapping
 from dataclasses import fields
 from typing import Any
 
@@ -58,6 +59,24 @@ class AnalysisBase:
         self._method[field_name] = method
         self._reproducibility[field_name] = reproducibility
 
+    def add_metadata_table(
+        self,
+        metadata: Mapping[str, tuple[str, str]],
+        reproducibility: str = "software",
+    ) -> None:
+        """Add source metadata for several fields at once.
+
+        Equivalent to calling add_metadata() for each entry, for analyzers
+        whose sources and methods are fixed strings.
+
+        Args:
+            metadata: Mapping of field name to (source, method)
+            reproducibility: Reproducibility class shared by all the fields
+        """
+        self._source.update({name: source for name, (source, _) in metadata.items()})
+        self._method.update({name: method for name, (_, method) in metadata.items()})
+        self._reproducibility.update(dict.fromkeys(metadata, reproducibility))
+
     def add_hardware_metadata(
         self,
         field_name: str,
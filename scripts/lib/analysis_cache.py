@@ -0,0 +1,160 @@
+"""Opt-in on-disk cache of analysis results.
+
+Re-running an analysis on unchanged firmware normally repeats the binwalk
+extraction and the rootfs scan. Setting FW_ANALYSIS_CACHE=1 lets analysis
+scripts reuse an earlier result from their work directory instead.
+
+Cache entries are keyed by the SHA-256 of the firmware together with the
+source of the analyzer script and of scripts/lib, so changing any code that
+produces the results invalidates old entries. A cached result is identical
+to a fresh one, so the output does not depend on whether the cache was hit;
+hits are only reported in the log.
+"""
+
+import hashlib
+import json
+import os
+from collections.abc import Callable
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Protocol, TypeVar
+
+from lib.logging import info, warn
+
+CACHE_ENV = "FW_ANALYSIS_CACHE"
+CACHE_DIR = "analysis_cache"
+
+# Shared helpers whose source is part of every cache key
+LIB_DIR = Path(__file__).parent
+
+
+class CacheableAnalysis(Protocol):
+    """Analysis dataclass that can be stored in the cache."""
+
+    firmware_file: str
+
+
+AnalysisT = TypeVar("AnalysisT", bound=CacheableAnalysis)
+
+
+def cache_enabled() -> bool:
+    """Return whether the analysis cache was enabled through FW_ANALYSIS_CACHE."""
+    return bool(os.environ.get(CACHE_ENV))
+
+
+def _digest_files(*paths: Path) -> str:
+    """Compute a SHA-256 hex digest over the digests of several files."""
+    key = hashlib.sha256()
+    for path in paths:
+        with path.open("rb") as f:
+            key.update(hashlib.file_digest(f, "sha256").digest())
+    return key.hexdigest()
+
+
+def analysis_cache_key(firmware: Path, analyzer: Path) -> str:
+    """Compute the cache key for analyzing a firmware file with an analyzer.
+
+    Args:
+        firmware: Path to firmware file
+        analyzer: Path to the analyzer script's source file
+
+    Returns:
+        SHA-256 hex digest over the firmware, analyzer and scripts/lib sources
+    """
+    return _digest_files(firmware, analyzer, *sorted(LIB_DIR.glob("*.py")))
+
+
+def source_cache_key(analyzer: Path) -> str:
+    """Compute a key that changes whenever the code producing results changes.
+
+    For caches whose entries are keyed by input file rather than by firmware.
+
+    Args:
+        analyzer: Path to the analyzer script's source file
+
+    Returns:
+        SHA-256 hex digest over the analyzer and scripts/lib sources
+    """
+    return _digest_files(analyzer, *sorted(LIB_DIR.glob("*.py")))
+
+
+def load_analysis(
+    cache_file: Path, decode: Callable[[dict[str, Any]], AnalysisT]
+) -> AnalysisT | None:
+    """Load a cached analysis.
+
+    Args:
+        cache_file: Cache entry to read
+        decode: Rebuilds the analysis from its asdict() form
+
+    Returns:
+        Cached analysis, or None if missing or unreadable
+    """
+    try:
+        return decode(json.loads(cache_file.read_text()))
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def save_json(cache_file: Path, data: Any) -> None:
+    """Write JSON data to a cache file, replacing any previous file atomically.
+
+    Args:
+        cache_file: Cache file to write
+        data: JSON-serializable data
+    """
+    tmp_file = cache_file.with_suffix(".tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file.write_text(json.dumps(data))
+        tmp_file.replace(cache_file)
+    except OSError as e:
+        warn(f"Failed to write cache {cache_file}: {e}")
+
+
+def save_analysis(cache_file: Path, analysis: Any) -> None:
+    """Write an analysis to the cache, replacing any previous entry atomically.
+
+    Args:
+        cache_file: Cache entry to write
+        analysis: Completed analysis dataclass
+    """
+    save_json(cache_file, asdict(analysis))
+
+
+def cached_analysis(
+    work_dir: Path,
+    firmware_path: str,
+    analyzer: str,
+    decode: Callable[[dict[str, Any]], AnalysisT],
+    run: Callable[[], AnalysisT],
+) -> AnalysisT:
+    """Run an analysis, reusing a cached result when the cache is enabled.
+
+    Args:
+        work_dir: Working directory holding the cache
+        firmware_path: Path to firmware file
+        analyzer: Path to the analyzer script's source file (its ``__file__``)
+        decode: Rebuilds the analysis from its asdict() form
+        run: Performs the analysis on a cache miss
+
+    Returns:
+        Analysis results, either cached or freshly computed
+    """
+    if not cache_enabled():
+        return run()
+
+    firmware = Path(firmware_path)
+    analyzer_file = Path(analyzer)
+    key = analysis_cache_key(firmware, analyzer_file)
+    cache_file = work_dir / CACHE_DIR / analyzer_file.stem / f"{key}.json"
+
+    cached = load_analysis(cache_file, decode)
+    if cached is not None:
+        info(f"Using cached {analyzer_file.stem} result (key {key})")
+        cached.firmware_file = firmware.name
+        return cached
+
+    analysis = run()
+    save_analysis(cache_file, analysis)
+    return analysis
@@ -6,14 +6,196 @@ from device tree source (DTS) files. It consolidates DTS parsing logic
 that was duplicated across multiple analysis scripts.
 """
 
+import mmap
 import re
+import struct
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
+from itertools import chain
 
 # DTS parsing constants
 FIT_DESCRIPTION_MAX_LINES = 30
 SERIAL_CONFIG_CONTEXT_LINES = 10
 SERIAL_CONFIG_MAX_LINES = 20
 
+# Flattened device tree (binary DTB) constants, see the devicetree specification
+FDT_MAGIC = b"\xd0\x0d\xfe\xed"
+FDT_HEADER_FORMAT = ">8I"  # magic .. boot_cpuid_phys, present in every version
+FDT_BEGIN_NODE = 0x1
+FDT_END_NODE = 0x2
+FDT_PROP = 0x3
+FDT_NOP = 0x4
+FDT_END = 0x9
+
+# Precompiled DTS patterns (compiled once at import, not per call)
+# (model/compatible are matched per line, anchored at the start with .match())
+_MODEL_RE = re.compile(r'\s*model\s*=\s*"([^"]*)"')
+_COMPATIBLE_RE = re.compile(r'\s*compatible\s*=\s*"([^"]*)"')
+_FIT_SOURCE_RE = re.compile(r"fit.*source")
+
+# Every type marker in one alternation; anything other than "U-Boot" means FIT
+_TYPE_MARKER_RE = re.compile(r"FIT Image|fit.*source|U-Boot")
+
+# FIT property keys; a stripped "<key> =" line starts with one of them, and any
+# whitespace may separate the key from "=", as with \s* in a regex
+_FIT_KEYWORDS = frozenset(
+    ("description", "type", "arch", "os", "compression", "algo", "key-name-hint", "sign-images")
+)
+_FIT_PREFIXES = tuple(sorted(_FIT_KEYWORDS))
+
+# Serial block: the first serial@/fiq-debugger line, any further such lines that
+# follow within the context window, then up to SERIAL_CONFIG_CONTEXT_LINES lines
+# (a trailing newline at end of content does not start another line)
+_SERIAL_TRIGGER = r"(?:serial@|fiq-debugger)"
+_SERIAL_BLOCK_RE = re.compile(
+    rf"^.*{_SERIAL_TRIGGER}.*"
+    rf"(?:\n(?:.*\n){{0,{SERIAL_CONFIG_CONTEXT_LINES - 1}}}?.*{_SERIAL_TRIGGER}.*)*"
+    rf"(?:\n(?!\Z).*){{0,{SERIAL_CONFIG_CONTEXT_LINES}}}",
+    re.MULTILINE,
+)
+# Line boundaries str.splitlines() recognizes besides "\n" (which _SERIAL_BLOCK_RE
+# uses); "\r\n" is a single boundary
+_OTHER_LINE_BREAK_RE = re.compile("\r\n|[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+# Component types with their node label / unit address patterns, in output order
+_COMPONENT_PATTERNS: tuple[tuple[str, str], ...] = (
+    ("gpio", r"(gpio\d+):\s*gpio@([0-9a-fA-F]+)"),
+    ("usb", r"(usb\d+):\s*usb@([0-9a-fA-F]+)"),
+    ("spi", r"(spi\d+):\s*spi@([0-9a-fA-F]+)"),
+    ("i2c", r"(i2c\d+):\s*i2c@([0-9a-fA-F]+)"),
+    ("uart", r"(serial\d+|uart\d+):\s*serial@([0-9a-fA-F]+)"),
+)
+# Literal each component pattern requires; if none occur there is nothing to match
+_COMPONENT_KEYWORDS = ("gpio@", "usb@", "spi@", "i2c@", "serial@")
+_COMPONENT_TYPES = tuple(comp_type for comp_type, _ in _COMPONENT_PATTERNS)
+_COMPONENT_DESCRIPTION_PREFIXES = {t: f"{t.upper()} controller at 0x" for t in _COMPONENT_TYPES}
+
+# All component patterns fused into one alternation so the DTS is scanned once.
+# Each alternative is wrapped in a group named after its component type.
+_COMPONENT_RE = re.compile(
+    "|".join(f"(?P<{comp_type}>{pattern})" for comp_type, pattern in _COMPONENT_PATTERNS)
+)
+
+
+def _iter_lines(text: str) -> Iterator[str]:
+    """Yield lines of text one at a time using str.find().
+
+    Unlike splitlines(), no list of every line is built up front, so callers
+    that stop early never touch the rest of the text.
+    """
+    start = 0
+    length = len(text)
+    while start < length:
+        end = text.find("\n", start)
+        if end == -1:
+            end = length
+        yield text[start:end]
+        start = end + 1
+
+
+def _iter_splitlines(text: str) -> Iterator[str]:
+    """Yield the lines str.splitlines() would return, one at a time.
+
+    The other line boundaries (carriage returns, form feeds, Unicode line
+    separators, ...) become newlines first, so they still end a line.
+    """
+    return _iter_lines(_OTHER_LINE_BREAK_RE.sub("\n", text))
+
+
+def _collect_fit_lines(lines: Iterable[str], max_lines: int) -> list[str]:
+    """Collect stripped FIT property lines ("<key> = ...") from DTS lines."""
+    fit_lines: list[str] = []
+    for raw_line in lines:
+        line = raw_line.strip()
+        # startswith() rejects almost every line; the key check confirms "<key> ="
+        if not line.startswith(_FIT_PREFIXES):
+            continue
+        key, sep, _ = line.partition("=")
+        if sep and key.rstrip() in _FIT_KEYWORDS:
+            fit_lines.append(line)
+            if len(fit_lines) >= max_lines:
+                break
+    return fit_lines
+
+
+def _fdt_align(offset: int) -> int:
+    """Round an FDT structure offset up to the next 4-byte boundary."""
+    return (offset + 3) & ~3
+
+
+def _fdt_string_end(data: bytes | mmap.mmap, start: int) -> int:
+    """Find the NUL ending an FDT string, raising ValueError if there is none."""
+    end = data.find(b"\0", start)
+    if end == -1:
+        raise ValueError("unterminated FDT string")
+    return end
+
+
+def read_fdt_root_properties(data: bytes | mmap.mmap) -> dict[str, bytes]:
+    """Read the properties of the root node from a binary flattened device tree.
+
+    Walks the FDT structure block directly, so no DTS text or regex is needed.
+    A memory map can be passed as is: only the header, node names and root
+    property names and values are read from it, never the whole file.
+
+    Args:
+        data: Raw DTB bytes, or a memory map of a DTB file
+
+    Returns:
+        Dictionary mapping root property name to its raw value, or an empty
+        dictionary if data is not a valid FDT
+    """
+    if data[: len(FDT_MAGIC)] != FDT_MAGIC:
+        return {}
+
+    props: dict[str, bytes] = {}
+    try:
+        _, totalsize, off_struct, off_strings, *_ = struct.unpack_from(FDT_HEADER_FORMAT, data)
+        end = min(totalsize, len(data))
+        pos = off_struct
+        depth = 0
+
+        while pos < end:
+            (token,) = struct.unpack_from(">I", data, pos)
+            pos += 4
+            if token == FDT_BEGIN_NODE:
+                pos = _fdt_align(_fdt_string_end(data, pos) + 1)
+                depth += 1
+            elif token == FDT_END_NODE:
+                depth -= 1
+                if depth == 0:
+                    break
+            elif token == FDT_PROP:
+                length, name_offset = struct.unpack_from(">II", data, pos)
+                pos += 8
+                if depth == 1:
+                    name_start = off_strings + name_offset
+                    name = data[name_start : _fdt_string_end(data, name_start)]
+                    props[name.decode("ascii", "replace")] = data[pos : pos + length]
+                pos = _fdt_align(pos + length)
+            elif token == FDT_END:
+                break
+            elif token != FDT_NOP:
+                return {}
+    except (struct.error, ValueError):
+        return {}
+
+    return props
+
+
+def fdt_string(value: bytes | None) -> str | None:
+    """Decode the first string of an FDT string or string-list property.
+
+    Args:
+        value: Raw property value (NUL-separated strings)
+
+    Returns:
+        First string, or None if value is missing or empty
+    """
+    if not value:
+        return None
+    return value.split(b"\0", 1)[0].decode("utf-8", "replace") or None
+
 
 @dataclass(frozen=True, slots=True)
 class HardwareComponent:
@@ -40,13 +222,37 @@ class DeviceTreeParser:
         >>> components = parser.extract_hardware_components()
     """
 
-    def __init__(self, dts_content: str):
+    def __init__(self, dts_content: str, lines: list[str] | None = None):
         """Initialize parser with DTS content.
 
         Args:
             dts_content: Device tree source content as string
+            lines: Optional content already split into lines (e.g. as read from
+                   the file), used by line-oriented extractors to avoid re-splitting.
+                   Each entry is still split at the line breaks its extractor
+                   honours, so any split of dts_content gives the same results.
         """
         self.content = dts_content
+        self.lines = lines
+
+    def _iter_content_lines(self) -> Iterable[str]:
+        """Return the content's "\n"-separated lines, reusing the pre-split list if given."""
+        if self.lines is None:
+            return _iter_lines(self.content)
+        return chain.from_iterable(map(_iter_lines, self.lines))
+
+    def _iter_content_splitlines(self) -> Iterable[str]:
+        """Return the content's splitlines() lines, reusing the pre-split list if given."""
+        if self.lines is None:
+            return _iter_splitlines(self.content)
+        return chain.from_iterable(map(_iter_splitlines, self.lines))
+
+    def _match_first_line(self, pattern: re.Pattern[str]) -> str | None:
+        """Return group 1 of the first line that pattern matches at its start."""
+        for line in self._iter_content_lines():
+            if match := pattern.match(line):
+                return match.group(1)
+        return None
 
     def extract_model(self) -> str | None:
         """Extract model string from DTS.
@@ -58,9 +264,10 @@ class DeviceTreeParser:
             >>> parser.extract_model()
             'Rockchip RK3588 GL.iNet Comet RM1'
         """
-        if model_match := re.search(r'^\s*model\s*=\s*"([^"]*)"', self.content, re.MULTILINE):
-            return model_match.group(1)
-        return None
+        # Cheap substring check avoids the regex scan for most DTS files
+        if "model" not in self.content:
+            return None
+        return self._match_first_line(_MODEL_RE)
 
     def extract_compatible(self) -> str | None:
         """Extract compatible string from DTS.
@@ -72,9 +279,9 @@ class DeviceTreeParser:
             >>> parser.extract_compatible()
             'glinet,comet-rm1'
         """
-        if compat_match := re.search(r'^\s*compatible\s*=\s*"([^"]*)"', self.content, re.MULTILINE):
-            return compat_match.group(1)
-        return None
+        if "compatible" not in self.content:
+            return None
+        return self._match_first_line(_COMPATIBLE_RE)
 
     def extract_fit_description(self) -> str | None:
         """Extract FIT image description from DTS.
@@ -88,16 +295,7 @@ class DeviceTreeParser:
         if "description" not in self.content or "FIT" not in self.content:
             return None
 
-        fit_lines = []
-        for line in self.content.splitlines():
-            if re.search(
-                r"^\s*(description|type|arch|os|compression|algo|key-name-hint|sign-images)\s*=",
-                line,
-            ):
-                fit_lines.append(line.strip())
-                if len(fit_lines) >= FIT_DESCRIPTION_MAX_LINES:
-                    break
-
+        fit_lines = _collect_fit_lines(self._iter_content_splitlines(), FIT_DESCRIPTION_MAX_LINES)
         return "\n".join(fit_lines) if fit_lines else None
 
     def extract_serial_config(self) -> str | None:
@@ -112,21 +310,14 @@ class DeviceTreeParser:
         if "baudrate" not in self.content and "fiq-debugger" not in self.content:
             return None
 
-        serial_lines = []
-        in_serial_block = False
-        lines_collected = 0
-
-        for line in self.content.splitlines():
-            if "fiq-debugger" in line or "serial@" in line:
-                in_serial_block = True
-                serial_lines.append(line.strip())
-                lines_collected = 0
-            elif in_serial_block:
-                serial_lines.append(line.strip())
-                lines_collected += 1
-                if lines_collected >= SERIAL_CONFIG_CONTEXT_LINES:
-                    break
+        # Lines are defined by str.splitlines(); normalize so "\n" is the only
+        # boundary, keeping a boundary at the end of the content
+        content = _OTHER_LINE_BREAK_RE.sub("\n", self.content)
+
+        if not (block := _SERIAL_BLOCK_RE.search(content)):
+            return None
 
+        serial_lines = [line.strip() for line in block.group(0).split("\n")]
         return "\n".join(serial_lines[:SERIAL_CONFIG_MAX_LINES]) if serial_lines else None
 
     def extract_hardware_components(self) -> list[HardwareComponent]:
@@ -143,27 +334,26 @@ class DeviceTreeParser:
             >>> [c.type for c in components]
             ['gpio', 'gpio', 'usb', 'spi', 'i2c', 'uart']
         """
-        hardware_components: list[HardwareComponent] = []
-
-        # Map of component types to their regex patterns
-        component_patterns = {
-            "gpio": r"(gpio\d+):\s*gpio@([0-9a-fA-F]+)",
-            "usb": r"(usb\d+):\s*usb@([0-9a-fA-F]+)",
-            "spi": r"(spi\d+):\s*spi@([0-9a-fA-F]+)",
-            "i2c": r"(i2c\d+):\s*i2c@([0-9a-fA-F]+)",
-            "uart": r"(serial\d+|uart\d+):\s*serial@([0-9a-fA-F]+)",
-        }
-
-        for comp_type, pattern in component_patterns.items():
-            for match in re.finditer(pattern, self.content):
-                node = match.group(1)
-                addr = match.group(2)
-                description = f"{comp_type.upper()} controller at 0x{addr}"
-                hardware_components.append(
-                    HardwareComponent(type=comp_type, node=node, description=description)
-                )
-
-        return hardware_components
+        if not any(keyword in self.content for keyword in _COMPONENT_KEYWORDS):
+            return []
+
+        # Bucket by type so results keep the per-type grouping of _COMPONENT_PATTERNS
+        by_type: dict[str, list[HardwareComponent]] = {t: [] for t in _COMPONENT_TYPES}
+
+        for match in _COMPONENT_RE.finditer(self.content):
+            # lastindex is the matched type group; node and address follow it
+            comp_type = match.lastgroup
+            index = match.lastindex
+            if comp_type is None or index is None:
+                continue
+            node = match.group(index + 1)
+            addr = match.group(index + 2)
+            description = _COMPONENT_DESCRIPTION_PREFIXES[comp_type] + addr
+            by_type[comp_type].append(
+                HardwareComponent(type=comp_type, node=node, description=description)
+            )
+
+        return [component for components in by_type.values() for component in components]
 
     def is_fit_image(self) -> bool:
         """Check if DTS represents a FIT image.
@@ -171,7 +361,12 @@ class DeviceTreeParser:
         Returns:
             True if FIT image structure detected, False otherwise
         """
-        return "FIT Image" in self.content or bool(re.search(r"fit.*source", self.content))
+        if "FIT Image" in self.content:
+            return True
+        # Only run the regex when both literals it needs are present
+        if "fit" not in self.content or "source" not in self.content:
+            return False
+        return bool(_FIT_SOURCE_RE.search(self.content))
 
     def get_type(self) -> str:
         """Determine device tree type.
@@ -182,11 +377,13 @@ class DeviceTreeParser:
             - "U-Boot Device Tree"
             - "Device Tree"
         """
-        if self.is_fit_image():
-            return "FIT Image (Flattened Image Tree)"
-        if "U-Boot" in self.content:
-            return "U-Boot Device Tree"
-        return "Device Tree"
+        # One scan for all markers; FIT wins over U-Boot wherever it appears
+        is_uboot = False
+        for marker in _TYPE_MARKER_RE.finditer(self.content):
+            if marker.group(0) != "U-Boot":
+                return "FIT Image (Flattened Image Tree)"
+            is_uboot = True
+        return "U-Boot Device Tree" if is_uboot else "Device Tree"
 
     def parse(self) -> dict[str, str | list[HardwareComponent]]:
         """Parse DTS content and extract all information.
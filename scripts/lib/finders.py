@@ -13,6 +13,25 @@ from .logging import warn
 
 T = TypeVar("T")
 
+# Directories rootfs walks do not descend into: pseudo-filesystem mount points
+# and runtime state at the rootfs top level, and trees of data files, caches
+# and VCS metadata at any depth, none of which hold services or binaries
+PRUNED_ROOT_DIRS = frozenset({"proc", "sys", "dev", "tmp", "run"})
+PRUNED_DIR_NAMES = frozenset(
+    {
+        "__pycache__",
+        "locale",
+        "man",
+        "doc",
+        "terminfo",
+        "fonts",
+        "icons",
+        "zoneinfo",
+        ".git",
+        ".svn",
+    }
+)
+
 
 def find_files(
     rootfs: Path,
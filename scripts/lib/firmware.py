@@ -1,7 +1,10 @@
 """Shared firmware handling utilities for analysis scripts."""
 
+import http.client
+import shutil
 import subprocess
 import sys
+import urllib.request
 from pathlib import Path
 
 from lib.logging import error, info
@@ -9,6 +12,12 @@ from lib.logging import error, info
 # Default firmware URL for GL.iNet Comet (RM1)
 DEFAULT_FIRMWARE_URL = "https://fw.gl-inet.com/kvm/rm1/release/glkvm-RM1-1.7.2-1128-1764344791.img"
 
+# Chunk size for streaming firmware downloads to disk
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Seconds to wait for the connection and for each read of a firmware download
+DOWNLOAD_TIMEOUT = 60
+
 
 def get_firmware_path(
     firmware_arg: str | None, work_dir: Path, firmware_url: str = DEFAULT_FIRMWARE_URL
@@ -41,12 +50,16 @@ def get_firmware_path(
         info(f"Downloading firmware: {firmware_url}")
         work_dir.mkdir(parents=True, exist_ok=True)
         try:
-            subprocess.run(
-                ["curl", "-L", "-o", str(firmware_path), firmware_url],
-                check=True,
-                capture_output=True,
-            )
-        except subprocess.CalledProcessError as e:
+            with (
+                urllib.request.urlopen(firmware_url, timeout=DOWNLOAD_TIMEOUT) as response,
+                firmware_path.open("wb") as out,
+            ):
+                shutil.copyfileobj(response, out, length=DOWNLOAD_CHUNK_SIZE)
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            # Timeouts raise OSError, malformed URLs ValueError and truncated
+            # responses IncompleteRead; either way, don't leave a partial
+            # download behind to be mistaken for firmware
+            firmware_path.unlink(missing_ok=True)
             error(f"Failed to download firmware: {e}")
             sys.exit(1)
 
@@ -75,7 +88,9 @@ def extract_firmware(firmware: Path, work_dir: Path) -> Path:
         try:
             subprocess.run(
                 ["binwalk", "-e", "-C", str(extract_dir), str(firmware)],
-                capture_output=True,
+                # Output is not used; discard it instead of buffering it in memory
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 check=False,
             )
         except FileNotFoundError:
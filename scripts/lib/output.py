@@ -5,7 +5,9 @@ with source metadata tracking.
 """
 
 import json
+import os
 import sys
+import textwrap
 from datetime import UTC, datetime
 from typing import Any
 
@@ -17,6 +19,9 @@ from .logging import error
 TOML_MAX_COMMENT_LENGTH = 80
 TOML_COMMENT_TRUNCATE_LENGTH = 77
 
+# Set to a non-empty value to parse generated TOML back as a sanity check
+SELF_CHECK_ENV = "FW_ANALYSIS_SELF_CHECK"
+
 # Metadata suffix patterns used to identify metadata keys
 METADATA_SUFFIXES = (
     "_source",
@@ -54,39 +59,86 @@ def _auto_detect_fields(data: dict[str, Any]) -> tuple[list[str], list[str]]:
     return simple, complex_
 
 
-def _add_metadata_comments(doc: tomlkit.TOMLDocument, data: dict[str, Any], key: str) -> None:
-    """Add source/method/reproducibility/hardware metadata comments for a field."""
+def _shorten_comment(text: str) -> str:
+    """Shorten comment text longer than TOML_MAX_COMMENT_LENGTH, ending with "...".
+
+    Cuts at a word boundary when possible, and mid-word only when the first
+    word alone is too long.
+    """
+    if len(text) <= TOML_MAX_COMMENT_LENGTH:
+        return text
+    shortened = textwrap.shorten(text, width=TOML_MAX_COMMENT_LENGTH, placeholder="...")
+    if shortened == "...":
+        return text[:TOML_COMMENT_TRUNCATE_LENGTH] + "..."
+    return shortened
+
+
+def _metadata_comments(data: dict[str, Any], key: str) -> list[str]:
+    """Build source/method/reproducibility/hardware metadata comments for a field."""
+    comments = []
     if f"{key}_source" in data:
-        doc.add(tomlkit.comment(f"Source: {data[f'{key}_source']}"))
+        comments.append(f"Source: {data[f'{key}_source']}")
     if f"{key}_method" in data:
-        method = data[f"{key}_method"]
-        if len(method) > TOML_MAX_COMMENT_LENGTH:
-            doc.add(tomlkit.comment(f"Method: {method[:TOML_COMMENT_TRUNCATE_LENGTH]}..."))
-        else:
-            doc.add(tomlkit.comment(f"Method: {method}"))
+        comments.append(f"Method: {_shorten_comment(data[f'{key}_method'])}")
     if f"{key}_reproducibility" in data:
-        doc.add(tomlkit.comment(f"Reproducibility: {data[f'{key}_reproducibility']}"))
+        comments.append(f"Reproducibility: {data[f'{key}_reproducibility']}")
     for hw_field in ("equipment", "procedure", "performed", "operator"):
         hw_key = f"{key}_{hw_field}"
         if hw_key in data:
-            val = data[hw_key]
-            if len(val) > TOML_MAX_COMMENT_LENGTH:
-                val = val[:TOML_COMMENT_TRUNCATE_LENGTH] + "..."
-            doc.add(tomlkit.comment(f"{hw_field.title()}: {val}"))
+            comments.append(f"{hw_field.title()}: {_shorten_comment(data[hw_key])}")
+    return comments
 
 
-def _add_simple_fields(
+def _comment_line(text: str) -> str:
+    """Render a TOML comment line, splitting embedded newlines like tomlkit.comment()."""
+    return "".join(f"# {line}\n" if line else "#\n" for line in text.split("\n"))
+
+
+def _format_scalar(value: Any) -> str | None:
+    """Render a scalar as a TOML value, or None if it needs the tomlkit document.
+
+    Strings use JSON escaping, which is valid TOML except for DEL.
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False).replace("\x7f", "\\u007f")
+    if isinstance(value, float):
+        return tomlkit.item(value).as_string()
+    return None
+
+
+def _render_simple_fields(
     doc: tomlkit.TOMLDocument, data: dict[str, Any], simple_fields: list[str]
-) -> None:
-    """Add simple fields with source metadata comments to TOML document."""
-    for key in simple_fields:
-        if key not in data:
-            continue
+) -> list[str]:
+    """Render simple fields in order, with source metadata comments.
 
-        value = data[key]
-        _add_metadata_comments(doc, data, key)
-        doc.add(key, value)
-        doc.add(tomlkit.nl())
+    When every field is a scalar, the fields are written directly as text
+    instead of going through the tomlkit document model. If any field needs
+    tomlkit (an array or table), all of them are added to doc instead, so
+    the declared field order is kept.
+
+    Returns:
+        TOML lines for the fields, empty if they were added to doc
+    """
+    keys = [key for key in simple_fields if key in data]
+    formatted = [_format_scalar(data[key]) for key in keys]
+
+    if None in formatted:
+        for key in keys:
+            for comment in _metadata_comments(data, key):
+                doc.add(tomlkit.comment(comment))
+            doc.add(key, data[key])
+            doc.add(tomlkit.nl())
+        return []
+
+    lines: list[str] = []
+    for key, value in zip(keys, formatted, strict=True):
+        lines.extend(_comment_line(comment) for comment in _metadata_comments(data, key))
+        lines.append(f"{key} = {value}\n\n")
+    return lines
 
 
 def output_toml(
@@ -111,9 +163,11 @@ def output_toml(
     doc = tomlkit.document()
 
     # Add header
-    doc.add(tomlkit.comment(title))
-    doc.add(tomlkit.comment(f"Generated: {datetime.now(UTC).isoformat()}"))
-    doc.add(tomlkit.nl())
+    lines = [
+        _comment_line(title),
+        _comment_line(f"Generated: {datetime.now(UTC).isoformat()}"),
+        "\n",
+    ]
 
     # Convert analysis to dict
     data = analysis.to_dict()
@@ -127,22 +181,26 @@ def output_toml(
             complex_fields = auto_complex
 
     # Add simple fields first (primitives with metadata comments)
-    _add_simple_fields(doc, data, simple_fields)
+    lines.extend(_render_simple_fields(doc, data, simple_fields))
 
     # Add complex fields (arrays/objects with header comments)
     for key in complex_fields:
         if key not in data or not data[key]:
             continue
 
-        _add_metadata_comments(doc, data, key)
+        for comment in _metadata_comments(data, key):
+            doc.add(tomlkit.comment(comment))
         doc.add(tomlkit.comment(key.replace("_", " ").title()))
         doc.add(key, data[key])
         doc.add(tomlkit.nl())
 
     # Generate TOML string
-    toml_str: str = tomlkit.dumps(doc)
+    lines.append(tomlkit.dumps(doc))
+    toml_str = "".join(lines)
 
-    # Validate by parsing it back
+    # Parsing the output back doubles its cost, so it is opt-in for debugging
+    if not os.environ.get(SELF_CHECK_ENV):
+        return toml_str
     try:
         tomlkit.loads(toml_str)
     except (tomlkit.exceptions.ParseError, ValueError) as e:
@@ -161,13 +219,4 @@ def output_json(analysis: Any) -> str:
     Returns:
         JSON string with source metadata
     """
-    json_str = json.dumps(analysis.to_dict(), indent=2)
-
-    # Validate by parsing it back
-    try:
-        json.loads(json_str)
-    except (json.JSONDecodeError, ValueError) as e:
-        error(f"Generated invalid JSON: {e}")
-        sys.exit(1)
-
-    return json_str
+    return json.dumps(analysis.to_dict(), indent=2)
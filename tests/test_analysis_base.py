@@ -6,12 +6,13 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+import pytest
 import tomlkit
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
 
 from lib.analysis_base import AnalysisBase
-from lib.output import output_toml
+from lib.output import SELF_CHECK_ENV, output_toml
 
 
 @dataclass
@@ -36,6 +37,7 @@ class SampleWithListAnalysis(AnalysisBase):
 
     name: str | None = None
     items: list[dict[str, str]] = field(default_factory=list)
+    tags: list[str] = field(default_factory=list)
 
     _source: dict[str, str] = field(default_factory=dict)
     _method: dict[str, str] = field(default_factory=dict)
@@ -85,6 +87,17 @@ class TestReproducibilityMetadata:
         assert d["version_method"] == "strings | grep"
         assert d["version_reproducibility"] == "software"
 
+    def test_add_metadata_table_matches_add_metadata(self) -> None:
+        table = {"version": ("firmware", "strings | grep"), "offset": ("binwalk", "binwalk -y")}
+        bulk = SampleAnalysis()
+        bulk.add_metadata_table(table)
+        single = SampleAnalysis()
+        for field_name, (source, method) in table.items():
+            single.add_metadata(field_name, source, method)
+        assert bulk._source == single._source
+        assert bulk._method == single._method
+        assert bulk._reproducibility == single._reproducibility
+
 
 class TestHardwareMetadata:
     """Test hardware-dependent metadata tracking."""
@@ -216,3 +229,68 @@ class TestComplexFieldMetadata:
         assert "items_source" not in parsed
         assert "items_method" not in parsed
         assert "items_reproducibility" not in parsed
+
+
+class TestTomlScalarRendering:
+    """Test the direct text rendering of simple fields in output_toml."""
+
+    def test_strings_round_trip(self) -> None:
+        tricky = 'quote " backslash \\ tab \t newline \n nul \x00 esc \x1b del \x7f é'
+        analysis = SampleAnalysis(version=tricky, offset=-42)
+        parsed = tomlkit.loads(output_toml(analysis, "Test"))
+        assert parsed["version"] == tricky
+        assert parsed["offset"] == -42
+
+    def test_multiline_metadata_comment(self) -> None:
+        analysis = SampleAnalysis(version="1.0")
+        analysis.add_metadata("version", "strings\n\nbinary", "grep")
+        toml_str = output_toml(analysis, "Test")
+        assert "# Source: strings\n#\n# binary\n" in toml_str
+        assert tomlkit.loads(toml_str)["version"] == "1.0"
+
+    def test_mixed_simple_fields_keep_declared_order(self) -> None:
+        analysis = SampleWithListAnalysis(name="board", tags=["a", "b"])
+        analysis.add_metadata("name", "strings", "grep")
+        toml_str = output_toml(analysis, "Test", simple_fields=["tags", "name"], complex_fields=[])
+        assert toml_str.index("tags = ") < toml_str.index("# Source: strings")
+        assert toml_str.index("# Source: strings") < toml_str.index('name = "board"')
+        assert list(tomlkit.loads(toml_str)) == ["tags", "name"]
+
+
+class TestTomlSelfCheck:
+    """Test the opt-in parse-back check of generated TOML."""
+
+    def test_output_not_reparsed_by_default(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delenv(SELF_CHECK_ENV, raising=False)
+        monkeypatch.setattr("lib.output.tomlkit.loads", _fail_loads)
+        assert "version" in output_toml(SampleAnalysis(version="1.0"), "Test")
+
+    def test_self_check_rejects_invalid_toml(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv(SELF_CHECK_ENV, "1")
+        monkeypatch.setattr("lib.output.tomlkit.dumps", lambda _doc: "[broken\n")
+        with pytest.raises(SystemExit):
+            output_toml(SampleWithListAnalysis(name="x", items=[{"a": "b"}]), "Test")
+
+
+def _fail_loads(_text: str) -> None:
+    raise AssertionError("output_toml parsed its output without the self-check enabled")
+
+
+class TestTomlCommentShortening:
+    """Test shortening of long metadata comments."""
+
+    def test_long_method_cut_at_word_boundary(self) -> None:
+        method = "strings firmware.img | grep " * 5
+        analysis = SampleAnalysis(version="1.0")
+        analysis.add_metadata("version", "strings", method)
+        toml_str = output_toml(analysis, "Test")
+        method_line = next(line for line in toml_str.splitlines() if line.startswith("# Method"))
+        kept = method_line.removeprefix("# Method: ").removesuffix("...")
+        assert method.startswith(kept + " ")
+        assert len(kept) + 3 <= 80
+
+    def test_long_single_word_cut_mid_word(self) -> None:
+        analysis = SampleAnalysis(version="1.0")
+        analysis.add_metadata("version", "strings", "/" + "x" * 99)
+        toml_str = output_toml(analysis, "Test")
+        assert f"# Method: /{'x' * 76}...\n" in toml_str
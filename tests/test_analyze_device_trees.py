@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import sys
 from pathlib import Path
+from typing import Any
+from unittest.mock import patch
 
 import pytest
 import tomlkit
@@ -17,12 +19,17 @@ from analyze_device_trees import (
     DeviceTree,
     DeviceTreeAnalysis,
     analyze_dtb_file,
+    analyze_dtb_files,
     find_dtb_files,
+    load_dtb_cache,
     parse_dts_content,
+    save_dtb_cache,
 )
 from lib.devicetree import HardwareComponent
 from lib.output import output_toml
 
+from tests.test_lib_devicetree import build_fdt
+
 
 class TestHardwareComponent:
     """Test HardwareComponent dataclass."""
@@ -88,14 +95,6 @@ class TestDeviceTree:
 
     def test_device_tree_creation_full(self) -> None:
         """Test creating a DeviceTree with all fields."""
-        hardware = [
-            HardwareComponent(
-                type="gpio",
-                node="gpio0",
-                description="GPIO controller at 0xfdd60000",
-            )
-        ]
-
         dt = DeviceTree(
             filename="system.dtb",
             size=2048,
@@ -105,7 +104,9 @@ class TestDeviceTree:
             compatible="glinet,comet",
             fit_description="description = FIT Image",
             serial_config="fiq-debugger",
-            hardware_components=hardware,
+            hw_types=("gpio",),
+            hw_nodes=("gpio0",),
+            hw_descriptions=("GPIO controller at 0xfdd60000",),
         )
 
         assert dt.filename == "system.dtb"
@@ -113,8 +114,13 @@ class TestDeviceTree:
         assert dt.compatible == "glinet,comet"
         assert dt.fit_description == "description = FIT Image"
         assert dt.serial_config == "fiq-debugger"
-        assert len(dt.hardware_components) == 1
-        assert dt.hardware_components[0].type == "gpio"
+        assert dt.hardware_components == [
+            HardwareComponent(
+                type="gpio",
+                node="gpio0",
+                description="GPIO controller at 0xfdd60000",
+            )
+        ]
 
     def test_device_tree_is_frozen(self) -> None:
         """Test that DeviceTree is immutable (frozen)."""
@@ -269,14 +275,6 @@ class TestDeviceTreeAnalysis:
 
     def test_to_dict_includes_hardware_components(self) -> None:
         """Test to_dict includes hardware components."""
-        hardware = [
-            HardwareComponent(
-                type="gpio",
-                node="gpio0",
-                description="GPIO controller at 0xfdd60000",
-            )
-        ]
-
         analysis = DeviceTreeAnalysis(
             firmware_file="test.img",
             firmware_size=1024,
@@ -287,7 +285,9 @@ class TestDeviceTreeAnalysis:
                 size=2048,
                 offset="0x8F1B4",
                 dtb_type="Device Tree",
-                hardware_components=hardware,
+                hw_types=("gpio",),
+                hw_nodes=("gpio0",),
+                hw_descriptions=("GPIO controller at 0xfdd60000",),
             )
         ]
 
@@ -310,7 +310,7 @@ class TestDeviceTreeAnalysis:
                 size=2048,
                 offset="0x8F1B4",
                 dtb_type="Device Tree",
-                hardware_components=[],  # Empty list should be filtered
+                hw_types=(),  # No components should be filtered
             )
         ]
 
@@ -483,6 +483,20 @@ class TestFindDtbFiles:
         # Results should be sorted
         assert result[0].parent.name < result[1].parent.name
 
+    def test_find_dtb_files_missing_directory(self, tmp_path: Path) -> None:
+        """Test that a missing extraction directory yields no files."""
+        assert find_dtb_files(tmp_path / "missing") == []
+
+    def test_find_dtb_files_ignores_directories(self, tmp_path: Path) -> None:
+        """Test that a directory named system.dtb is not reported."""
+        extract_dir = tmp_path / "firmware.img.extracted"
+        (extract_dir / "system.dtb").mkdir(parents=True)
+        (extract_dir / "system.dtb" / "system.dtb").touch()
+
+        result = find_dtb_files(extract_dir)
+
+        assert result == [extract_dir / "system.dtb" / "system.dtb"]
+
 
 class TestAnalyzeDtbFile:
     """Test analyze_dtb_file function."""
@@ -535,6 +549,21 @@ class TestAnalyzeDtbFile:
         assert len(result.hardware_components) == 1
         assert result.hardware_components[0].type == "gpio"
 
+    def test_analyze_dtb_file_binary_fdt(self, tmp_path: Path) -> None:
+        """Test that model/compatible are read from a binary DTB structure."""
+        extract_dir = tmp_path / "firmware.img.extracted"
+        dtb_dir = extract_dir / "8F1B4"
+        dtb_dir.mkdir(parents=True)
+        dtb_path = dtb_dir / "system.dtb"
+        dtb_path.write_bytes(
+            build_fdt({"model": b"Binary Board\0", "compatible": b"vendor,board\0"}, {})
+        )
+
+        result = analyze_dtb_file(dtb_path, extract_dir)
+
+        assert result.model == "Binary Board"
+        assert result.compatible == "vendor,board"
+
     def test_analyze_dtb_file_read_error(self, tmp_path: Path) -> None:
         """Test analyzing a DTB file with read error."""
         extract_dir = tmp_path / "firmware.img.extracted"
@@ -553,6 +582,20 @@ class TestAnalyzeDtbFile:
         assert result.filename == "system.dtb"
         assert result.offset == "8F1B4"
 
+    def test_analyze_dtb_file_empty_file(self, tmp_path: Path) -> None:
+        """Test that an empty DTB file is analyzed without error."""
+        extract_dir = tmp_path / "firmware.img.extracted"
+        dtb_dir = extract_dir / "8F1B4"
+        dtb_dir.mkdir(parents=True)
+        dtb_path = dtb_dir / "system.dtb"
+        dtb_path.touch()
+
+        result = analyze_dtb_file(dtb_path, extract_dir)
+
+        assert result.size == 0
+        assert result.dtb_type == "Device Tree"
+        assert result.model is None
+
     def test_analyze_dtb_file_offset_extraction(self, tmp_path: Path) -> None:
         """Test that offset is correctly extracted from directory structure."""
         extract_dir = tmp_path / "firmware.img.extracted"
@@ -568,6 +611,17 @@ class TestAnalyzeDtbFile:
 
         assert result.offset == "901B4"
 
+    def test_analyze_dtb_file_outside_extract_dir(self, tmp_path: Path) -> None:
+        """Test that a DTB outside the extraction directory is rejected."""
+        extract_dir = tmp_path / "firmware.img.extracted"
+        extract_dir.mkdir()
+        dtb_path = tmp_path / "firmware.img.extracted-other" / "system.dtb"
+        dtb_path.parent.mkdir()
+        dtb_path.write_text("/ { };")
+
+        with pytest.raises(ValueError):
+            analyze_dtb_file(dtb_path, extract_dir)
+
     def test_analyze_dtb_file_large_file_truncation(self, tmp_path: Path) -> None:
         """Test that large files are truncated to first 200 lines."""
         extract_dir = tmp_path / "firmware.img.extracted"
@@ -586,6 +640,198 @@ class TestAnalyzeDtbFile:
 
         assert result.filename == "system.dtb"
 
+    def test_analyze_dtb_file_ignores_content_past_line_limit(self, tmp_path: Path) -> None:
+        """Test that properties after the first 200 lines are not parsed."""
+        extract_dir = tmp_path / "firmware.img.extracted"
+        dtb_dir = extract_dir / "8F1B4"
+        dtb_dir.mkdir(parents=True)
+        dtb_path = dtb_dir / "system.dtb"
+
+        lines = ["/ {"] + [f"    line{i} = value{i};" for i in range(300)]
+        lines.append('    model = "Too Late";')
+        dtb_path.write_text("\n".join(lines))
+
+        result = analyze_dtb_file(dtb_path, extract_dir)
+
+        assert result.model is None
+
+    def test_analyze_dtb_file_line_limit_counts_crlf_once(self, tmp_path: Path) -> None:
+        """Test that a \\r\\n pair counts as a single line break toward the limit."""
+        extract_dir = tmp_path / "firmware.img.extracted"
+        dtb_dir = extract_dir / "8F1B4"
+        dtb_dir.mkdir(parents=True)
+        dtb_path = dtb_dir / "system.dtb"
+
+        # Each line ends in \r\n, which must not count as two line breaks
+        lines = ["/ {"] + [f"    line{i} = value{i};\r" for i in range(198)]
+        lines += ['    model = "In Time";', '    compatible = "too,late";']
+        dtb_path.write_bytes("\n".join(lines).encode())
+
+        result = analyze_dtb_file(dtb_path, extract_dir)
+
+        assert result.model == "In Time"
+        assert result.compatible is None
+
+    def test_analyze_dtb_file_universal_newlines(self, tmp_path: Path) -> None:
+        """Test that a bare \\r ends a line, as in a text-mode read of the file."""
+        extract_dir = tmp_path / "firmware.img.extracted"
+        dtb_dir = extract_dir / "8F1B4"
+        dtb_dir.mkdir(parents=True)
+        dtb_path = dtb_dir / "system.dtb"
+        dtb_path.write_bytes(
+            b'/ {\r\tdescription = "FIT Image";\r\tmodel = "CR Only";\r'
+            b"\tarch = arm\rtype = kernel\x0cload = <0x1>\r}"
+        )
+
+        result = analyze_dtb_file(dtb_path, extract_dir)
+
+        assert result.model == "CR Only"
+        assert result.fit_description == 'description = "FIT Image";\narch = arm\ntype = kernel'
+
+    def test_analyze_dtb_file_line_limit_counts_bare_cr(self, tmp_path: Path) -> None:
+        """Test that lines ended by a bare \\r count toward the line limit."""
+        extract_dir = tmp_path / "firmware.img.extracted"
+        dtb_dir = extract_dir / "8F1B4"
+        dtb_dir.mkdir(parents=True)
+        dtb_path = dtb_dir / "system.dtb"
+
+        lines = ["/ {"] + [f"    line{i} = value{i};" for i in range(300)]
+        lines.append('    model = "Too Late";')
+        dtb_path.write_bytes("\r".join(lines).encode())
+
+        result = analyze_dtb_file(dtb_path, extract_dir)
+
+        assert result.model is None
+
+
+class TestAnalyzeDtbFiles:
+    """Test analyze_dtb_files function."""
+
+    def test_analyze_dtb_files_empty(self, tmp_path: Path) -> None:
+        """Test that no files yields no results."""
+        assert analyze_dtb_files([], tmp_path) == []
+
+    def test_analyze_dtb_files_preserves_order(self, tmp_path: Path) -> None:
+        """Test that parallel analysis returns results in input order."""
+        extract_dir = tmp_path / "firmware.img.extracted"
+        dtb_files = []
+        for offset in ("8F1B4", "901B4", "A0000"):
+            dtb_dir = extract_dir / offset
+            dtb_dir.mkdir(parents=True)
+            dtb_path = dtb_dir / "system.dtb"
+            dtb_path.write_text(f'/ {{\n    model = "Board {offset}";\n}};')
+            dtb_files.append(dtb_path)
+
+        results = analyze_dtb_files(dtb_files, extract_dir)
+
+        assert [dt.offset for dt in results] == ["8F1B4", "901B4", "A0000"]
+        assert [dt.model for dt in results] == ["Board 8F1B4", "Board 901B4", "Board A0000"]
+
+
+class TestDtbCache:
+    """Test the parsed-DTB cache."""
+
+    def _write_dtb(self, tmp_path: Path, model: str) -> tuple[Path, Path]:
+        extract_dir = tmp_path / "firmware.img.extracted"
+        dtb_dir = extract_dir / "8F1B4"
+        dtb_dir.mkdir(parents=True, exist_ok=True)
+        dtb_path = dtb_dir / "system.dtb"
+        dtb_path.write_text(f'/ {{\n    model = "{model}";\n    gpio0: gpio@ff000000 {{ }};\n}};')
+        return extract_dir, dtb_path
+
+    def test_load_missing_cache(self, tmp_path: Path) -> None:
+        """Test that a missing cache file loads as empty."""
+        assert load_dtb_cache(tmp_path) == {}
+
+    def test_load_ignores_other_parser_source(self, tmp_path: Path) -> None:
+        """Test that a cache written by different parser code is discarded."""
+        save_dtb_cache(tmp_path, {"a": {}})
+        assert load_dtb_cache(tmp_path) == {"a": {}}
+        assert not (tmp_path / "dtb_cache.tmp").exists()
+
+        with patch("analyze_device_trees.source_cache_key", return_value="edited"):
+            assert load_dtb_cache(tmp_path) == {}
+
+    def test_load_ignores_corrupt_cache(self, tmp_path: Path) -> None:
+        """Test that an unreadable cache file loads as empty."""
+        (tmp_path / "dtb_cache.json").write_text("not json")
+        assert load_dtb_cache(tmp_path) == {}
+
+    def test_round_trip_reuses_result(self, tmp_path: Path) -> None:
+        """Test that a cached result is returned without re-parsing."""
+        extract_dir, dtb_path = self._write_dtb(tmp_path, "Board A")
+        cache: dict[str, Any] = {}
+        first = analyze_dtb_files([dtb_path], extract_dir, cache)
+        save_dtb_cache(tmp_path, cache)
+
+        with patch("analyze_device_trees.analyze_dtb_file") as mock_analyze:
+            second = analyze_dtb_files([dtb_path], extract_dir, load_dtb_cache(tmp_path))
+
+        mock_analyze.assert_not_called()
+        assert second == first
+        assert second[0].hardware_components[0].node == "gpio0"
+
+    def test_changed_file_is_reparsed(self, tmp_path: Path) -> None:
+        """Test that a file whose size changed is parsed again."""
+        extract_dir, dtb_path = self._write_dtb(tmp_path, "Board A")
+        cache: dict[str, Any] = {}
+        analyze_dtb_files([dtb_path], extract_dir, cache)
+
+        self._write_dtb(tmp_path, "Board Longer Name")
+        results = analyze_dtb_files([dtb_path], extract_dir, cache)
+
+        assert results[0].model == "Board Longer Name"
+
+    @pytest.mark.parametrize(
+        "corrupt",
+        [
+            lambda _entry: "not a dict",
+            lambda entry: {**entry, "device_tree": ["not", "a", "dict"]},
+            lambda entry: {**entry, "device_tree": {"filename": "system.dtb"}},
+            lambda entry: {**entry, "device_tree": {**entry["device_tree"], "extra": 1}},
+            lambda entry: {**entry, "device_tree": {**entry["device_tree"], "hw_nodes": []}},
+        ],
+        ids=["not-dict", "device-tree-not-dict", "missing-fields", "extra-field", "ragged"],
+    )
+    def test_malformed_entry_is_a_miss(self, tmp_path: Path, corrupt: Any) -> None:
+        """Test that malformed cache entries are re-parsed instead of raising."""
+        extract_dir, dtb_path = self._write_dtb(tmp_path, "Board A")
+        cache: dict[str, Any] = {}
+        first = analyze_dtb_files([dtb_path], extract_dir, cache)
+        valid_entry = cache[str(dtb_path)]
+        cache[str(dtb_path)] = corrupt(valid_entry)
+
+        results = analyze_dtb_files([dtb_path], extract_dir, cache)
+
+        assert results == first
+        assert cache[str(dtb_path)] == valid_entry
+
+    def test_entries_for_missing_files_are_dropped(self, tmp_path: Path) -> None:
+        """Test that the cache only keeps entries for the files of this run."""
+        extract_dir, dtb_path = self._write_dtb(tmp_path, "Board A")
+        cache: dict[str, Any] = {str(tmp_path / "gone" / "system.dtb"): {"size": 1}}
+
+        analyze_dtb_files([dtb_path], extract_dir, cache)
+
+        assert list(cache) == [str(dtb_path)]
+
+    def test_unstattable_file_is_a_miss(self, tmp_path: Path) -> None:
+        """Test that a file whose stat fails is analyzed instead of raising."""
+        extract_dir, dtb_path = self._write_dtb(tmp_path, "Board A")
+        cache: dict[str, Any] = {}
+        first = analyze_dtb_files([dtb_path], extract_dir, cache)
+        cached_entry = dict(cache[str(dtb_path)])
+
+        with (
+            patch.object(Path, "stat", side_effect=PermissionError("denied")),
+            patch("analyze_device_trees.analyze_dtb_file", return_value=first[0]) as mock_analyze,
+        ):
+            results = analyze_dtb_files([dtb_path], extract_dir, cache)
+
+        mock_analyze.assert_called_once()
+        assert results == first
+        assert cache[str(dtb_path)] == cached_entry
+
 
 class TestOutputToml:
     """Test output_toml function."""
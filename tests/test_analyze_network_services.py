@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 import sys
+from dataclasses import asdict
 from pathlib import Path
 from typing import Any
 from unittest.mock import MagicMock, patch
@@ -15,12 +16,19 @@ import tomlkit
 sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
 
 from analyze_network_services import (
+    DirListings,
     InitScript,
     NetworkServicesAnalysis,
+    NetworkServicesScript,
     PasswordEntry,
     ServiceBinary,
+    _analysis_from_dict,
     _classify_password_hash,
     _extract_janus_version,
+    _looks_textual,
+    _scan_rootfs,
+    _scan_subtree,
+    analyze_firmware,
     analyze_shadow_file,
     find_firewall_rules,
     find_init_scripts,
@@ -31,12 +39,13 @@ from analyze_network_services import (
     find_web_frameworks,
     find_web_servers,
 )
+from lib.analysis_cache import CACHE_DIR, CACHE_ENV
 from lib.firmware import find_squashfs_rootfs
 from lib.output import output_toml
 
 
 class TestInitScript:
-    """Test InitScript dataclass."""
+    """Test InitScript record."""
 
     def test_init_script_creation(self) -> None:
         """Test creating an InitScript."""
@@ -63,7 +72,7 @@ class TestInitScript:
 
 
 class TestServiceBinary:
-    """Test ServiceBinary dataclass."""
+    """Test ServiceBinary record."""
 
     def test_service_binary_creation(self) -> None:
         """Test creating a ServiceBinary."""
@@ -94,13 +103,11 @@ class TestServiceBinary:
 
 
 class TestPasswordEntry:
-    """Test PasswordEntry dataclass."""
+    """Test PasswordEntry record."""
 
     def test_password_entry_creation(self) -> None:
         """Test creating a PasswordEntry."""
-        entry = PasswordEntry(
-            username="root", hash_type="sha512", description="SHA-512 hash (strong)"
-        )
+        entry = PasswordEntry(username="root", hash_type="sha512")
 
         assert entry.username == "root"
         assert entry.hash_type == "sha512"
@@ -108,18 +115,14 @@ class TestPasswordEntry:
 
     def test_password_entry_is_frozen(self) -> None:
         """Test that PasswordEntry is immutable (frozen)."""
-        entry = PasswordEntry(
-            username="root", hash_type="sha512", description="SHA-512 hash (strong)"
-        )
+        entry = PasswordEntry(username="root", hash_type="sha512")
 
         with pytest.raises(AttributeError):
             entry.username = "admin"  # type: ignore
 
     def test_password_entry_has_slots(self) -> None:
         """Test that PasswordEntry uses __slots__ for efficiency."""
-        entry = PasswordEntry(
-            username="root", hash_type="sha512", description="SHA-512 hash (strong)"
-        )
+        entry = PasswordEntry(username="root", hash_type="sha512")
 
         assert hasattr(entry.__class__, "__slots__")
 
@@ -261,9 +264,7 @@ class TestNetworkServicesAnalysis:
             firmware_size=1024,
             rootfs_path="/tmp/squashfs-root",
         )
-        analysis.password_entries = [
-            PasswordEntry(username="root", hash_type="sha512", description="SHA-512 hash (strong)")
-        ]
+        analysis.password_entries = [PasswordEntry(username="root", hash_type="sha512")]
 
         result = analysis.to_dict()
 
@@ -292,28 +293,32 @@ class TestClassifyPasswordHash:
 
     def test_classify_empty_hash(self) -> None:
         """Test classifying empty password hash."""
-        hash_type, description = _classify_password_hash("")
+        hash_type, unknown_prefix = _classify_password_hash(b"")
+        description = PasswordEntry("root", hash_type, unknown_prefix).description
 
         assert hash_type == "locked"
         assert description == "No password / locked"
 
     def test_classify_asterisk_hash(self) -> None:
         """Test classifying asterisk password hash."""
-        hash_type, description = _classify_password_hash("*")
+        hash_type, unknown_prefix = _classify_password_hash(b"*")
+        description = PasswordEntry("root", hash_type, unknown_prefix).description
 
         assert hash_type == "locked"
         assert description == "No password / locked"
 
     def test_classify_exclamation_hash(self) -> None:
         """Test classifying exclamation mark password hash."""
-        hash_type, description = _classify_password_hash("!")
+        hash_type, unknown_prefix = _classify_password_hash(b"!")
+        description = PasswordEntry("root", hash_type, unknown_prefix).description
 
         assert hash_type == "locked"
         assert description == "No password / locked"
 
     def test_classify_x_hash(self) -> None:
         """Test classifying 'x' password hash."""
-        hash_type, description = _classify_password_hash("x")
+        hash_type, unknown_prefix = _classify_password_hash(b"x")
+        description = PasswordEntry("root", hash_type, unknown_prefix).description
 
         assert hash_type == "shadow"
         assert description == "Password in shadow file"
@@ -321,46 +326,61 @@ class TestClassifyPasswordHash:
     def test_classify_short_hash(self) -> None:
         """Test classifying short password hash."""
         # Less than MIN_HASH_LENGTH (13)
-        hash_type, description = _classify_password_hash("short")
+        hash_type, unknown_prefix = _classify_password_hash(b"short")
+        description = PasswordEntry("root", hash_type, unknown_prefix).description
 
         assert hash_type == "weak"
         assert description == "Weak/short hash (potential issue)"
 
     def test_classify_md5_hash(self) -> None:
         """Test classifying MD5 password hash."""
-        hash_type, description = _classify_password_hash("$1$salt$hashhashhashhashhashhash")
+        hash_type, unknown_prefix = _classify_password_hash(b"$1$salt$hashhashhashhashhashhash")
+        description = PasswordEntry("root", hash_type, unknown_prefix).description
 
         assert hash_type == "md5"
         assert description == "MD5 hash (weak)"
 
     def test_classify_sha256_hash(self) -> None:
         """Test classifying SHA-256 password hash."""
-        hash_type, description = _classify_password_hash("$5$salt$hashhashhashhashhashhash")
+        hash_type, unknown_prefix = _classify_password_hash(b"$5$salt$hashhashhashhashhashhash")
+        description = PasswordEntry("root", hash_type, unknown_prefix).description
 
         assert hash_type == "sha256"
         assert description == "SHA-256 hash"
 
     def test_classify_sha512_hash(self) -> None:
         """Test classifying SHA-512 password hash."""
-        hash_type, description = _classify_password_hash("$6$salt$hashhashhashhashhashhash")
+        hash_type, unknown_prefix = _classify_password_hash(b"$6$salt$hashhashhashhashhashhash")
+        description = PasswordEntry("root", hash_type, unknown_prefix).description
 
         assert hash_type == "sha512"
         assert description == "SHA-512 hash (strong)"
 
     def test_classify_yescrypt_hash(self) -> None:
         """Test classifying yescrypt password hash."""
-        hash_type, description = _classify_password_hash("$y$salt$hashhashhashhashhashhash")
+        hash_type, unknown_prefix = _classify_password_hash(b"$y$salt$hashhashhashhashhashhash")
+        description = PasswordEntry("root", hash_type, unknown_prefix).description
 
         assert hash_type == "yescrypt"
         assert description == "yescrypt hash (strong)"
 
     def test_classify_unknown_hash(self) -> None:
         """Test classifying unknown password hash."""
-        hash_type, description = _classify_password_hash("$9$salt$hashhashhashhashhashhash")
+        hash_type, unknown_prefix = _classify_password_hash(b"$9$salt$hashhashhashhashhashhash")
+        description = PasswordEntry("root", hash_type, unknown_prefix).description
 
         assert hash_type == "$9$"
+        assert unknown_prefix is True
         assert "Hash present (type: $9$)" in description
 
+    def test_classify_unknown_prefix_named_like_known_type(self) -> None:
+        """Test that an unknown prefix equal to a type name keeps the generic description."""
+        hash_type, unknown_prefix = _classify_password_hash(b"md5saltsaltsaltsalt")
+        description = PasswordEntry("root", hash_type, unknown_prefix).description
+
+        assert hash_type == "md5"
+        assert description == "Hash present (type: md5)"
+
 
 class TestFindSquashfsRootfs:
     """Test find_squashfs_rootfs function."""
@@ -437,6 +457,102 @@ class TestFindInitScripts:
 
         assert result == []
 
+    def test_find_init_scripts_top_level_only(self, tmp_path: Path) -> None:
+        """Test that subdirectories and symlinks in /etc/init.d are skipped."""
+        rootfs = tmp_path / "rootfs"
+        init_d = rootfs / "etc" / "init.d"
+        (init_d / "helpers").mkdir(parents=True)
+        (init_d / "helpers" / "common").write_bytes(b"x")
+        (init_d / "network").write_bytes(b"x" * 16)
+        (init_d / "net").symlink_to("network")
+
+        result = find_init_scripts(rootfs)
+
+        assert result == [InitScript(name="network", size=16)]
+
+
+class TestScanRootfs:
+    """Test _scan_rootfs function."""
+
+    def test_scan_rootfs_indexes_by_basename(self, tmp_path: Path) -> None:
+        """Test that files and directories are indexed by basename with sorted paths."""
+        rootfs = tmp_path / "rootfs"
+        (rootfs / "usr" / "sbin").mkdir(parents=True)
+        (rootfs / "sbin").mkdir()
+        (rootfs / "usr" / "sbin" / "nginx").write_bytes(b"x")
+        (rootfs / "sbin" / "nginx").write_bytes(b"x")
+
+        index = _scan_rootfs(rootfs)
+
+        assert index.files["nginx"] == ["sbin/nginx", "usr/sbin/nginx"]
+        assert index.dirs["sbin"] == ["sbin", "usr/sbin"]
+        assert "usr" not in index.files
+
+    def test_scan_rootfs_does_not_follow_dir_symlinks(self, tmp_path: Path) -> None:
+        """Test that symlinked directories are indexed but not descended into."""
+        rootfs = tmp_path / "rootfs"
+        (rootfs / "bin").mkdir(parents=True)
+        (rootfs / "bin" / "busybox").write_bytes(b"x")
+        (rootfs / "bin" / "telnetd").symlink_to("busybox")
+        (rootfs / "linked").symlink_to("bin")
+
+        index = _scan_rootfs(rootfs)
+
+        assert index.files["telnetd"] == ["bin/telnetd"]
+        assert index.dirs["linked"] == ["linked"]
+        assert index.files["busybox"] == ["bin/busybox"]
+
+    def test_scan_rootfs_merges_parallel_subtrees(self, tmp_path: Path) -> None:
+        """Test that the threaded scan matches a sequential walk of the same tree."""
+        rootfs = tmp_path / "rootfs"
+        for top in ("bin", "etc", "usr", "lib"):
+            nested = rootfs / top / "sub"
+            nested.mkdir(parents=True)
+            (nested / "common").write_bytes(b"x")
+            (rootfs / top / f"{top}-only").write_bytes(b"x")
+        (rootfs / "common").write_bytes(b"x")
+
+        index = _scan_rootfs(rootfs)
+        sequential = _scan_subtree(("", str(rootfs)))
+
+        assert index.files == {k: sorted(v) for k, v in sequential.files.items()}
+        assert index.dirs == {k: sorted(v) for k, v in sequential.dirs.items()}
+        assert index.files["common"] == [
+            "bin/sub/common",
+            "common",
+            "etc/sub/common",
+            "lib/sub/common",
+            "usr/sub/common",
+        ]
+
+    def test_scan_rootfs_prunes_irrelevant_subtrees(self, tmp_path: Path) -> None:
+        """Test that pseudo-filesystems and data trees are indexed but not walked."""
+        rootfs = tmp_path / "rootfs"
+        for subdir in ("proc/1", "usr/share/man/man8", "usr/proc", "etc/doc-tools"):
+            (rootfs / subdir).mkdir(parents=True)
+            (rootfs / subdir / "firewall").write_bytes(b"x")
+
+        index = _scan_rootfs(rootfs)
+
+        assert index.dirs["proc"] == ["proc", "usr/proc"]
+        assert index.dirs["man"] == ["usr/share/man"]
+        assert index.files["firewall"] == ["etc/doc-tools/firewall", "usr/proc/firewall"]
+
+    def test_find_functions_share_index(self, tmp_path: Path) -> None:
+        """Test that find functions use a prebuilt index instead of walking the rootfs."""
+        rootfs = tmp_path / "rootfs"
+        (rootfs / "usr" / "sbin").mkdir(parents=True)
+        (rootfs / "usr" / "sbin" / "dropbear").write_bytes(b"x")
+        index = _scan_rootfs(rootfs)
+
+        # Files created after indexing are not seen
+        (rootfs / "usr" / "sbin" / "nginx").write_bytes(b"x")
+
+        assert find_web_servers(rootfs, index) == []
+        ssh_server = find_ssh_server(rootfs, index)
+        assert ssh_server is not None
+        assert ssh_server.path == "usr/sbin/dropbear"
+
 
 class TestFindSystemdServices:
     """Test find_systemd_services function."""
@@ -475,6 +591,66 @@ class TestFindSystemdServices:
 
         assert len(result) >= 2
 
+    def test_find_systemd_services_only_unit_dirs(self, tmp_path: Path) -> None:
+        """Test that only files below the systemd directories are listed."""
+        rootfs = tmp_path / "rootfs"
+        system = rootfs / "lib" / "systemd" / "system"
+        (system / "multi-user.target.wants").mkdir(parents=True)
+        (system / "sshd.service").write_text("[Unit]")
+        (system / "multi-user.target.wants" / "sshd.service").symlink_to("../sshd.service")
+        (rootfs / "usr" / "share" / "doc").mkdir(parents=True)
+        (rootfs / "usr" / "share" / "doc" / "example.service").write_text("[Unit]")
+        (rootfs / "usr" / "lib").mkdir()
+        (rootfs / "usr" / "lib" / "systemd").symlink_to(rootfs / "lib" / "systemd")
+
+        result = find_systemd_services(rootfs)
+
+        # Unit symlinks count as files, as with rglob(); the symlinked
+        # usr/lib/systemd is the same directory and is not scanned twice
+        assert result == [
+            "lib/systemd/system/multi-user.target.wants/sshd.service",
+            "lib/systemd/system/sshd.service",
+        ]
+
+    def test_find_systemd_services_stays_inside_rootfs(self, tmp_path: Path) -> None:
+        """Test that a unit directory symlinked outside the rootfs is not scanned."""
+        host_lib = tmp_path / "host" / "usr" / "lib"
+        (host_lib / "systemd" / "system").mkdir(parents=True)
+        (host_lib / "systemd" / "system" / "host.service").write_text("[Unit]")
+        rootfs = tmp_path / "rootfs"
+        (rootfs / "etc" / "systemd" / "system").mkdir(parents=True)
+        (rootfs / "etc" / "systemd" / "system" / "local.service").write_text("[Unit]")
+        # An absolute merged-/usr symlink resolves against the host
+        (rootfs / "lib").symlink_to(host_lib)
+
+        result = find_systemd_services(rootfs)
+
+        assert result == ["etc/systemd/system/local.service"]
+
+    def test_find_systemd_services_sees_new_directories(self, tmp_path: Path) -> None:
+        """Test that repeated calls list directories afresh."""
+        rootfs = tmp_path / "rootfs"
+        rootfs.mkdir()
+        assert find_systemd_services(rootfs) == []
+
+        (rootfs / "etc" / "systemd" / "system").mkdir(parents=True)
+        (rootfs / "etc" / "systemd" / "system" / "new.service").write_text("[Unit]")
+
+        assert find_systemd_services(rootfs) == ["etc/systemd/system/new.service"]
+
+    def test_find_systemd_services_shares_listings(self, tmp_path: Path) -> None:
+        """Test that a caller-supplied DirListings is reused, not listed again."""
+        rootfs = tmp_path / "rootfs"
+        (rootfs / "etc").mkdir(parents=True)
+        listings = DirListings(rootfs)
+        assert "systemd" not in listings.names("etc")
+
+        (rootfs / "etc" / "systemd" / "system").mkdir(parents=True)
+        (rootfs / "etc" / "systemd" / "system" / "net.service").write_text("[Unit]")
+
+        assert find_systemd_services(rootfs, listings) == []
+        assert find_systemd_services(rootfs) == ["etc/systemd/system/net.service"]
+
     def test_find_systemd_services_not_found(self, tmp_path: Path) -> None:
         """Test finding systemd services when directories don't exist."""
         rootfs = tmp_path / "rootfs"
@@ -502,6 +678,19 @@ class TestFindWebServers:
         assert "nginx" in result[0].path
         assert "Nginx" in result[0].description
 
+    def test_find_web_server_prefers_exact_name(self, tmp_path: Path) -> None:
+        """Test that an exact basename beats a prefix match, which is the fallback."""
+        rootfs = tmp_path / "rootfs"
+        sbin = rootfs / "usr" / "sbin"
+        sbin.mkdir(parents=True)
+        (sbin / "httpd").write_bytes(b"dummy binary")
+        (sbin / "httpd-helper").write_bytes(b"dummy binary")
+        (sbin / "nginx-1.24").write_bytes(b"dummy binary")
+
+        result = {s.name: s.path for s in find_web_servers(rootfs)}
+
+        assert result == {"nginx": "usr/sbin/nginx-1.24", "httpd": "usr/sbin/httpd"}
+
     def test_find_lighttpd(self, tmp_path: Path) -> None:
         """Test finding Lighttpd web server."""
         rootfs = tmp_path / "rootfs"
@@ -578,6 +767,36 @@ class TestFindWebFrameworks:
 
         assert result == []
 
+    def test_find_web_frameworks_requires_site_packages_parent(self, tmp_path: Path) -> None:
+        """Test that framework directories outside site-packages are ignored."""
+        rootfs = tmp_path / "rootfs"
+        (rootfs / "usr" / "share" / "aiohttp").mkdir(parents=True)
+        (rootfs / "usr" / "lib" / "not-site-packages" / "uvicorn").mkdir(parents=True)
+
+        result = find_web_frameworks(rootfs)
+
+        assert result == []
+
+    def test_find_versioned_dist_info(self, tmp_path: Path) -> None:
+        """Test that a dist-info directory alone identifies the framework."""
+        rootfs = tmp_path / "rootfs"
+        site_packages = rootfs / "usr" / "lib" / "python3.11" / "site-packages"
+        (site_packages / "aiohttp-3.9.1.dist-info").mkdir(parents=True)
+
+        result = find_web_frameworks(rootfs)
+
+        assert [framework.name for framework in result] == ["aiohttp"]
+
+    def test_framework_outside_usr_lib_still_found(self, tmp_path: Path) -> None:
+        """Test that site-packages directories outside usr/lib are searched too."""
+        rootfs = tmp_path / "rootfs"
+        (rootfs / "usr" / "lib" / "python3.10" / "site-packages" / "uvicorn").mkdir(parents=True)
+        (rootfs / "opt" / "venv" / "site-packages" / "aiohttp").mkdir(parents=True)
+
+        result = find_web_frameworks(rootfs)
+
+        assert [framework.name for framework in result] == ["aiohttp", "uvicorn"]
+
 
 class TestFindSshServer:
     """Test find_ssh_server function."""
@@ -608,6 +827,33 @@ class TestFindSshServer:
         assert result.name == "dropbear"
         assert "Dropbear" in result.description
 
+    def test_find_ssh_server_sshd_priority_over_dropbear(self, tmp_path: Path) -> None:
+        """Test that sshd in an unusual location still wins over dropbear in usr/sbin."""
+        rootfs = tmp_path / "rootfs"
+        (rootfs / "usr" / "sbin").mkdir(parents=True)
+        (rootfs / "usr" / "sbin" / "dropbear").write_bytes(b"dummy binary")
+        (rootfs / "opt" / "openssh" / "sbin").mkdir(parents=True)
+        (rootfs / "opt" / "openssh" / "sbin" / "sshd").write_bytes(b"dummy binary")
+
+        result = find_ssh_server(rootfs)
+
+        assert result is not None
+        assert result.name == "sshd"
+        assert result.path == "opt/openssh/sbin/sshd"
+
+    def test_find_ssh_server_unusual_path(self, tmp_path: Path) -> None:
+        """Test finding sshd outside the usual bin and sbin directories."""
+        rootfs = tmp_path / "rootfs"
+        bindir = rootfs / "opt" / "openssh" / "bin"
+        bindir.mkdir(parents=True)
+        (bindir / "sshd").write_bytes(b"dummy binary")
+
+        result = find_ssh_server(rootfs)
+
+        assert result is not None
+        assert result.name == "sshd"
+        assert result.path == "opt/openssh/bin/sshd"
+
     def test_find_ssh_server_not_found(self, tmp_path: Path) -> None:
         """Test finding SSH server when none exists."""
         rootfs = tmp_path / "rootfs"
@@ -778,47 +1024,131 @@ user:!:19001:0:99999:7:::
         assert result[0].username == "root"
         assert result[1].username == "user"
 
+    def test_analyze_shadow_file_non_utf8(self, tmp_path: Path) -> None:
+        """Test that undecodable bytes in /etc/shadow do not abort parsing."""
+        rootfs = tmp_path / "rootfs"
+        etc = rootfs / "etc"
+        etc.mkdir(parents=True)
+
+        (etc / "shadow").write_bytes(b"r\xf6ot:$6$salt$hashhashhash:19000::\n")
+
+        result = analyze_shadow_file(rootfs)
+
+        assert len(result) == 1
+        assert result[0].username == "r\ufffdot"
+        assert result[0].hash_type == "sha512"
+
+    def test_analyze_shadow_file_binary(self, tmp_path: Path) -> None:
+        """Test that binary content is skipped."""
+        rootfs = tmp_path / "rootfs"
+        etc = rootfs / "etc"
+        etc.mkdir(parents=True)
+
+        (etc / "shadow").write_bytes(b"\x1f\x8b\x08\x00root:$1$abc:1::")
+        assert analyze_shadow_file(rootfs) == []
+
+    def test_analyze_shadow_file_leading_blank_line(self, tmp_path: Path) -> None:
+        """Test that a blank or malformed first line only skips that line."""
+        rootfs = tmp_path / "rootfs"
+        etc = rootfs / "etc"
+        etc.mkdir(parents=True)
+
+        (etc / "shadow").write_text("\nroot:$6$salt$hashhash:19000:0:99999:7:::\n")
+        result = analyze_shadow_file(rootfs)
+        assert [(entry.username, entry.hash_type) for entry in result] == [("root", "sha512")]
+
+        (etc / "shadow").write_text("just some text\nuser:!:19001::::::\n")
+        result = analyze_shadow_file(rootfs)
+        assert [(entry.username, entry.hash_type) for entry in result] == [("user", "locked")]
+
+
+class TestLooksTextual:
+    """Test _looks_textual function."""
+
+    def test_text(self) -> None:
+        """Test that plain text, including tabs and newlines, is textual."""
+        assert _looks_textual(b"option key\t'x'\r\n")
+        assert _looks_textual(b"")
+
+    def test_binary(self) -> None:
+        """Test that NUL bytes or dense control bytes mark content as binary."""
+        assert not _looks_textual(b"abc\x00def")
+        assert not _looks_textual(b"\x1b\x01\x02abcdef")
+
 
 class TestFindSensitiveFiles:
     """Test find_sensitive_files function."""
 
-    @patch("subprocess.run")
-    def test_find_sensitive_files_success(self, mock_run: Any, tmp_path: Path) -> None:
-        """Test finding sensitive files with grep."""
+    def test_find_sensitive_files_success(self, tmp_path: Path) -> None:
+        """Test finding sensitive files by content."""
         rootfs = tmp_path / "rootfs"
         etc = rootfs / "etc"
         etc.mkdir(parents=True)
 
         # Create some files
         (etc / "config1").write_text("password=secret")
-        (etc / "config2").write_text("api_key=12345")
+        (etc / "config2").write_text("API_KEY=12345")
+        (etc / "hostname").write_text("comet")
+        (etc / "empty").write_text("")
 
-        # Mock grep output
-        mock_run.return_value = MagicMock(
-            stdout=f"{etc / 'config1'}\n{etc / 'config2'}\n", returncode=0
-        )
+        result = find_sensitive_files(rootfs)
+
+        assert result == ["etc/config1", "etc/config2"]
+
+    def test_find_sensitive_files_recurses(self, tmp_path: Path) -> None:
+        """Test that subdirectories are scanned and symlinks are skipped."""
+        rootfs = tmp_path / "rootfs"
+        config = rootfs / "etc" / "config"
+        config.mkdir(parents=True)
+        (config / "wireless").write_text("option key 'token'")
+        (rootfs / "etc" / "link").symlink_to(config / "wireless")
 
         result = find_sensitive_files(rootfs)
 
-        assert len(result) == 2
-        assert "etc/config1" in result
-        assert "etc/config2" in result
+        assert result == ["etc/config/wireless"]
 
-    @patch("subprocess.run")
-    def test_find_sensitive_files_limits_output(self, mock_run: Any, tmp_path: Path) -> None:
+    def test_find_sensitive_files_matches_like_grep(self, tmp_path: Path) -> None:
+        """Test case-insensitive literals, the api.key wildcard and binary skipping."""
+        rootfs = tmp_path / "rootfs"
+        etc = rootfs / "etc"
+        etc.mkdir(parents=True)
+        (etc / "a_upper").write_text("PassWord=1")
+        (etc / "b_apikey").write_text("api-key: x")
+        (etc / "c_api_only").write_text("api\nkey")
+        (etc / "d_binary").write_bytes(b"\x7fELF\x00\x00token")
+
+        result = find_sensitive_files(rootfs)
+
+        assert result == ["etc/a_upper", "etc/b_apikey"]
+
+    def test_find_sensitive_files_skips_certificates_and_catalogs(self, tmp_path: Path) -> None:
+        """Test that certificate bundles and message catalogs are not scanned."""
+        rootfs = tmp_path / "rootfs"
+        etc = rootfs / "etc"
+        (etc / "ssl").mkdir(parents=True)
+        (etc / "ssl" / "ca-certificates.crt").write_text("Secret CA")
+        (etc / "ssl" / "server.pem").write_text("token")
+        (etc / "messages.mo").write_text("password")
+        (etc / "shadow.conf").write_text("password")
+
+        result = find_sensitive_files(rootfs)
+
+        assert result == ["etc/shadow.conf"]
+
+    def test_find_sensitive_files_limits_output(self, tmp_path: Path) -> None:
         """Test that sensitive files are limited to 20."""
         rootfs = tmp_path / "rootfs"
         etc = rootfs / "etc"
         etc.mkdir(parents=True)
 
-        # Mock grep output with 30 files
-        files = [str(etc / f"config{i}") for i in range(30)]
-        mock_run.return_value = MagicMock(stdout="\n".join(files), returncode=0)
+        for i in range(30):
+            (etc / f"config{i:02d}").write_text("secret")
 
         result = find_sensitive_files(rootfs)
 
         # Limited to 20
-        assert len(result) <= 20
+        assert len(result) == 20
+        assert result[0] == "etc/config00"
 
     def test_find_sensitive_files_no_etc(self, tmp_path: Path) -> None:
         """Test finding sensitive files when /etc doesn't exist."""
@@ -868,6 +1198,26 @@ class TestFindFirewallRules:
 
         assert result == []
 
+    def test_find_firewall_rules_order_and_dedup(self, tmp_path: Path) -> None:
+        """Test that iptables rules precede firewall configs and overlaps count once."""
+        rootfs = tmp_path / "rootfs"
+        iptables = rootfs / "etc" / "iptables"
+        iptables.mkdir(parents=True)
+        (iptables / "firewall.rules").write_text("-A INPUT -j DROP")
+        (iptables / "nat.rules").write_text("-A POSTROUTING")
+        for i in range(6):
+            (rootfs / "etc" / f"firewall{i}").write_text("config")
+
+        result = find_firewall_rules(rootfs)
+
+        assert result == [
+            "etc/iptables/firewall.rules",
+            "etc/iptables/nat.rules",
+            "etc/firewall0",
+            "etc/firewall1",
+            "etc/firewall2",
+        ]
+
     def test_find_firewall_rules_limits_output(self, tmp_path: Path) -> None:
         """Test that firewall rules are limited to 5."""
         rootfs = tmp_path / "rootfs"
@@ -1090,15 +1440,10 @@ user:!:19001:0:99999:7:::
 
         return rootfs
 
-    @patch("subprocess.run")
-    def test_realistic_network_services_analysis(self, mock_run: Any, tmp_path: Path) -> None:
+    def test_realistic_network_services_analysis(self, tmp_path: Path) -> None:
         """Test complete analysis workflow with realistic filesystem."""
         rootfs = self._setup_network_rootfs(tmp_path)
 
-        # Mock grep for sensitive files
-        config_file = rootfs / "etc" / "config"
-        mock_run.return_value = MagicMock(stdout=str(config_file), returncode=0)
-
         # Create analysis object
         analysis = NetworkServicesAnalysis(
             firmware_file="test.img",
@@ -1164,6 +1509,34 @@ user:!:19001:0:99999:7:::
         assert parsed["passwd_file_exists"] is True
         assert parsed["shadow_file_exists"] is True
 
+    def test_analyze_firmware_rechecks_existence_per_run(self, tmp_path: Path) -> None:
+        """Test that memoized existence checks do not leak between runs."""
+        firmware = tmp_path / "test.img"
+        firmware.write_bytes(b"firmware")
+        rootfs = tmp_path / "squashfs-root"
+        (rootfs / "etc").mkdir(parents=True)
+
+        assert analyze_firmware(str(firmware), rootfs).passwd_file_exists is False
+
+        (rootfs / "etc" / "passwd").write_text("root:x:0:0:root:/root:/bin/sh\n")
+
+        assert analyze_firmware(str(firmware), rootfs).passwd_file_exists is True
+
+    def test_analyze_firmware_counts_absolute_symlinks_as_present(self, tmp_path: Path) -> None:
+        """Test that /etc entries linking outside the rootfs still count as present."""
+        firmware = tmp_path / "test.img"
+        firmware.write_bytes(b"firmware")
+        rootfs = tmp_path / "squashfs-root"
+        (rootfs / "etc" / "network").mkdir(parents=True)
+        (rootfs / "etc" / "passwd").symlink_to("/nonexistent/passwd")
+        (rootfs / "etc" / "network" / "interfaces").symlink_to("/tmp/nonexistent/interfaces")
+
+        analysis = analyze_firmware(str(firmware), rootfs)
+
+        assert analysis.passwd_file_exists is True
+        assert analysis.shadow_file_exists is False
+        assert analysis.network_interfaces_exists is True
+
     def test_to_dict_json_output(self) -> None:
         """Test that to_dict works for JSON output."""
         analysis = NetworkServicesAnalysis(
@@ -1180,9 +1553,7 @@ user:!:19001:0:99999:7:::
             path="/usr/sbin/dropbear",
             description="Dropbear SSH server",
         )
-        analysis.password_entries = [
-            PasswordEntry(username="root", hash_type="sha512", description="SHA-512 hash (strong)")
-        ]
+        analysis.password_entries = [PasswordEntry(username="root", hash_type="sha512")]
         analysis.add_metadata("firmware_file", "filesystem", "Path(firmware).name")
 
         result = analysis.to_dict()
@@ -1200,6 +1571,75 @@ user:!:19001:0:99999:7:::
         assert len(parsed["password_entries"]) == 1
 
 
+class TestAnalysisCache:
+    """Test the firmware-digest keyed analysis cache."""
+
+    @staticmethod
+    def _make_analysis() -> NetworkServicesAnalysis:
+        analysis = NetworkServicesAnalysis(
+            firmware_file="test.img",
+            firmware_size=1024,
+            rootfs_path="/tmp/root",
+            init_scripts=[InitScript(name="network", size=4096)],
+            web_servers=[ServiceBinary(name="nginx", path="usr/sbin/nginx", description="Nginx")],
+            ssh_server=ServiceBinary(name="dropbear", path="usr/sbin/dropbear", description="SSH"),
+            password_entries=[PasswordEntry(username="root", hash_type="md5")],
+            firewall_rules=["etc/config/firewall"],
+            web_server_count=1,
+        )
+        analysis.add_metadata("web_servers", "filesystem", "find rootfs for nginx")
+        return analysis
+
+    def test_cache_round_trip(self) -> None:
+        """Test that a cached analysis is restored field for field."""
+        analysis = self._make_analysis()
+
+        restored = _analysis_from_dict(json.loads(json.dumps(asdict(analysis))))
+
+        assert asdict(restored) == asdict(analysis)
+        assert restored.to_dict() == analysis.to_dict()
+
+    def test_script_ignores_cache_by_default(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that every run extracts and scans unless the cache is enabled."""
+        monkeypatch.delenv(CACHE_ENV, raising=False)
+        firmware = tmp_path / "firmware.img"
+        firmware.write_bytes(b"firmware")
+        script = NetworkServicesScript()
+        script.work_dir = tmp_path / "work"
+        rootfs = tmp_path / "squashfs-root"
+        (rootfs / "etc").mkdir(parents=True)
+
+        with patch.object(script, "initialize_extraction", return_value=(tmp_path, rootfs)) as ex:
+            script.analyze(str(firmware))
+            script.analyze(str(firmware))
+
+        assert ex.call_count == 2
+        assert not (script.work_dir / CACHE_DIR).exists()
+
+    def test_script_skips_extraction_on_cache_hit(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that unchanged firmware is served from the cache when enabled."""
+        monkeypatch.setenv(CACHE_ENV, "1")
+        firmware = tmp_path / "renamed.img"
+        firmware.write_bytes(b"firmware")
+        script = NetworkServicesScript()
+        script.work_dir = tmp_path / "work"
+        rootfs = tmp_path / "squashfs-root"
+        (rootfs / "etc").mkdir(parents=True)
+
+        with patch.object(script, "initialize_extraction", return_value=(tmp_path, rootfs)) as ex:
+            first = script.analyze(str(firmware))
+            second = script.analyze(str(firmware))
+
+        assert ex.call_count == 1
+        assert isinstance(second, NetworkServicesAnalysis)
+        assert second.firmware_file == "renamed.img"
+        assert second.to_dict() == first.to_dict()
+
+
 class TestMainFunction:
     """Test main() function integration."""
 
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 import sys
+from dataclasses import asdict
 from pathlib import Path
 from typing import Any
 from unittest.mock import MagicMock, patch
@@ -22,6 +23,8 @@ from analyze_proprietary_blobs import (
     LibraryInfo,
     ProprietaryBlobsAnalysis,
     ProprietaryBlobsScript,
+    RootfsFile,
+    _analysis_from_dict,
     analyze_binary,
     analyze_proprietary_blobs,
     classify_license,
@@ -31,7 +34,9 @@ from analyze_proprietary_blobs import (
     find_libraries,
     find_wifi_bt_blobs,
     has_gpl_string,
+    walk_rootfs,
 )
+from lib.analysis_cache import CACHE_DIR, CACHE_ENV
 from lib.finders import get_file_size
 from lib.firmware import extract_firmware
 from lib.firmware import find_squashfs_rootfs as find_rootfs
@@ -463,118 +468,88 @@ class TestGetFileSize:
 class TestClassifyLicense:
     """Test classify_license function."""
 
-    @patch("subprocess.run")
-    def test_classify_open_source_apache(self, mock_run: Any, tmp_path: Path) -> None:
+    def test_classify_open_source_apache(self, tmp_path: Path) -> None:
         """Test detecting Apache license in binary."""
         lib_file = tmp_path / "librga.so"
-        lib_file.write_bytes(b"dummy")
-
-        mock_run.return_value = MagicMock(
-            stdout="some text\nLicensed under the Apache License\nmore text\n",
-            returncode=0,
-        )
+        lib_file.write_bytes(b"\x7fELF\x00some text\x00Licensed under the Apache License\x00")
 
         label, evidence = classify_license(lib_file)
 
         assert label == "open_source"
         assert "Apache" in evidence
 
-    @patch("subprocess.run")
-    def test_classify_open_source_gpl(self, mock_run: Any, tmp_path: Path) -> None:
+    def test_classify_open_source_gpl(self, tmp_path: Path) -> None:
         """Test detecting GPL license in binary."""
         lib_file = tmp_path / "libtest.so"
-        lib_file.write_bytes(b"dummy")
-
-        mock_run.return_value = MagicMock(
-            stdout="some text\nGPL v2\nmore text\n",
-            returncode=0,
-        )
+        lib_file.write_bytes(b"\x7fELF\x00some text\x00GPL v2\x00more text\x00")
 
         label, evidence = classify_license(lib_file)
 
         assert label == "open_source"
         assert "GPL" in evidence
 
-    @patch("subprocess.run")
-    def test_classify_proprietary(self, mock_run: Any, tmp_path: Path) -> None:
+    def test_classify_proprietary(self, tmp_path: Path) -> None:
         """Test classifying binary with no license strings as proprietary."""
         lib_file = tmp_path / "libproprietary.so"
-        lib_file.write_bytes(b"dummy")
-
-        mock_run.return_value = MagicMock(
-            stdout="some random text\nno matching patterns here\n",
-            returncode=0,
-        )
+        lib_file.write_bytes(b"\x7fELF\x00some random text\x00no matching patterns here\x00")
 
         label, evidence = classify_license(lib_file)
 
         assert label == "proprietary"
         assert "no license strings" in evidence
 
-    def test_classify_file_not_found(self, tmp_path: Path) -> None:
-        """Test classifying a nonexistent file returns unknown."""
-        lib_file = tmp_path / "nonexistent.so"
+    def test_classify_ignores_short_runs(self, tmp_path: Path) -> None:
+        """Test that a pattern strings(1) would not print does not count."""
+        lib_file = tmp_path / "libtest.so"
+        lib_file.write_bytes(b"\x00\x01gpl\x02\x00bsd\x00")
 
-        label, evidence = classify_license(lib_file)
+        label, _ = classify_license(lib_file)
 
-        assert label == "unknown"
-        assert "file not found" in evidence
+        assert label == "proprietary"
 
-    @patch("subprocess.run")
-    def test_classify_strings_command_fails(self, mock_run: Any, tmp_path: Path) -> None:
-        """Test classifying when strings command fails."""
-        lib_file = tmp_path / "test.so"
-        lib_file.write_bytes(b"dummy")
+    def test_classify_empty_file(self, tmp_path: Path) -> None:
+        """Test that an empty library, which cannot be mapped, is proprietary."""
+        lib_file = tmp_path / "libempty.so"
+        lib_file.write_bytes(b"")
 
-        mock_run.return_value = MagicMock(
-            stdout="",
-            returncode=1,
-        )
+        label, _ = classify_license(lib_file)
+
+        assert label == "proprietary"
+
+    def test_classify_file_not_found(self, tmp_path: Path) -> None:
+        """Test classifying a nonexistent file returns unknown."""
+        lib_file = tmp_path / "nonexistent.so"
 
         label, evidence = classify_license(lib_file)
 
         assert label == "unknown"
-        assert "strings command failed" in evidence
+        assert "file not found" in evidence
 
-    @patch("subprocess.run")
-    def test_classify_exception_handling(self, mock_run: Any, tmp_path: Path) -> None:
-        """Test classifying when subprocess raises exception."""
+    def test_classify_unreadable_file(self, tmp_path: Path) -> None:
+        """Test classifying when the file cannot be read."""
         lib_file = tmp_path / "test.so"
         lib_file.write_bytes(b"dummy")
 
-        mock_run.side_effect = OSError("strings command not found")
-
-        label, evidence = classify_license(lib_file)
+        with patch.object(Path, "open", side_effect=PermissionError("denied")):
+            label, evidence = classify_license(lib_file)
 
         assert label == "unknown"
         assert "error:" in evidence
 
-    @patch("subprocess.run")
-    def test_classify_lgpl(self, mock_run: Any, tmp_path: Path) -> None:
+    def test_classify_lgpl(self, tmp_path: Path) -> None:
         """Test detecting LGPL license in binary."""
         lib_file = tmp_path / "libtest.so"
-        lib_file.write_bytes(b"dummy")
-
-        mock_run.return_value = MagicMock(
-            stdout="some text\nLGPL-2.1\nmore text\n",
-            returncode=0,
-        )
+        lib_file.write_bytes(b"\x7fELF\x00some text\x00LGPL-2.1\x00more text\x00")
 
         label, evidence = classify_license(lib_file)
 
         assert label == "open_source"
         assert "LGPL" in evidence
 
-    @patch("subprocess.run")
-    def test_classify_bsd(self, mock_run: Any, tmp_path: Path) -> None:
+    def test_classify_bsd(self, tmp_path: Path) -> None:
         """Test detecting BSD license in binary."""
         lib_file = tmp_path / "libtest.so"
-        lib_file.write_bytes(b"dummy")
-
-        mock_run.return_value = MagicMock(
-            stdout="some text\nBSD 3-Clause\nmore text\n",
-            returncode=0,
-        )
+        lib_file.write_bytes(b"\x7fELF\x00some text\x00BSD 3-Clause\x00more text\x00")
 
         label, evidence = classify_license(lib_file)
 
@@ -592,6 +567,79 @@ class TestClassifyLicense:
             assert len(evidence) > 0
 
 
+class TestWalkRootfs:
+    """Test walk_rootfs function."""
+
+    def test_walk_rootfs_lists_files_with_sizes(self, tmp_path: Path) -> None:
+        """Test that every regular file is listed once, sorted, with its size."""
+        rootfs = tmp_path / "rootfs"
+        (rootfs / "usr/lib").mkdir(parents=True)
+        (rootfs / "lib").mkdir()
+        (rootfs / "usr/lib/librga.so").write_bytes(b"x" * 512)
+        (rootfs / "lib/dwc3.ko").write_bytes(b"x" * 64)
+
+        result = walk_rootfs(rootfs)
+
+        assert result == [
+            RootfsFile(path="/lib/dwc3.ko", name="dwc3.ko", size=64),
+            RootfsFile(path="/usr/lib/librga.so", name="librga.so", size=512),
+        ]
+
+    def test_walk_rootfs_does_not_follow_dir_symlinks(self, tmp_path: Path) -> None:
+        """Test that symlinked directories are skipped like Path.rglob()."""
+        rootfs = tmp_path / "rootfs"
+        (rootfs / "usr/lib").mkdir(parents=True)
+        (rootfs / "usr/lib/librga.so.1").write_bytes(b"x" * 256)
+        (rootfs / "usr/lib/librga.so").symlink_to("librga.so.1")
+        (rootfs / "lib").symlink_to("usr/lib")
+
+        result = walk_rootfs(rootfs)
+
+        assert result == [
+            RootfsFile(path="/usr/lib/librga.so", name="librga.so", size=256),
+            RootfsFile(path="/usr/lib/librga.so.1", name="librga.so.1", size=256),
+        ]
+
+    def test_walk_rootfs_prunes_uninteresting_trees(self, tmp_path: Path) -> None:
+        """Test that pseudo-filesystems and documentation trees are skipped."""
+        rootfs = tmp_path / "rootfs"
+        for directory in ("proc/1", "usr/share/man/man3", "usr/lib/__pycache__", "opt/proc"):
+            (rootfs / directory).mkdir(parents=True)
+        (rootfs / "proc/1/maps").write_bytes(b"x")
+        (rootfs / "usr/share/man/man3/librga.3").write_bytes(b"x")
+        (rootfs / "usr/lib/__pycache__/rga.cpython-311.pyc").write_bytes(b"x")
+        (rootfs / "opt/proc/librga.so").write_bytes(b"x")
+
+        result = walk_rootfs(rootfs)
+
+        # Only a top-level proc is pruned
+        assert [file.path for file in result] == ["/opt/proc/librga.so"]
+
+    @patch("analyze_proprietary_blobs.has_gpl_string", return_value=False)
+    @patch("analyze_proprietary_blobs.classify_license", return_value=("unknown", ""))
+    def test_finders_share_prebuilt_listing(
+        self, _mock_classify: Any, _mock_has_gpl: Any, tmp_path: Path
+    ) -> None:
+        """Test that finders filter a prebuilt listing instead of walking again."""
+        rootfs = tmp_path / "rootfs"
+        (rootfs / "usr/lib").mkdir(parents=True)
+        (rootfs / "usr/lib/librga.so").write_bytes(b"x")
+        files = walk_rootfs(rootfs)
+
+        # Files created after the walk are not seen
+        (rootfs / "usr/lib/dwc3.ko").write_bytes(b"x")
+
+        with patch("analyze_proprietary_blobs.walk_rootfs") as mock_walk:
+            libs = find_libraries(rootfs, ["librga.so*"], "2D graphics", files)
+            rockchip = find_all_rockchip_libs(rootfs, files)
+            modules = find_kernel_modules(rootfs, files)
+
+        mock_walk.assert_not_called()
+        assert [lib.path for lib in libs] == ["/usr/lib/librga.so"]
+        assert rockchip == ["/usr/lib/librga.so"]
+        assert modules == []
+
+
 class TestFindLibraries:
     """Test find_libraries function."""
 
@@ -670,6 +718,24 @@ class TestFindLibraries:
         # Should only return one library (first match)
         assert len(result) == 1
 
+    @patch("analyze_proprietary_blobs.classify_license")
+    def test_find_libraries_overlapping_patterns_take_next_match(
+        self, mock_classify: Any, tmp_path: Path
+    ) -> None:
+        """Test that a pattern skips files already claimed by an earlier pattern."""
+        rootfs = tmp_path / "rootfs"
+        lib_dir = rootfs / "usr/lib"
+        lib_dir.mkdir(parents=True)
+        (lib_dir / "librga.so").write_bytes(b"x" * 1024)
+        (lib_dir / "librga.so.2").write_bytes(b"x" * 2048)
+        (lib_dir / "librga.pyc").write_bytes(b"x")
+
+        mock_classify.return_value = ("unknown", "")
+
+        result = find_libraries(rootfs, ["librga.so*", "librga.s*"], "2D graphics")
+
+        assert [lib.path for lib in result] == ["/usr/lib/librga.so", "/usr/lib/librga.so.2"]
+
     @patch("analyze_proprietary_blobs.classify_license")
     def test_find_libraries_purpose_includes_size(self, mock_classify: Any, tmp_path: Path) -> None:
         """Test that purpose includes file size."""
@@ -875,67 +941,76 @@ class TestFindFirmwareBlobs:
         # Should be limited to 50
         assert len(result) == 50
 
+    def test_find_firmware_blobs_keeps_first_50_in_path_order(self, tmp_path: Path) -> None:
+        """Test that the early-exit walk keeps the same blobs as sorting every file."""
+        rootfs = tmp_path / "rootfs"
+        fw_dir = rootfs / "lib/firmware"
+        for i in range(30):
+            for subdir in ("brcm", "brcm.d", "a"):
+                (fw_dir / subdir).mkdir(parents=True, exist_ok=True)
+                (fw_dir / subdir / f"blob{i:02d}.bin").write_bytes(b"x" * i)
+        (fw_dir / "brcm.bin").write_bytes(b"x")
+
+        result = find_firmware_blobs(rootfs)
+
+        expected = sorted(p for p in fw_dir.rglob("*") if p.is_file())[:50]
+        assert [blob.path for blob in result] == [
+            "/" + str(p.relative_to(rootfs)) for p in expected
+        ]
+        assert result[-1].size == 19
+
 
 class TestHasGplString:
     """Test has_gpl_string function."""
 
-    @patch("subprocess.run")
-    def test_has_gpl_string_found(self, mock_run: Any, tmp_path: Path) -> None:
+    def test_has_gpl_string_found(self, tmp_path: Path) -> None:
         """Test detecting GPL string in kernel module."""
         ko_file = tmp_path / "test.ko"
-        ko_file.write_bytes(b"dummy")
-
-        # Mock subprocess.run to return GPL string
-        mock_run.return_value = MagicMock(
-            stdout="some text\nlicense=GPL\nmore text\n",
-            returncode=0,
-        )
+        ko_file.write_bytes(b"\x7fELF\x00\x00license=GPL\x00more text\x00")
 
-        result = has_gpl_string(ko_file)
+        assert has_gpl_string(ko_file) is True
 
-        assert result is True
-        mock_run.assert_called_once()
-
-    @patch("subprocess.run")
-    def test_has_gpl_string_case_insensitive(self, mock_run: Any, tmp_path: Path) -> None:
+    def test_has_gpl_string_case_insensitive(self, tmp_path: Path) -> None:
         """Test that GPL detection is case-insensitive."""
         ko_file = tmp_path / "test.ko"
-        ko_file.write_bytes(b"dummy")
+        ko_file.write_bytes(b"\x00license=gpl\x00")
 
-        # Mock with lowercase "gpl"
-        mock_run.return_value = MagicMock(
-            stdout="some text\nlicense=gpl\nmore text\n",
-            returncode=0,
-        )
-
-        result = has_gpl_string(ko_file)
-
-        assert result is True
+        assert has_gpl_string(ko_file) is True
 
-    @patch("subprocess.run")
-    def test_has_gpl_string_not_found(self, mock_run: Any, tmp_path: Path) -> None:
+    def test_has_gpl_string_not_found(self, tmp_path: Path) -> None:
         """Test when GPL string is not found."""
         ko_file = tmp_path / "test.ko"
-        ko_file.write_bytes(b"dummy")
+        ko_file.write_bytes(b"\x00some text\x00proprietary\x00")
 
-        mock_run.return_value = MagicMock(
-            stdout="some text\nproprietary\nmore text\n",
-            returncode=0,
-        )
+        assert has_gpl_string(ko_file) is False
 
-        result = has_gpl_string(ko_file)
+    def test_has_gpl_string_ignores_short_runs(self, tmp_path: Path) -> None:
+        """Test that a bare 'GPL' between binary bytes is not a reportable string."""
+        ko_file = tmp_path / "test.ko"
+        ko_file.write_bytes(b"\x00\x01GPL\x02\x00GPL")
 
-        assert result is False
+        assert has_gpl_string(ko_file) is False
 
-    @patch("subprocess.run")
-    def test_has_gpl_string_exception(self, mock_run: Any, tmp_path: Path) -> None:
-        """Test that exceptions are handled gracefully."""
+    def test_has_gpl_string_does_not_run_strings(self, tmp_path: Path) -> None:
+        """Test that the module is scanned in-process."""
         ko_file = tmp_path / "test.ko"
-        ko_file.write_bytes(b"dummy")
+        ko_file.write_bytes(b"license=GPL v2")
+
+        with patch("subprocess.run") as mock_run:
+            assert has_gpl_string(ko_file) is True
+
+        mock_run.assert_not_called()
+
+    def test_has_gpl_string_empty_module(self, tmp_path: Path) -> None:
+        """Test that an empty module, which cannot be mapped, has no GPL string."""
+        ko_file = tmp_path / "empty.ko"
+        ko_file.write_bytes(b"")
 
-        mock_run.side_effect = OSError("strings command failed")
+        assert has_gpl_string(ko_file) is False
 
-        result = has_gpl_string(ko_file)
+    def test_has_gpl_string_exception(self, tmp_path: Path) -> None:
+        """Test that unreadable files are handled gracefully."""
+        result = has_gpl_string(tmp_path / "missing.ko")
 
         assert result is False
 
@@ -981,8 +1056,10 @@ class TestFindKernelModules:
 
         result = find_kernel_modules(rootfs)
 
-        # Should be limited to 30
+        # Should be limited to 30, and only those are checked for GPL strings
         assert len(result) == 30
+        assert mock_has_gpl.call_count == 30
+        assert result[-1].name == "module029.ko"
 
     def test_find_kernel_modules_none_found(self, tmp_path: Path) -> None:
         """Test finding when no kernel modules exist."""
@@ -993,6 +1070,20 @@ class TestFindKernelModules:
 
         assert result == []
 
+    def test_find_kernel_modules_keeps_gpl_results_in_order(self, tmp_path: Path) -> None:
+        """Test that GPL checks are matched to their own modules."""
+        rootfs = tmp_path / "rootfs"
+        module_dir = rootfs / "lib/modules"
+        module_dir.mkdir(parents=True)
+        for i in range(12):
+            license_text = b"license=GPL v2" if i % 3 == 0 else b"license=Proprietary"
+            (module_dir / f"mod{i:02d}.ko").write_bytes(b"\x00\x7fELF\x00" + license_text)
+
+        result = find_kernel_modules(rootfs)
+
+        assert [m.name for m in result] == [f"mod{i:02d}.ko" for i in range(12)]
+        assert [m.has_gpl for m in result] == [i % 3 == 0 for i in range(12)]
+
 
 class TestAnalyzeBinary:
     """Test analyze_binary function."""
@@ -1001,64 +1092,92 @@ class TestAnalyzeBinary:
     def test_analyze_binary_success(self, mock_run: Any, tmp_path: Path) -> None:
         """Test analyzing a binary library."""
         lib_file = tmp_path / "librockchip_mpp.so"
-        lib_file.write_bytes(b"dummy")
+        # 64-bit little-endian ELF header with e_type ET_DYN
+        elf_header = b"\x7fELF\x02\x01\x01" + b"\x00" * 9 + b"\x03\x00"
+        lib_file.write_bytes(
+            elf_header + b"random text\x00Copyright 2023 Rockchip\x00"
+            b"\x01Version 1.0\x00\x00Build date: 2023-12-15\nmore text\x00"
+        )
 
-        # Mock file and strings commands
-        def mock_subprocess(*args: Any, **_kwargs: Any) -> MagicMock:
-            cmd = args[0]
-            if cmd[0] == "file":
-                return MagicMock(
-                    stdout="ELF 64-bit LSB shared object, ARM aarch64, version 1 (SYSV)",
-                    returncode=0,
-                )
-            if cmd[0] == "strings":
-                return MagicMock(
-                    stdout=(
-                        "random text\n"
-                        "Copyright 2023 Rockchip\n"
-                        "Version 1.0\n"
-                        "Build date: 2023-12-15\n"
-                        "more text\n"
-                    ),
-                    returncode=0,
-                )
-            return MagicMock(returncode=1)
+        result = analyze_binary(lib_file)
 
-        mock_run.side_effect = mock_subprocess
+        assert result is not None
+        assert result.library_name == "librockchip_mpp.so"
+        assert result.file_type == "ELF 64-bit LSB shared object"
+        assert result.interesting_strings == [
+            "Copyright 2023 Rockchip",
+            "Version 1.0",
+            "Build date: 2023-12-15",
+        ]
+        # Neither file nor strings is run for an ELF library
+        mock_run.assert_not_called()
+
+    @patch("subprocess.run")
+    def test_analyze_binary_big_endian_elf(self, mock_run: Any, tmp_path: Path) -> None:
+        """Test that e_type is decoded in the header's byte order."""
+        lib_file = tmp_path / "libtest.so"
+        lib_file.write_bytes(b"\x7fELF\x01\x02\x01" + b"\x00" * 9 + b"\x00\x02")
 
         result = analyze_binary(lib_file)
 
         assert result is not None
-        assert result.library_name == "librockchip_mpp.so"
-        assert "ELF 64-bit LSB shared object" in result.file_type
-        assert len(result.interesting_strings) == 3
-        assert "Copyright 2023 Rockchip" in result.interesting_strings
-        assert "Version 1.0" in result.interesting_strings
+        assert result.file_type == "ELF 32-bit MSB executable"
+        mock_run.assert_not_called()
+
+    @patch("subprocess.run")
+    def test_analyze_binary_symlink(self, mock_run: Any, tmp_path: Path) -> None:
+        """Test that a symlinked library is described like file -b does."""
+        (tmp_path / "librockchip_mpp.so.1").write_bytes(b"\x00")
+        lib_file = tmp_path / "librockchip_mpp.so"
+        lib_file.symlink_to("librockchip_mpp.so.1")
+
+        result = analyze_binary(lib_file)
+
+        assert result is not None
+        assert result.file_type == "symbolic link to librockchip_mpp.so.1"
+        mock_run.assert_not_called()
+
+    @patch("subprocess.run")
+    def test_analyze_binary_non_elf_runs_file(self, mock_run: Any, tmp_path: Path) -> None:
+        """Test that files without an ELF header fall back to file -b."""
+        lib_file = tmp_path / "libtest.so"
+        lib_file.write_text("GROUP ( libtest.so.1 )")
+
+        mock_run.return_value = MagicMock(stdout="ASCII text, with no line terminators")
+
+        result = analyze_binary(lib_file)
+
+        assert result is not None
+        assert result.file_type == "ASCII text"
+        assert mock_run.call_args.args[0][:2] == ["file", "-b"]
 
     @patch("subprocess.run")
     def test_analyze_binary_limited_strings(self, mock_run: Any, tmp_path: Path) -> None:
         """Test that interesting strings are limited to MAX_INTERESTING_STRINGS."""
         lib_file = tmp_path / "test.so"
-        lib_file.write_bytes(b"dummy")
-
-        # Create many interesting strings
-        strings = "\n".join([f"Copyright {i}" for i in range(100)])
+        lib_file.write_bytes(b"\x00".join(f"Copyright {i}".encode() for i in range(100)))
 
-        def mock_subprocess(*args: Any, **_kwargs: Any) -> MagicMock:
-            cmd = args[0]
-            if cmd[0] == "file":
-                return MagicMock(stdout="ELF", returncode=0)
-            if cmd[0] == "strings":
-                return MagicMock(stdout=strings, returncode=0)
-            return MagicMock(returncode=1)
-
-        mock_run.side_effect = mock_subprocess
+        mock_run.return_value = MagicMock(stdout="ELF", returncode=0)
 
         result = analyze_binary(lib_file)
 
         assert result is not None
         # Should be limited to MAX_INTERESTING_STRINGS (20)
         assert len(result.interesting_strings) == 20
+        assert result.interesting_strings[-1] == "Copyright 19"
+
+    @patch("subprocess.run")
+    def test_analyze_binary_skips_short_runs(self, mock_run: Any, tmp_path: Path) -> None:
+        """Test that runs shorter than strings(1) reports are ignored."""
+        lib_file = tmp_path / "test.so"
+        lib_file.write_bytes(b"\x00bui\x00ld\x00  build  \x00")
+
+        mock_run.return_value = MagicMock(stdout="ELF", returncode=0)
+
+        result = analyze_binary(lib_file)
+
+        assert result is not None
+        assert result.interesting_strings == ["build"]
 
     def test_analyze_binary_file_not_exists(self, tmp_path: Path) -> None:
         """Test analyzing when file doesn't exist."""
@@ -1082,20 +1201,25 @@ class TestAnalyzeBinary:
         assert result.file_type == "unknown"
 
     @patch("subprocess.run")
-    def test_analyze_binary_strings_command_fails(self, mock_run: Any, tmp_path: Path) -> None:
-        """Test when strings command fails."""
+    def test_analyze_binary_empty_file(self, mock_run: Any, tmp_path: Path) -> None:
+        """Test that an empty library has no strings."""
         lib_file = tmp_path / "test.so"
-        lib_file.write_bytes(b"dummy")
+        lib_file.write_bytes(b"")
 
-        def mock_subprocess(*args: Any, **_kwargs: Any) -> MagicMock:
-            cmd = args[0]
-            if cmd[0] == "file":
-                return MagicMock(stdout="ELF", returncode=0)
-            if cmd[0] == "strings":
-                raise OSError("strings command failed")
-            return MagicMock(returncode=1)
+        mock_run.return_value = MagicMock(stdout="empty", returncode=0)
 
-        mock_run.side_effect = mock_subprocess
+        result = analyze_binary(lib_file)
+
+        assert result is not None
+        assert result.interesting_strings == []
+
+    @patch("subprocess.run")
+    def test_analyze_binary_unreadable(self, mock_run: Any, tmp_path: Path) -> None:
+        """Test when the library cannot be read for strings."""
+        lib_file = tmp_path / "test.so"
+        lib_file.mkdir()
+
+        mock_run.return_value = MagicMock(stdout="directory", returncode=0)
 
         result = analyze_binary(lib_file)
 
@@ -1573,6 +1697,29 @@ class TestAnalyzeProprietaryBlobs:
         assert len(analysis.mpp_libraries) > 0 or len(analysis.rga_libraries) > 0
         assert analysis.binary_analysis is not None
 
+    @patch("analyze_proprietary_blobs.analyze_binary", return_value=None)
+    @patch("analyze_proprietary_blobs.classify_license")
+    def test_analyze_proprietary_blobs_library_categories(
+        self, mock_classify: Any, _mock_binary: Any, tmp_path: Path
+    ) -> None:
+        """Test that each library category is filled with its own metadata."""
+        rootfs = tmp_path / "rootfs"
+        lib_dir = rootfs / "usr/lib"
+        lib_dir.mkdir(parents=True)
+        for name in ("libmpp.so.1", "librga.so", "librkaiq.so", "librknnrt.so"):
+            (lib_dir / name).write_bytes(b"x" * 16)
+        mock_classify.return_value = ("proprietary", "no license strings found in binary")
+
+        analysis = analyze_proprietary_blobs(str(tmp_path / "test.img"), rootfs)
+
+        assert [lib.name for lib in analysis.mpp_libraries] == ["libmpp.so"]
+        assert [lib.name for lib in analysis.rga_libraries] == ["librga.so"]
+        assert [lib.name for lib in analysis.isp_libraries] == ["librkaiq.so"]
+        assert [lib.name for lib in analysis.npu_libraries] == ["librknnrt.so"]
+        assert mock_classify.call_count == 4
+        assert "'librga.so*'" in analysis._method["rga_libraries"]
+        assert analysis._source["npu_libraries"] == "filesystem+strings"
+
     def test_analyze_proprietary_blobs_nonexistent_firmware(self, tmp_path: Path) -> None:
         """Test that nonexistent firmware file still works if rootfs exists."""
         firmware = tmp_path / "nonexistent.img"
@@ -1584,6 +1731,86 @@ class TestAnalyzeProprietaryBlobs:
         assert analysis.firmware_file == firmware.name
 
 
+class TestAnalysisCache:
+    """Test the firmware-digest keyed analysis cache."""
+
+    @staticmethod
+    def _make_analysis() -> ProprietaryBlobsAnalysis:
+        analysis = ProprietaryBlobsAnalysis(
+            firmware_file="test.img",
+            rootfs_path="/tmp/root",
+            rga_libraries=[
+                LibraryInfo(
+                    name="librga.so",
+                    path="/usr/lib/librga.so",
+                    size=1024,
+                    purpose="2D graphics",
+                    license="Apache-2.0",
+                    license_evidence="Apache License",
+                )
+            ],
+            all_rockchip_libs=["/usr/lib/librga.so"],
+            firmware_blobs=[FirmwareBlob(name="fw.bin", path="/lib/firmware/fw.bin", size=64)],
+            kernel_modules=[KernelModule(name="a.ko", path="/lib/a.ko", size=32, has_gpl=True)],
+            binary_analysis=BinaryAnalysis(
+                library_name="librga.so", file_type="ELF", interesting_strings=["rga version"]
+            ),
+            rockchip_count=1,
+        )
+        analysis.add_metadata("rga_libraries", "filesystem", "find rootfs -name 'librga.so*'")
+        return analysis
+
+    def test_cache_round_trip(self) -> None:
+        """Test that a cached analysis is restored field for field."""
+        analysis = self._make_analysis()
+
+        restored = _analysis_from_dict(json.loads(json.dumps(asdict(analysis))))
+
+        assert restored == analysis
+        assert restored.to_dict() == analysis.to_dict()
+
+    def test_script_ignores_cache_by_default(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that every run extracts and scans unless the cache is enabled."""
+        monkeypatch.delenv(CACHE_ENV, raising=False)
+        firmware = tmp_path / "firmware.img"
+        firmware.write_bytes(b"firmware")
+        script = ProprietaryBlobsScript()
+        script.work_dir = tmp_path / "work"
+        rootfs = tmp_path / "squashfs-root"
+        (rootfs / "usr/lib").mkdir(parents=True)
+
+        with patch.object(script, "initialize_extraction", return_value=(tmp_path, rootfs)) as ex:
+            script.analyze(str(firmware))
+            script.analyze(str(firmware))
+
+        assert ex.call_count == 2
+        assert not (script.work_dir / CACHE_DIR).exists()
+
+    def test_script_skips_extraction_on_cache_hit(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that unchanged firmware is served from the cache when enabled."""
+        monkeypatch.setenv(CACHE_ENV, "1")
+        firmware = tmp_path / "renamed.img"
+        firmware.write_bytes(b"firmware")
+        script = ProprietaryBlobsScript()
+        script.work_dir = tmp_path / "work"
+        rootfs = tmp_path / "squashfs-root"
+        (rootfs / "usr/lib").mkdir(parents=True)
+
+        with patch.object(script, "initialize_extraction", return_value=(tmp_path, rootfs)) as ex:
+            first = script.analyze(str(firmware))
+            second = script.analyze(str(firmware))
+
+        assert ex.call_count == 1
+        assert isinstance(first, ProprietaryBlobsAnalysis)
+        assert isinstance(second, ProprietaryBlobsAnalysis)
+        assert second.firmware_file == "renamed.img"
+        assert second.to_dict() == first.to_dict()
+
+
 class TestMain:
     """Test main function."""
 
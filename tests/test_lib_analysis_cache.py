@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Tests for scripts/lib/analysis_cache.py."""
+
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from lib.analysis_base import AnalysisBase
+from lib.analysis_cache import (
+    CACHE_DIR,
+    CACHE_ENV,
+    analysis_cache_key,
+    cached_analysis,
+    load_analysis,
+    save_analysis,
+)
+
+
+@dataclass
+class SampleAnalysis(AnalysisBase):
+    """Minimal cacheable analysis for testing."""
+
+    firmware_file: str
+    count: int = 0
+
+    _source: dict[str, str] = field(default_factory=dict)
+    _method: dict[str, str] = field(default_factory=dict)
+    _reproducibility: dict[str, str] = field(default_factory=dict)
+    _hardware_metadata: dict[str, dict[str, str]] = field(default_factory=dict)
+
+
+def _decode(data: dict[str, Any]) -> SampleAnalysis:
+    return SampleAnalysis(**data)
+
+
+class TestAnalysisCacheKey:
+    """Test analysis_cache_key function."""
+
+    def test_key_covers_firmware_and_analyzer(self, tmp_path: Path) -> None:
+        """Test that changing the firmware or the analyzer changes the key."""
+        firmware = tmp_path / "firmware.img"
+        firmware.write_bytes(b"firmware")
+        analyzer = tmp_path / "analyze_sample.py"
+        analyzer.write_text("VERSION = 1\n")
+
+        key = analysis_cache_key(firmware, analyzer)
+        assert analysis_cache_key(firmware, analyzer) == key
+
+        analyzer.write_text("VERSION = 2\n")
+        edited_analyzer_key = analysis_cache_key(firmware, analyzer)
+        assert edited_analyzer_key != key
+
+        firmware.write_bytes(b"other firmware")
+        assert analysis_cache_key(firmware, analyzer) not in {key, edited_analyzer_key}
+
+
+class TestLoadSaveAnalysis:
+    """Test load_analysis and save_analysis functions."""
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        """Test that a saved analysis is restored field for field."""
+        analysis = SampleAnalysis(firmware_file="test.img", count=3)
+        analysis.add_metadata("count", "filesystem", "count things")
+        cache_file = tmp_path / "cache" / "key.json"
+
+        save_analysis(cache_file, analysis)
+
+        assert load_analysis(cache_file, _decode) == analysis
+        assert not cache_file.with_suffix(".tmp").exists()
+
+    def test_missing_or_corrupt_entry_is_a_miss(self, tmp_path: Path) -> None:
+        """Test that unreadable entries are treated as cache misses."""
+        cache_file = tmp_path / "key.json"
+        assert load_analysis(cache_file, _decode) is None
+
+        cache_file.write_text("{not json")
+        assert load_analysis(cache_file, _decode) is None
+
+        cache_file.write_text('{"unexpected": 1}')
+        assert load_analysis(cache_file, _decode) is None
+
+
+class TestCachedAnalysis:
+    """Test cached_analysis function."""
+
+    @staticmethod
+    def _setup(tmp_path: Path) -> tuple[Path, Path]:
+        firmware = tmp_path / "firmware.img"
+        firmware.write_bytes(b"firmware")
+        analyzer = tmp_path / "analyze_sample.py"
+        analyzer.write_text("VERSION = 1\n")
+        return firmware, analyzer
+
+    def test_disabled_by_default(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the analysis always runs and nothing is written by default."""
+        monkeypatch.delenv(CACHE_ENV, raising=False)
+        firmware, analyzer = self._setup(tmp_path)
+        runs: list[int] = []
+
+        def run() -> SampleAnalysis:
+            runs.append(1)
+            return SampleAnalysis(firmware_file=firmware.name)
+
+        for _ in range(2):
+            cached_analysis(tmp_path, str(firmware), str(analyzer), _decode, run)
+
+        assert len(runs) == 2
+        assert not (tmp_path / CACHE_DIR).exists()
+
+    def test_hit_matches_fresh_result(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a cache hit skips the analysis and returns the same result."""
+        monkeypatch.setenv(CACHE_ENV, "1")
+        firmware, analyzer = self._setup(tmp_path)
+        runs: list[int] = []
+
+        def run() -> SampleAnalysis:
+            runs.append(1)
+            return SampleAnalysis(firmware_file=firmware.name, count=5)
+
+        first = cached_analysis(tmp_path, str(firmware), str(analyzer), _decode, run)
+        second = cached_analysis(tmp_path, str(firmware), str(analyzer), _decode, run)
+
+        assert len(runs) == 1
+        assert second.count == 5
+        assert second.to_dict() == first.to_dict()
+
+    def test_analyzer_change_invalidates(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that editing the analyzer source forces a fresh analysis."""
+        monkeypatch.setenv(CACHE_ENV, "1")
+        firmware, analyzer = self._setup(tmp_path)
+        runs: list[int] = []
+
+        def run() -> SampleAnalysis:
+            runs.append(1)
+            return SampleAnalysis(firmware_file=firmware.name, count=len(runs))
+
+        cached_analysis(tmp_path, str(firmware), str(analyzer), _decode, run)
+        analyzer.write_text("VERSION = 2\n")
+        result = cached_analysis(tmp_path, str(firmware), str(analyzer), _decode, run)
+
+        assert len(runs) == 2
+        assert result.count == 2
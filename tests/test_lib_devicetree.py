@@ -1,13 +1,60 @@
 #!/usr/bin/env python3
 """Tests for scripts/lib/devicetree.py."""
 
+import mmap
+import random
+import re
+import struct
 import sys
 from pathlib import Path
 
+import pytest
+
 # Add scripts directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
 
-from lib.devicetree import DeviceTreeParser, HardwareComponent
+from lib.devicetree import (
+    FDT_MAGIC,
+    DeviceTreeParser,
+    HardwareComponent,
+    fdt_string,
+    read_fdt_root_properties,
+)
+
+
+def build_fdt(root_props: dict[str, bytes], child_props: dict[str, bytes]) -> bytes:
+    """Build a minimal binary FDT with root properties and one child node."""
+    strings = b""
+    offsets: dict[str, int] = {}
+    for name in [*root_props, *child_props]:
+        if name not in offsets:
+            offsets[name] = len(strings)
+            strings += name.encode() + b"\0"
+
+    def node(name: bytes, props: dict[str, bytes], children: bytes = b"") -> bytes:
+        out = struct.pack(">I", 1) + name + b"\0"
+        out += b"\0" * (-len(out) % 4)
+        for prop, value in props.items():
+            out += struct.pack(">III", 3, len(value), offsets[prop]) + value
+            out += b"\0" * (-len(out) % 4)
+        return out + children + struct.pack(">I", 2)
+
+    structure = node(b"", root_props, node(b"child", child_props)) + struct.pack(">I", 9)
+    off_struct = 40
+    off_strings = off_struct + len(structure)
+    header = FDT_MAGIC + struct.pack(
+        ">9I",
+        off_strings + len(strings),
+        off_struct,
+        off_strings,
+        40,
+        17,
+        16,
+        0,
+        len(strings),
+        len(structure),
+    )
+    return header + structure + strings
 
 
 class TestHardwareComponent:
@@ -30,6 +77,50 @@ class TestHardwareComponent:
             pass  # Expected
 
 
+class TestReadFdtRootProperties:
+    """Test read_fdt_root_properties and fdt_string."""
+
+    def test_reads_root_properties(self) -> None:
+        """Test reading model and compatible from a binary FDT."""
+        data = build_fdt(
+            {"model": b"GL.iNet Comet\0", "compatible": b"glinet,rm1\0rockchip,rv1126\0"},
+            {"model": b"Child\0"},
+        )
+        props = read_fdt_root_properties(data)
+
+        assert fdt_string(props["model"]) == "GL.iNet Comet"
+        assert fdt_string(props["compatible"]) == "glinet,rm1"
+
+    def test_reads_memory_mapped_fdt(self, tmp_path: Path) -> None:
+        """Test reading root properties straight from a memory map."""
+        dtb = tmp_path / "system.dtb"
+        dtb.write_bytes(build_fdt({"model": b"GL.iNet Comet\0"}, {}) + b"\xff" * 4096)
+
+        with dtb.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            props = read_fdt_root_properties(mm)
+
+        assert props == {"model": b"GL.iNet Comet\0"}
+
+    def test_ignores_child_node_properties(self) -> None:
+        """Test that properties of nested nodes are not reported."""
+        data = build_fdt({}, {"model": b"Child\0"})
+        assert read_fdt_root_properties(data) == {}
+
+    def test_not_fdt(self) -> None:
+        """Test that non-FDT data yields no properties."""
+        assert read_fdt_root_properties(b'/ { model = "x"; };') == {}
+
+    def test_truncated_fdt(self) -> None:
+        """Test that a truncated FDT yields no properties instead of raising."""
+        data = build_fdt({"model": b"Board\0"}, {})
+        assert read_fdt_root_properties(data[:48]) == {}
+
+    def test_fdt_string_empty(self) -> None:
+        """Test that missing or empty values decode to None."""
+        assert fdt_string(None) is None
+        assert fdt_string(b"\0") is None
+
+
 class TestDeviceTreeParserExtractModel:
     """Test extract_model method."""
 
@@ -151,6 +242,80 @@ class TestDeviceTreeParserExtractFitDescription:
         # Should be limited by FIT_DESCRIPTION_MAX_LINES (30)
         assert len(result.splitlines()) <= 30
 
+    def test_extract_fit_description_only_property_lines(self) -> None:
+        """Test that only whole, stripped FIT property lines are returned."""
+        dts = 'FIT Image\n\n\tdescription = "kernel";\n\tdata = <0x00>;\n  os = "linux";\n'
+        parser = DeviceTreeParser(dts)
+        assert parser.extract_fit_description() == 'description = "kernel";\nos = "linux";'
+
+    def test_extract_fit_description_any_whitespace_before_equals(self) -> None:
+        """Test that any whitespace may separate a FIT key from "=", like \\s*."""
+        dts = 'FIT Image description\ntype\xa0= "kernel";\nos\x1f= "linux";\ntype "x";\n'
+        parser = DeviceTreeParser(dts)
+        assert parser.extract_fit_description() == 'type\xa0= "kernel";\nos\x1f= "linux";'
+
+    @pytest.mark.parametrize("line_break", ["\r\n", "\r", "\x0b", "\x0c", "\x1e", "\x85", "\u2028"])
+    def test_extract_fit_description_other_line_breaks(self, line_break: str) -> None:
+        """Test that every line boundary splitlines() knows ends a FIT line."""
+        dts = line_break.join(
+            ["FIT Image", 'description = "kernel";', "data = <0>;", 'os = "linux";']
+        )
+        parser = DeviceTreeParser(dts)
+        assert parser.extract_fit_description() == 'description = "kernel";\nos = "linux";'
+
+    def test_extract_fit_description_matches_regex_reference(self) -> None:
+        """Test the find() walk against the original splitlines() + regex version."""
+        key_re = re.compile(
+            r"^\s*(description|type|arch|os|compression|algo|key-name-hint|sign-images)\s*="
+        )
+
+        def reference(content: str) -> str | None:
+            if "description" not in content or "FIT" not in content:
+                return None
+            fit_lines = []
+            for line in content.splitlines():
+                if key_re.search(line):
+                    fit_lines.append(line.strip())
+                    if len(fit_lines) >= 30:
+                        break
+            return "\n".join(fit_lines) if fit_lines else None
+
+        pieces = [
+            "FIT", "description", "type", "arch", "os", "algo", "key-name-hint", "sign-images",
+            "types", "=", " = ", '"x"', ";", " ", "\t", "\xa0", "\x1f", "\n", "\r\n", "\r",
+            "\x0b", "\x0c", "\x1c", "\x1d", "\x1e", "\x85", "\u2028", "\u2029",
+        ]  # fmt: skip
+        rng = random.Random(20260417)
+        for _ in range(2000):
+            dts = "".join(rng.choices(pieces, k=rng.randrange(60)))
+            assert DeviceTreeParser(dts).extract_fit_description() == reference(dts), repr(dts)
+
+    def test_extract_fit_description_from_lines(self) -> None:
+        """Test that a pre-split line list gives the same result as the text."""
+        lines = ["FIT Image\n", '  description = "kernel";\n', "  data = <0>;\n", '  os = "linux";']
+        dts = "".join(lines)
+
+        from_text = DeviceTreeParser(dts).extract_fit_description()
+        from_lines = DeviceTreeParser(dts, lines).extract_fit_description()
+
+        assert from_lines == from_text == 'description = "kernel";\nos = "linux";'
+
+    def test_extract_fit_description_from_lines_splits_each_line(self) -> None:
+        """Test that supplied lines are still split at every line break."""
+        lines = ["FIT Image\r", '  description = "kernel";\x0cdata = <0>;\n', 'os = "linux";\u2028']
+        dts = "".join(lines)
+
+        from_text = DeviceTreeParser(dts).extract_fit_description()
+        from_lines = DeviceTreeParser(dts, lines).extract_fit_description()
+
+        assert from_lines == from_text == 'description = "kernel";\nos = "linux";'
+
+    def test_extract_model_from_lines_with_embedded_newlines(self) -> None:
+        """Test that supplied lines holding several "\\n" lines match like the text."""
+        lines = ['/ {\n  model = "Board";\n', "};\n"]
+        parser = DeviceTreeParser("".join(lines), lines)
+        assert parser.extract_model() == "Board"
+
 
 class TestDeviceTreeParserExtractSerialConfig:
     """Test extract_serial_config method."""
@@ -194,6 +359,36 @@ class TestDeviceTreeParserExtractSerialConfig:
         assert result is not None
         assert "baudrate" in result
 
+    def test_extract_serial_config_context_window(self) -> None:
+        """Test that a later serial node within the context window extends the block."""
+        lines = ["fiq-debugger {"] + [f"p{i};" for i in range(5)] + ["serial@ff570000 {"]
+        lines += [f"q{i};" for i in range(15)]
+        parser = DeviceTreeParser("\n".join(lines))
+        result = parser.extract_serial_config()
+        assert result is not None
+        result_lines = result.splitlines()
+        # Both trigger lines, the 5 between them, then 10 lines of context
+        assert len(result_lines) == 17
+        assert result_lines[-1] == "q9;"
+
+    @pytest.mark.parametrize("line_break", ["\r\n", "\r", "\x0c", "\x85"])
+    def test_extract_serial_config_other_line_breaks(self, line_break: str) -> None:
+        """Test that lines are split like str.splitlines(), not only on newlines."""
+        lines = ["fiq-debugger {"] + [f"p{i};" for i in range(5)] + ["serial@ff570000 {"]
+        lines += [f"q{i};" for i in range(15)]
+        parser = DeviceTreeParser(line_break.join(lines))
+        result = parser.extract_serial_config()
+        assert result is not None
+        assert result == DeviceTreeParser("\n".join(lines)).extract_serial_config()
+        assert len(result.split("\n")) == 17
+
+    @pytest.mark.parametrize("line_break", ["\n", "\r\n"])
+    def test_extract_serial_config_trailing_blank_line(self, line_break: str) -> None:
+        """Test that a blank last line is kept, however lines are terminated."""
+        dts = line_break.join(["fiq-debugger", "baudrate", "", ""])
+        parser = DeviceTreeParser(dts)
+        assert parser.extract_serial_config() == "fiq-debugger\nbaudrate\n"
+
     def test_extract_serial_config_missing(self) -> None:
         """Test when serial config is missing."""
         dts = 'model = "Test Board";'
@@ -283,6 +478,19 @@ class TestDeviceTreeParserExtractHardwareComponents:
         types = {c.type for c in components}
         assert types == {"gpio", "usb", "spi", "i2c", "uart"}
 
+    def test_extract_components_grouped_by_type(self) -> None:
+        """Test that components are grouped by type, then by document order."""
+        dts = """
+        usb0: usb@fc000000 { };
+        gpio0: gpio@fd8a0000 { };
+        serial0: serial@fd890000 { };
+        gpio1: gpio@fec20000 { };
+        """
+        parser = DeviceTreeParser(dts)
+        components = parser.extract_hardware_components()
+
+        assert [c.node for c in components] == ["gpio0", "gpio1", "usb0", "serial0"]
+
     def test_extract_hardware_components_empty(self) -> None:
         """Test when no hardware components found."""
         dts = 'model = "Test Board";'
@@ -329,6 +537,12 @@ class TestDeviceTreeParserGetType:
         parser = DeviceTreeParser(dts)
         assert parser.get_type() == "U-Boot Device Tree"
 
+    def test_get_type_fit_after_uboot(self) -> None:
+        """Test that a FIT marker wins even when U-Boot appears first."""
+        dts = 'U-Boot device tree\n/ { description = "FIT Image"; };'
+        parser = DeviceTreeParser(dts)
+        assert parser.get_type() == "FIT Image (Flattened Image Tree)"
+
     def test_get_type_regular(self) -> None:
         """Test type detection for regular device tree."""
         dts = 'model = "Regular Board";'
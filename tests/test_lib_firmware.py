@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+import http.client
+import io
 import subprocess
 import sys
+import urllib.error
 from pathlib import Path
-from typing import Any
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -15,6 +17,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
 
 from lib.firmware import (
     DEFAULT_FIRMWARE_URL,
+    DOWNLOAD_TIMEOUT,
     extract_firmware,
     find_squashfs_rootfs,
     get_firmware_path,
@@ -56,19 +59,16 @@ class TestGetFirmwarePath:
 
     def test_downloads_firmware_if_not_exists(self, tmp_path: Path) -> None:
         """Test that firmware is downloaded if it doesn't exist."""
-        with patch("subprocess.run") as mock_run:
+        with patch("urllib.request.urlopen", return_value=io.BytesIO(b"firmware")) as mock_open:
             result = get_firmware_path(None, tmp_path)
 
-            # Should have called curl
-            mock_run.assert_called_once()
-            args = mock_run.call_args[0][0]
-            assert args[0] == "curl"
-            assert "-L" in args
-            assert DEFAULT_FIRMWARE_URL in args
+            # Should have opened the default URL
+            mock_open.assert_called_once_with(DEFAULT_FIRMWARE_URL, timeout=DOWNLOAD_TIMEOUT)
 
-            # Should return path to downloaded file
+            # Should return path to downloaded file with streamed content
             assert result.parent == tmp_path
             assert "glkvm-RM1" in result.name
+            assert result.read_bytes() == b"firmware"
 
     def test_uses_existing_downloaded_firmware(self, tmp_path: Path) -> None:
         """Test that existing downloaded firmware is reused."""
@@ -76,11 +76,11 @@ class TestGetFirmwarePath:
         firmware = tmp_path / firmware_file
         firmware.write_bytes(b"test")
 
-        with patch("subprocess.run") as mock_run:
+        with patch("urllib.request.urlopen") as mock_open:
             result = get_firmware_path(None, tmp_path)
 
-            # Should not have called curl
-            mock_run.assert_not_called()
+            # Should not have downloaded anything
+            mock_open.assert_not_called()
 
             # Should return existing file
             assert result == firmware
@@ -89,7 +89,7 @@ class TestGetFirmwarePath:
         """Test that work directory is created if it doesn't exist."""
         work_dir = tmp_path / "nonexistent"
 
-        with patch("subprocess.run"):
+        with patch("urllib.request.urlopen", return_value=io.BytesIO(b"")):
             get_firmware_path(None, work_dir)
 
             assert work_dir.exists()
@@ -97,21 +97,66 @@ class TestGetFirmwarePath:
     def test_exits_on_download_failure(self, tmp_path: Path) -> None:
         """Test that it exits if download fails."""
         with (
-            patch("subprocess.run", side_effect=subprocess.CalledProcessError(1, "curl")),
+            patch("urllib.request.urlopen", side_effect=urllib.error.URLError("offline")),
+            pytest.raises(SystemExit),
+        ):
+            get_firmware_path(None, tmp_path)
+
+    def test_removes_partial_download_on_failure(self, tmp_path: Path) -> None:
+        """Test that a failed download doesn't leave a truncated file behind."""
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.read.side_effect = OSError("connection reset")
+
+        with (
+            patch("urllib.request.urlopen", return_value=response),
             pytest.raises(SystemExit),
         ):
             get_firmware_path(None, tmp_path)
 
+        assert not (tmp_path / DEFAULT_FIRMWARE_URL.split("/")[-1]).exists()
+
+    def test_removes_partial_download_on_incomplete_read(self, tmp_path: Path) -> None:
+        """Test that a response cut short mid-body exits and removes the partial file."""
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.read.side_effect = [b"partial", http.client.IncompleteRead(b"")]
+
+        with (
+            patch("urllib.request.urlopen", return_value=response),
+            pytest.raises(SystemExit) as exc_info,
+        ):
+            get_firmware_path(None, tmp_path)
+
+        assert exc_info.value.code == 1
+        assert not (tmp_path / DEFAULT_FIRMWARE_URL.split("/")[-1]).exists()
+
+    def test_exits_on_download_timeout(self, tmp_path: Path) -> None:
+        """Test that a stalled download exits and removes the partial file."""
+        with (
+            patch("urllib.request.urlopen", side_effect=TimeoutError("timed out")),
+            pytest.raises(SystemExit),
+        ):
+            get_firmware_path(None, tmp_path)
+
+        assert not (tmp_path / DEFAULT_FIRMWARE_URL.split("/")[-1]).exists()
+
+    def test_exits_on_malformed_url(self, tmp_path: Path) -> None:
+        """Test that a malformed firmware URL exits instead of raising ValueError."""
+        with pytest.raises(SystemExit):
+            get_firmware_path(None, tmp_path, firmware_url="not-a-url/firmware.img")
+
+        assert not (tmp_path / "firmware.img").exists()
+
     def test_uses_custom_firmware_url(self, tmp_path: Path) -> None:
         """Test that custom firmware URL can be provided."""
         custom_url = "https://example.com/custom-firmware.img"
 
-        with patch("subprocess.run") as mock_run:
+        with patch("urllib.request.urlopen", return_value=io.BytesIO(b"")) as mock_open:
             result = get_firmware_path(None, tmp_path, firmware_url=custom_url)
 
-            # Should have called curl with custom URL
-            args = mock_run.call_args[0][0]
-            assert custom_url in args
+            # Should have downloaded from custom URL
+            mock_open.assert_called_once_with(custom_url, timeout=DOWNLOAD_TIMEOUT)
 
             # Should return path based on custom URL
             assert result.name == "custom-firmware.img"
@@ -135,6 +180,10 @@ class TestExtractFirmware:
             assert "-e" in args
             assert str(firmware) in args
 
+            # Output is discarded rather than captured
+            assert mock_run.call_args.kwargs["stdout"] is subprocess.DEVNULL
+            assert "capture_output" not in mock_run.call_args.kwargs
+
             # Should return extraction directory
             assert result.parent.name == "extractions"
             assert result.name == "firmware.img.extracted"
@@ -263,17 +312,11 @@ class TestIntegration:
         rootfs.mkdir(parents=True)
 
         # Mock download
-        with patch("subprocess.run") as mock_run:
-
-            def create_firmware(*_args: Any, **_kwargs: Any) -> None:
-                firmware = tmp_path / firmware_file
-                firmware.write_bytes(b"test")
-
-            mock_run.side_effect = create_firmware
-
+        with patch("urllib.request.urlopen", return_value=io.BytesIO(b"test")):
             # Get firmware path (should download)
             firmware_path = get_firmware_path(None, tmp_path)
             assert firmware_path.name == firmware_file
+            assert firmware_path.read_bytes() == b"test"
 
         # Extract firmware
         with patch("subprocess.run"):